@@ -1,9 +1,42 @@
 from decouple import config
 
 DEFAULT_ORDER_STATUS = "На рассмотрении"
+APPROVED_ORDER_STATUS = "Одобрен"
 DEFAULT_CURRENCY = "₽"
 
 SUPABASE_URL = config("SUPABASE_URL")
 SUPABASE_SERVICE_ROLE_KEY = config("SUPABASE_SERVICE_ROLE_KEY")
+SUPABASE_MAX_CONCURRENCY = config("SUPABASE_MAX_CONCURRENCY", default=10, cast=int)
 EVOTOR_TOKEN = config("EVOTOR_TOKEN")
-EVOTOR_STORE_UUID = config("EVOTOR_STORE_UUID")
\ No newline at end of file
+EVOTOR_STORE_UUID = config("EVOTOR_STORE_UUID")
+EVOTOR_WEBHOOK_TOKEN = config("EVOTOR_WEBHOOK_TOKEN", default="")
+
+AUTH_VERIFICATION_MODE = config("AUTH_VERIFICATION_MODE", default="local")
+SUPABASE_JWT_SECRET = config("SUPABASE_JWT_SECRET", default="")
+SUPABASE_JWT_AUDIENCE = config("SUPABASE_JWT_AUDIENCE", default="authenticated")
+SUPABASE_JWKS_URL = config("SUPABASE_JWKS_URL", default=f"{SUPABASE_URL}/auth/v1/.well-known/jwks.json")
+AUTH_ROLE_CLAIM = config("AUTH_ROLE_CLAIM", default="user_role")
+
+EVOTOR_API_URL = config("EVOTOR_API_URL", default="https://api.evotor.ru")
+EVOTOR_HTTP2 = config("EVOTOR_HTTP2", default=True, cast=bool)
+EVOTOR_MAX_CONNECTIONS = config("EVOTOR_MAX_CONNECTIONS", default=20, cast=int)
+EVOTOR_MAX_KEEPALIVE_CONNECTIONS = config("EVOTOR_MAX_KEEPALIVE_CONNECTIONS", default=10, cast=int)
+EVOTOR_KEEPALIVE_EXPIRY = config("EVOTOR_KEEPALIVE_EXPIRY", default=30.0, cast=float)
+EVOTOR_RATE_LIMIT_PER_SECOND = config("EVOTOR_RATE_LIMIT_PER_SECOND", default=5.0, cast=float)
+EVOTOR_RATE_LIMIT_BURST = config("EVOTOR_RATE_LIMIT_BURST", default=10, cast=int)
+EVOTOR_MAX_RETRIES = config("EVOTOR_MAX_RETRIES", default=3, cast=int)
+EVOTOR_BREAKER_THRESHOLD = config("EVOTOR_BREAKER_THRESHOLD", default=5, cast=int)
+EVOTOR_BREAKER_RESET_SECONDS = config("EVOTOR_BREAKER_RESET_SECONDS", default=30.0, cast=float)
+# 0 — остатки для списания всегда читаются из Evotor; иначе допустимый возраст данных о товаре.
+EVOTOR_PRODUCT_CACHE_SECONDS = config("EVOTOR_PRODUCT_CACHE_SECONDS", default=0.0, cast=float)
+
+ASSET_STORAGE_BACKEND = config("ASSET_STORAGE_BACKEND", default="local")
+ASSET_STORAGE_DIR = config("ASSET_STORAGE_DIR", default="data/assets")
+ASSET_STORAGE_BUCKET = config("ASSET_STORAGE_BUCKET", default="order-assets")
+ASSET_MAX_BYTES = config("ASSET_MAX_BYTES", default=2 * 1024 * 1024, cast=int)
+
+JOBS_DB_PATH = config("JOBS_DB_PATH", default="data/jobs/jobs.sqlite3")
+JOB_MAX_ATTEMPTS = config("JOB_MAX_ATTEMPTS", default=8, cast=int)
+
+CATALOG_CACHE_BACKEND = config("CATALOG_CACHE_BACKEND", default="memory")
+CATALOG_REDIS_URL = config("CATALOG_REDIS_URL", default="redis://localhost:6379/0")
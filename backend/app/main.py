@@ -1,11 +1,33 @@
-﻿from fastapi import FastAPI
+﻿from contextlib import asynccontextmanager
+
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from backend.app.routers.assets import router as assets_router
 from backend.app.routers.auth import router as auth_router
 from backend.app.routers.orders import router as orders_router
 from backend.app.routers.catalog import router as catalog_router
+from backend.app.services.catalog_service import start_catalog_refresher, stop_catalog_refresher
+from backend.app.services.catalog_store import close_catalog_store
+from backend.app.services.evotor_client import close_client, start_client
+from backend.app.services.job_queue import start_worker, stop_worker
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    await start_client()
+    await start_worker()
+    await start_catalog_refresher()
+    try:
+        yield
+    finally:
+        await stop_catalog_refresher()
+        await stop_worker()
+        await close_client()
+        await close_catalog_store()
+
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -19,3 +41,4 @@ app.add_middleware(
 app.include_router(auth_router, prefix="/api/auth", tags=["auth"])
 app.include_router(orders_router, prefix="/api/orders", tags=["orders"])
 app.include_router(catalog_router, prefix="/api/catalog", tags=["catalog"])
+app.include_router(assets_router, prefix="/api/assets", tags=["assets"])
@@ -1,5 +1,5 @@
 ﻿from datetime import datetime
-from typing import Optional, Dict, Any, List, Literal
+from typing import Optional, Dict, Any, List, Literal, TypedDict
 from pydantic import BaseModel, EmailStr
 
 
@@ -123,3 +123,47 @@ class OrderResult(BaseModel):
     tracking_code: Optional[str] = None
 
     created_at: datetime
+
+
+class OrdersPage(BaseModel):
+    items: List[OrderResult]
+    next_cursor: Optional[str] = None
+
+
+# Те же структуры, что OrderResult, в виде словарей — для списков заказов,
+# которые собираются без валидации pydantic и сразу кодируются в JSON.
+class OrderItemRow(TypedDict):
+    id: str
+    name: str
+    price: int
+    quantity: int
+    image: Optional[str]
+
+
+class OrderUserRow(TypedDict):
+    id: str
+    email: Optional[str]
+    name: Optional[str]
+    phone: Optional[str]
+
+
+class OrderShippingAddressRow(TypedDict):
+    id: Optional[str]
+    title: str
+    city: Optional[str]
+    address: str
+    comment: Optional[str]
+
+
+class OrderResultRow(TypedDict):
+    id: int
+    user_id: str
+    user: OrderUserRow
+    status: str
+    currency: str
+    total_cost: int
+    items: List[OrderItemRow]
+    shipping_address: Optional[OrderShippingAddressRow]
+    payment_status: str
+    tracking_code: Optional[str]
+    created_at: datetime
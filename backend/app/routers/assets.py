@@ -0,0 +1,48 @@
+from typing import Optional
+from fastapi import APIRouter, Header, HTTPException, Response
+
+from backend.app.services.asset_service import (
+    ALLOWED_IMAGE_TYPES,
+    DEFAULT_CONTENT_TYPE,
+    get_asset,
+    is_valid_asset_hash,
+)
+
+router = APIRouter(prefix="", tags=["assets"])
+
+# Содержимое адресуется хэшем и никогда не меняется.
+ASSET_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Ассеты присланы клиентами: даже открытые напрямую, они не должны исполнять скрипты на нашем origin.
+ASSET_SECURITY_HEADERS = {
+    "Content-Security-Policy": "default-src 'none'; style-src 'unsafe-inline'; sandbox",
+    "X-Content-Type-Options": "nosniff",
+}
+
+
+@router.get("/{asset_hash}")
+async def read_asset(
+    asset_hash: str,
+    if_none_match: Optional[str] = Header(default=None),
+) -> Response:
+    if not is_valid_asset_hash(asset_hash):
+        raise HTTPException(status_code=404, detail="Файл не найден.")
+
+    etag = f'"{asset_hash}"'
+    headers = {"ETag": etag, "Cache-Control": ASSET_CACHE_CONTROL, **ASSET_SECURITY_HEADERS}
+
+    if if_none_match and etag in {tag.strip() for tag in if_none_match.split(",")}:
+        return Response(status_code=304, headers=headers)
+
+    asset = await get_asset(asset_hash)
+    if asset is None:
+        raise HTTPException(status_code=404, detail="Файл не найден.")
+
+    # Сохранённое до появления белого списка отдаём как файл, а не как картинку.
+    if asset.content_type in ALLOWED_IMAGE_TYPES:
+        media_type = asset.content_type
+        headers["Content-Disposition"] = f'inline; filename="{asset_hash}"'
+    else:
+        media_type = DEFAULT_CONTENT_TYPE
+        headers["Content-Disposition"] = f'attachment; filename="{asset_hash}"'
+
+    return Response(content=asset.data, media_type=media_type, headers=headers)
@@ -1,7 +1,6 @@
 from typing import Any, Dict
 from fastapi import APIRouter, Depends, HTTPException
 
-from backend.app.db import supabase
 from backend.app.models import (
     AuthResult,
     SignInPayload,
@@ -9,16 +8,18 @@ from backend.app.models import (
     TokenBundle,
     UpdateProfilePayload,
 )
-from backend.app.services.auth_service import current_user
+from backend.app.services import repository
+from backend.app.services.auth_service import current_user_fresh, invalidate_user_role
 from backend.app.services.db_service import to_dict
+from backend.app.services.order_service import invalidate_user_profile
 
 router = APIRouter(prefix="", tags=["auth"])
 
 
 @router.post("/signup", response_model=AuthResult)
-def sign_up(payload: SignUpPayload) -> AuthResult:
+async def sign_up(payload: SignUpPayload) -> AuthResult:
     try:
-        auth_response = supabase.auth.sign_up(
+        auth_response = await repository.sign_up(
             {
                 "email": payload.email,
                 "password": payload.password,
@@ -51,9 +52,9 @@ def sign_up(payload: SignUpPayload) -> AuthResult:
 
 
 @router.post("/login", response_model=AuthResult)
-def sign_in(payload: SignInPayload) -> AuthResult:
+async def sign_in(payload: SignInPayload) -> AuthResult:
     try:
-        auth_response = supabase.auth.sign_in_with_password(
+        auth_response = await repository.sign_in_with_password(
             {"email": payload.email, "password": payload.password}
         )
     except Exception as exc:
@@ -74,14 +75,16 @@ def sign_in(payload: SignInPayload) -> AuthResult:
 
 
 @router.get("/me")
-async def me(user: Dict[str, Any] = Depends(current_user)) -> Dict[str, Any]:
+async def me(user: Dict[str, Any] = Depends(current_user_fresh)) -> Dict[str, Any]:
+    # Фронтенд сохраняет этот ответ как профиль, а user_metadata в JWT устаревает
+    # после PATCH /me до обновления токена — берём пользователя из Supabase Auth.
     return {"user": user}
 
 
 @router.patch("/me", response_model=AuthResult)
 async def update_me(
     payload: UpdateProfilePayload,
-    user: Dict[str, Any] = Depends(current_user),
+    user: Dict[str, Any] = Depends(current_user_fresh),
 ) -> AuthResult:
     if not user:
         raise HTTPException(status_code=401, detail="Пользователь не найден.")
@@ -109,11 +112,13 @@ async def update_me(
         return AuthResult(message="Изменений не обнаружено.", session=None, user=user)
 
     try:
-        supabase.auth.admin.update_user_by_id(user["id"], updates)
-        refreshed = supabase.auth.admin.get_user_by_id(user["id"])
+        await repository.update_auth_user(user["id"], updates)
+        refreshed = await repository.get_auth_user_by_id(user["id"])
     except Exception as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
 
+    invalidate_user_profile(user["id"])
+    invalidate_user_role(user["id"])
     updated_user = to_dict(refreshed.user)
 
     return AuthResult(message="Профиль обновлен.", session=None, user=updated_user)
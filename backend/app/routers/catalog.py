@@ -1,65 +1,123 @@
-import math
-from typing import Any, Dict, List, Optional
-from fastapi import APIRouter, Query
+import hmac
+from typing import Any, Callable, Dict, List, Literal, Optional
+from fastapi import APIRouter, Body, Header, HTTPException, Query, Response
 
-from backend.app.services.catalog_service import get_products, get_product_groups, paginate
+from backend.app.config import EVOTOR_WEBHOOK_TOKEN
+from backend.app.services.catalog_index import CatalogQuery, CatalogSnapshot, dump_json
+from backend.app.services.catalog_service import (
+    apply_product_update,
+    catalog_staleness,
+    get_catalog_snapshot,
+)
 
 router = APIRouter(prefix="", tags=["catalog"])
 
+# Каталог обновляется из Evotor раз в CATALOG_REFRESH_INTERVAL_SECONDS, дольше ответ не кэшируем.
+CATALOG_CACHE_CONTROL = "public, max-age=15"
+
+
+def set_staleness_headers(response: Response) -> None:
+    staleness = catalog_staleness()
+    if staleness["age"] is not None:
+        response.headers["X-Catalog-Age"] = str(int(staleness["age"]))
+    if staleness["refresh_failed"]:
+        response.headers["Warning"] = '110 - "Response is Stale"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    # Для If-None-Match теги сравниваются слабо: W/ не учитывается.
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return opaque in {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+
+
+def is_not_modified(snapshot: CatalogSnapshot, if_none_match: Optional[str]) -> bool:
+    # Только ETag: у If-Modified-Since секундная точность, и изменение остатка
+    # в ту же секунду, что и предыдущий ответ, дало бы ложный 304.
+    return bool(if_none_match) and etag_matches(if_none_match, snapshot.etag)
+
+
+def cached_response(
+    snapshot: CatalogSnapshot,
+    if_none_match: Optional[str],
+    render: Callable[[], bytes],
+) -> Response:
+    """Ответ по снимку каталога с ETag; при совпадении If-None-Match — 304 без сериализации."""
+    headers = {"ETag": snapshot.etag, "Cache-Control": CATALOG_CACHE_CONTROL}
+
+    if is_not_modified(snapshot, if_none_match):
+        response = Response(status_code=304, headers=headers)
+    else:
+        response = Response(content=render(), media_type="application/json", headers=headers)
+    set_staleness_headers(response)
+    return response
+
 
 @router.get("/items")
 async def list_items(
     page: int = Query(default=1, ge=1),
     page_size: int = Query(default=20, ge=1, le=100),
     group_id: Optional[str] = Query(default=None),
+    include_subgroups: bool = Query(default=True),
     search: Optional[str] = Query(default=None, min_length=1),
-) -> Dict[str, Any]:
-    products = await get_products()
-    groups = await get_product_groups()
-    group_map = {group["id"]: group["name"] for group in groups}
-
-    if group_id:
-        products = [product for product in products if product.get("parent_id") == group_id]
-
-    if search:
-        normalized_query = search.strip().lower()
-        if normalized_query:
-            products = [
-                product
-                for product in products
-                if normalized_query in product["name"].lower()
-                or normalized_query in (group_map.get(product.get("parent_id"), "") or "").lower()
-            ]
-
-    total = len(products)
-    total_pages = math.ceil(total / page_size) if total else 0
-
-    page_items = paginate(products, page, page_size) if products else []
-
-    result_items: List[Dict[str, Any]] = []
-    for item in page_items:
-        result_items.append(
-            {
-                "id": item["id"],
-                "name": item["name"],
-                "price": item["price"],
-                "quantity": item["quantity"],
-                "group_id": item.get("parent_id"),
-                "group_name": group_map.get(item.get("parent_id")),
-                "measure_name": item.get("measure_name"),
-            }
-        )
-
-    return {
-        "items": result_items,
-        "page": page,
-        "page_size": page_size,
-        "total": total,
-        "total_pages": total_pages,
-    }
+    sort: Optional[Literal["price", "name", "quantity"]] = Query(default=None),
+    order: Literal["asc", "desc"] = Query(default="asc"),
+    min_price: Optional[float] = Query(default=None, ge=0),
+    max_price: Optional[float] = Query(default=None, ge=0),
+    min_quantity: Optional[float] = Query(default=None, ge=0),
+    if_none_match: Optional[str] = Header(default=None),
+) -> Response:
+    snapshot = await get_catalog_snapshot()
+
+    query = CatalogQuery(
+        group_id=group_id,
+        include_subgroups=include_subgroups,
+        search=search.strip() if search and search.strip() else None,
+        sort=sort,
+        descending=order == "desc",
+        min_price=min_price,
+        max_price=max_price,
+        min_quantity=min_quantity,
+    )
+
+    def render() -> bytes:
+        if query.search:
+            # Поисковые запросы слишком разнообразны, чтобы держать их страницы в page_cache.
+            return dump_json(snapshot.page_payload(snapshot.resolve(query), page, page_size))
+        return snapshot.render_page(query, page, page_size)
+
+    return cached_response(snapshot, if_none_match, render)
 
 
 @router.get("/groups")
-async def list_groups() -> Dict[str, Any]:
-    groups = await get_product_groups()
-    return {"items": groups}
\ No newline at end of file
+async def list_groups(if_none_match: Optional[str] = Header(default=None)) -> Response:
+    snapshot = await get_catalog_snapshot()
+    return cached_response(snapshot, if_none_match, snapshot.render_groups)
+
+
+@router.post("/webhooks/evotor")
+async def evotor_products_webhook(
+    payload: Any = Body(...),
+    authorization: Optional[str] = Header(default=None),
+) -> Dict[str, Any]:
+    """Приёмник уведомлений Evotor об изменении товаров: применяет изменения к кэшу каталога."""
+    if not EVOTOR_WEBHOOK_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+
+    expected = f"Bearer {EVOTOR_WEBHOOK_TOKEN}"
+    if not authorization or not hmac.compare_digest(authorization, expected):
+        raise HTTPException(status_code=401, detail="Invalid authorization header.")
+
+    if isinstance(payload, dict):
+        raw_items = payload.get("items") if isinstance(payload.get("items"), list) else [payload]
+    elif isinstance(payload, list):
+        raw_items = payload
+    else:
+        raise HTTPException(status_code=400, detail="Некорректное тело запроса.")
+
+    products: List[Dict[str, Any]] = [item for item in raw_items if isinstance(item, dict)]
+    for product in products:
+        apply_product_update(product)
+
+    return {"applied": len(products)}
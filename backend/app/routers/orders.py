@@ -1,86 +1,36 @@
-import math
+from datetime import datetime
 from typing import Any, Dict, List, Optional
-from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
 
-from backend.app.config import DEFAULT_ORDER_STATUS, DEFAULT_CURRENCY
-from backend.app.db import supabase
+from backend.app.config import APPROVED_ORDER_STATUS, DEFAULT_ORDER_STATUS, DEFAULT_CURRENCY
 from backend.app.models import (
     CreateOrderPayload,
     OrderResult,
+    OrdersPage,
+    OrderStatusLiteral,
+    PaymentStatusLiteral,
     UpdateOrderPayload,
 )
-from backend.app.services.auth_service import current_admin, current_user
+from backend.app.services import job_queue, repository
+from backend.app.services.asset_service import externalize_item_images
+from backend.app.services.auth_service import current_admin, current_user, is_admin
 from backend.app.services.order_service import (
     attach_user,
     build_order_result,
+    build_order_row,
     build_user_snapshot,
+    decode_order_cursor,
+    dump_orders_json,
+    encode_order_cursor,
     fallback_user_from_record,
     fetch_user_profile,
+    summarize_order,
 )
-from backend.app.services.catalog_service import fetch_product, update_product_quantity
+from backend.app.services.inventory_service import enqueue_inventory_decrease
 
 router = APIRouter(prefix="", tags=["orders"])
 
 
-async def decrease_inventory_for_items(items: Any) -> None:
-    if not isinstance(items, list):
-        return
-
-    adjustments: Dict[str, float] = {}
-
-    for entry in items:
-        if not isinstance(entry, dict):
-            continue
-
-        product_id = entry.get("id")
-        if isinstance(product_id, (str, int)):
-            product_id_str = str(product_id)
-        else:
-            continue
-
-        raw_quantity = entry.get("quantity")
-        quantity_to_subtract = 1.0
-
-        try:
-            candidate = float(raw_quantity)
-        except (TypeError, ValueError):
-            candidate = None
-
-        if candidate is not None and math.isfinite(candidate) and candidate > 0:
-            quantity_to_subtract = candidate
-
-        adjustments[product_id_str] = adjustments.get(product_id_str, 0.0) + quantity_to_subtract
-
-    if not adjustments:
-        return
-
-    for product_id, decrement in adjustments.items():
-        if decrement <= 0:
-            continue
-
-        product = await fetch_product(product_id)
-        if product is None:
-            raise HTTPException(
-                status_code=500,
-                detail=f"Товар с идентификатором {product_id} не найден в Evotor.",
-            )
-
-        current_quantity_raw = product.get("quantity")
-        try:
-            current_quantity = float(current_quantity_raw)
-        except (TypeError, ValueError):
-            current_quantity = decrement
-
-        if not math.isfinite(current_quantity):
-            current_quantity = decrement
-
-        new_quantity = current_quantity - decrement
-        if new_quantity < 0:
-            new_quantity = 0.0
-
-        await update_product_quantity(product_id, new_quantity)
-
-
 @router.post("/", response_model=OrderResult, status_code=status.HTTP_201_CREATED)
 async def create_order(
     payload: CreateOrderPayload,
@@ -116,7 +66,7 @@ async def create_order(
     if user is None and (not customer_name or not customer_phone):
         raise HTTPException(status_code=400, detail="Укажите имя и телефон для оформления заказа.")
 
-    items_payload = [item.model_dump() for item in payload.items]
+    items_payload = await externalize_item_images([item.model_dump() for item in payload.items])
     total_cost = sum(item.price * item.quantity for item in payload.items)
 
     shipping_payload = payload.shipping_address.model_dump()
@@ -138,7 +88,7 @@ async def create_order(
     }
 
     try:
-        response = supabase.table("orders").insert(insert_payload).execute()
+        response = await repository.insert_order(insert_payload)
     except Exception as exc:
         print(f"Не удалось создать заказ: {exc}")
 
@@ -161,7 +111,7 @@ async def create_order(
 
     profile = None
     if user:
-        profile = fetch_user_profile(user.get("id"))
+        profile = await fetch_user_profile(user.get("id"))
         if not profile:
             snapshot = build_user_snapshot(user)
             if snapshot:
@@ -177,38 +127,90 @@ async def create_order(
     return build_order_result(record)
 
 
+# Списки отдаются готовыми байтами: response_model остаётся для схемы OpenAPI,
+# а повторная валидация и кодирование FastAPI пропускаются.
 @router.get("/me", response_model=List[OrderResult])
-async def list_my_orders(user: Dict[str, Any] = Depends(current_user)) -> List[OrderResult]:
+async def list_my_orders(user: Dict[str, Any] = Depends(current_user)) -> Response:
     user_id = user.get("id")
 
     try:
-        response = (
-            supabase.table("orders")
-            .select("*")
-            .eq("user_id", user_id)
-            .order("created_at", desc=True)
-            .execute()
-        )
+        response = await repository.select_orders(user_id=user_id)
     except Exception as exc:
         raise HTTPException(status_code=500, detail="Не удалось получить заказы пользователя.") from exc
 
     data = getattr(response, "data", None) or []
-    enriched = attach_user(data)
+    enriched = await attach_user([summarize_order(record) for record in data])
+
+    body = dump_orders_json([build_order_row(record) for record in enriched])
+    return Response(content=body, media_type="application/json")
 
-    return [build_order_result(record) for record in enriched]
 
+@router.get("/viewall", response_model=OrdersPage)
+async def list_orders(
+    limit: int = Query(default=50, ge=1, le=200),
+    cursor: Optional[str] = Query(default=None),
+    status_filter: Optional[OrderStatusLiteral] = Query(default=None, alias="status"),
+    payment_status: Optional[PaymentStatusLiteral] = Query(default=None),
+    created_from: Optional[datetime] = Query(default=None),
+    created_to: Optional[datetime] = Query(default=None),
+    _: Dict[str, Any] = Depends(current_admin),
+) -> Response:
+    after = None
+    if cursor:
+        after = decode_order_cursor(cursor)
+        if after is None:
+            raise HTTPException(status_code=400, detail="Некорректный курсор.")
 
-@router.get("/viewall", response_model=List[OrderResult])
-async def list_orders(_: Dict[str, Any] = Depends(current_admin)) -> List[OrderResult]:
     try:
-        response = supabase.table("orders").select("*").order("created_at", desc=True).execute()
+        response = await repository.select_orders_page(
+            limit=limit + 1,
+            after=after,
+            status=status_filter,
+            payment_status=payment_status,
+            created_from=created_from,
+            created_to=created_to,
+        )
     except Exception as exc:
         raise HTTPException(status_code=500, detail="Не удалось получить список заказов.") from exc
 
     data = getattr(response, "data", None) or []
-    enriched = attach_user(data)
+    next_cursor = None
+    if len(data) > limit:
+        data = data[:limit]
+        next_cursor = encode_order_cursor(data[-1])
+
+    enriched = await attach_user([summarize_order(record) for record in data])
+
+    body = dump_orders_json(
+        {
+            "items": [build_order_row(record) for record in enriched],
+            "next_cursor": next_cursor,
+        }
+    )
+    return Response(content=body, media_type="application/json")
+
+
+@router.get("/{order_id}", response_model=OrderResult)
+async def get_order(
+    order_id: int,
+    user: Dict[str, Any] = Depends(current_user),
+) -> OrderResult:
+    try:
+        response = await repository.select_order(order_id)
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail="Не удалось получить заказ.") from exc
+
+    data = getattr(response, "data", None) or []
+    if not data:
+        raise HTTPException(status_code=404, detail="Заказ не найден.")
+
+    record = data[0]
+    if str(record.get("user_id") or "") != str(user.get("id")) and not await is_admin(user):
+        raise HTTPException(status_code=404, detail="Заказ не найден.")
+
+    enriched = await attach_user([record])
+    return build_order_result(enriched[0])
 
-    return [build_order_result(record) for record in enriched]
 
 @router.delete("/{order_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_order(
@@ -216,12 +218,7 @@ async def delete_order(
     _: Dict[str, Any] = Depends(current_admin),
 ) -> None:
     try:
-        response = (
-            supabase.table("orders")
-            .delete()
-            .eq("id", order_id)
-            .execute()
-        )
+        response = await repository.delete_order(order_id)
     except Exception as exc:
         raise HTTPException(
             status_code=500,
@@ -250,7 +247,7 @@ async def update_order(
     if payload.total_cost is not None:
         updates["total_cost"] = payload.total_cost
     if payload.items is not None:
-        updates["items"] = [item.model_dump() for item in payload.items]
+        updates["items"] = await externalize_item_images([item.model_dump() for item in payload.items])
     if payload.shipping_address is not None:
         updates["shipping_address"] = payload.shipping_address.model_dump()
 # added
@@ -265,13 +262,7 @@ async def update_order(
 
     if payload.status is not None:
         try:
-            current_response = (
-                supabase.table("orders")
-                .select("*")
-                .eq("id", order_id)
-                .limit(1)
-                .execute()
-            )
+            current_response = await repository.select_order(order_id)
         except Exception as exc:
             print(f"Не удалось получить заказ перед обновлением: {exc}")
             raise HTTPException(status_code=500, detail="Не удалось получить заказ перед обновлением.") from exc
@@ -281,16 +272,20 @@ async def update_order(
             raise HTTPException(status_code=404, detail="Заказ не найден.")
 
         previous_record = current_data[0]
-        previous_status = previous_record.get("status")
-        should_decrease_inventory = payload.status == "Одобрен" and previous_status != "Одобрен"
+        should_decrease_inventory = payload.status == APPROVED_ORDER_STATUS
+
+    if should_decrease_inventory:
+        # Задача списания пишется до смены статуса: если процесс упадёт между ними,
+        # одобрение не потеряет списание. Обработчик сам проверит, что заказ одобрен,
+        # а ключ по заказу не даст списать дважды при повторном одобрении.
+        try:
+            await enqueue_inventory_decrease(order_id, updates.get("items") or previous_record.get("items"), wake=False)
+        except Exception as exc:
+            print(f"Не удалось поставить списание остатков в очередь: {exc}")
+            raise HTTPException(status_code=500, detail="Не удалось поставить списание остатков в очередь.") from exc
 
     try:
-        response = (
-            supabase.table("orders")
-            .update(updates)
-            .eq("id", order_id)
-            .execute()
-        )
+        response = await repository.update_order(order_id, updates)
     except Exception as exc:
         print(f"Не удалось обновить заказ: {exc}")
 
@@ -306,13 +301,7 @@ async def update_order(
     data = getattr(response, "data", None) or []
     if not data:
         try:
-            fetch_response = (
-                supabase.table("orders")
-                .select("*")
-                .eq("id", order_id)
-                .limit(1)
-                .execute()
-            )
+            fetch_response = await repository.select_order(order_id)
         except Exception as exc:
             raise HTTPException(status_code=500, detail=f"Не удалось получить обновленный заказ: {exc}") from exc
 
@@ -321,7 +310,7 @@ async def update_order(
             raise HTTPException(status_code=404, detail="Заказ не найден.")
 
     record = data[0]
-    profile = fetch_user_profile(record.get("user_id"))
+    profile = await fetch_user_profile(record.get("user_id"))
     if not profile:
         profile = fallback_user_from_record(record)
 
@@ -329,12 +318,7 @@ async def update_order(
         record["user"] = profile
 
     if should_decrease_inventory:
-        try:
-            await decrease_inventory_for_items(record.get("items"))
-        except HTTPException:
-            raise
-        except Exception as exc:
-            raise HTTPException(status_code=500, detail="Не удалось обновить остатки товаров.") from exc
+        job_queue.wake_worker()
 
     return build_order_result(record)
 
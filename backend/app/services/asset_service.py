@@ -0,0 +1,272 @@
+import asyncio
+import base64
+import binascii
+import hashlib
+import json
+import os
+import re
+import tempfile
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+from urllib.parse import unquote_to_bytes
+
+from fastapi import HTTPException
+
+from backend.app.config import ASSET_MAX_BYTES, ASSET_STORAGE_BACKEND, ASSET_STORAGE_BUCKET, ASSET_STORAGE_DIR
+from backend.app.services.db_service import run_db
+
+ASSET_URL_PREFIX = "/api/assets/"
+ASSET_HASH_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+ASSET_CACHE_MAX_ENTRIES = 256
+DEFAULT_CONTENT_TYPE = "application/octet-stream"
+SVG_CONTENT_TYPE = "image/svg+xml"
+# Только эти типы сохраняются и отдаются как картинки; остальное — как octet-stream во вложении.
+ALLOWED_IMAGE_TYPES = {"image/png", "image/jpeg", "image/gif", "image/webp", "image/avif", SVG_CONTENT_TYPE}
+# SVG — это разметка: скрипты, обработчики событий и внешние ссылки в ассетах не допускаются.
+SVG_FORBIDDEN_PATTERN = re.compile(
+    rb"<\s*script|<\s*foreignObject|<\s*iframe|<\s*embed|<\s*object|<!ENTITY|\son[a-z]+\s*=|javascript:|(?:xlink:)?href\s*=\s*[\"']?\s*(?!#)[a-z]+:",
+    re.IGNORECASE,
+)
+
+_asset_cache: "OrderedDict[str, Asset]" = OrderedDict()
+_store: Optional["AssetStore"] = None
+
+
+@dataclass(frozen=True)
+class Asset:
+    data: bytes
+    content_type: str
+
+
+class AssetStore:
+    """Хранилище бинарных ассетов, адресуемых по sha256 содержимого."""
+
+    async def exists(self, asset_hash: str) -> bool:
+        raise NotImplementedError
+
+    async def save(self, asset_hash: str, asset: Asset) -> None:
+        raise NotImplementedError
+
+    async def load(self, asset_hash: str) -> Optional[Asset]:
+        raise NotImplementedError
+
+
+class LocalAssetStore(AssetStore):
+    def __init__(self, root: str) -> None:
+        self.root = root
+
+    def _path(self, asset_hash: str) -> str:
+        return os.path.join(self.root, asset_hash[:2], asset_hash)
+
+    async def exists(self, asset_hash: str) -> bool:
+        return await asyncio.to_thread(os.path.exists, self._path(asset_hash))
+
+    async def save(self, asset_hash: str, asset: Asset) -> None:
+        await asyncio.to_thread(self._save_sync, asset_hash, asset)
+
+    async def load(self, asset_hash: str) -> Optional[Asset]:
+        return await asyncio.to_thread(self._load_sync, asset_hash)
+
+    def _save_sync(self, asset_hash: str, asset: Asset) -> None:
+        path = self._path(asset_hash)
+        if os.path.exists(path):
+            # Ассет адресуется хэшем: раз файл есть, в нём то же содержимое.
+            return
+
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+
+        # Сначала .meta, затем данные — оба через уникальный временный файл и
+        # os.replace, чтобы параллельные сохранения одного ассета не мешали
+        # друг другу, а читатель никогда не увидел недописанный файл.
+        self._write_atomic(f"{path}.meta", json.dumps({"content_type": asset.content_type}).encode("utf-8"))
+        self._write_atomic(path, asset.data)
+
+    @staticmethod
+    def _write_atomic(path: str, data: bytes) -> None:
+        with tempfile.NamedTemporaryFile(dir=os.path.dirname(path), prefix=".tmp-", delete=False) as handle:
+            handle.write(data)
+            tmp_path = handle.name
+        try:
+            os.replace(tmp_path, path)
+        except OSError:
+            os.unlink(tmp_path)
+            if not os.path.exists(path):
+                raise
+
+    def _load_sync(self, asset_hash: str) -> Optional[Asset]:
+        path = self._path(asset_hash)
+        try:
+            with open(path, "rb") as handle:
+                data = handle.read()
+        except FileNotFoundError:
+            return None
+
+        content_type = DEFAULT_CONTENT_TYPE
+        try:
+            with open(f"{path}.meta", encoding="utf-8") as handle:
+                content_type = json.load(handle).get("content_type") or DEFAULT_CONTENT_TYPE
+        except (OSError, ValueError):
+            pass
+
+        return Asset(data=data, content_type=content_type)
+
+
+class SupabaseAssetStore(AssetStore):
+    def __init__(self, bucket: str) -> None:
+        self.bucket = bucket
+
+    def _bucket(self) -> Any:
+        from backend.app.db import supabase
+
+        return supabase.storage.from_(self.bucket)
+
+    async def exists(self, asset_hash: str) -> bool:
+        try:
+            return bool(await run_db(self._bucket().exists, asset_hash))
+        except Exception:
+            return False
+
+    async def save(self, asset_hash: str, asset: Asset) -> None:
+        await run_db(
+            self._bucket().upload,
+            asset_hash,
+            asset.data,
+            {"content-type": asset.content_type, "upsert": "true"},
+        )
+
+    async def load(self, asset_hash: str) -> Optional[Asset]:
+        try:
+            data = await run_db(self._bucket().download, asset_hash)
+        except Exception:
+            return None
+
+        content_type = DEFAULT_CONTENT_TYPE
+        try:
+            info = await run_db(self._bucket().info, asset_hash)
+            if isinstance(info, dict):
+                content_type = info.get("content_type") or info.get("contentType") or content_type
+        except Exception:
+            pass
+
+        return Asset(data=data, content_type=content_type)
+
+
+def create_store() -> AssetStore:
+    if ASSET_STORAGE_BACKEND == "supabase":
+        return SupabaseAssetStore(ASSET_STORAGE_BUCKET)
+    return LocalAssetStore(ASSET_STORAGE_DIR)
+
+
+def get_store() -> AssetStore:
+    global _store
+    if _store is None:
+        _store = create_store()
+    return _store
+
+
+def set_store(store: Optional[AssetStore]) -> None:
+    """Подменяет хранилище (например, на LocalAssetStore во временном каталоге в тестах)."""
+    global _store
+    _store = store
+    _asset_cache.clear()
+
+
+def hash_asset(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def is_valid_asset_hash(value: str) -> bool:
+    return bool(ASSET_HASH_PATTERN.match(value))
+
+
+def parse_data_uri(value: str) -> Optional[Asset]:
+    if not value.startswith("data:"):
+        return None
+
+    header, separator, payload = value[5:].partition(",")
+    if not separator:
+        return None
+
+    params = [param.strip().lower() for param in header.split(";")]
+    content_type = params[0] or "text/plain"
+    is_base64 = "base64" in params[1:]
+
+    # Отсекаем заведомо большие данные ещё до декодирования.
+    encoded_limit = ASSET_MAX_BYTES * 4 // 3 + 4 if is_base64 else ASSET_MAX_BYTES * 3
+    if len(payload) > encoded_limit:
+        raise HTTPException(status_code=413, detail="Изображение слишком большое.")
+
+    try:
+        if is_base64:
+            data = base64.b64decode(payload, validate=False)
+        else:
+            data = unquote_to_bytes(payload)
+    except (binascii.Error, ValueError):
+        return None
+
+    if len(data) > ASSET_MAX_BYTES:
+        raise HTTPException(status_code=413, detail="Изображение слишком большое.")
+
+    return Asset(data=data, content_type=content_type)
+
+
+def is_safe_image(asset: Asset) -> bool:
+    if asset.content_type not in ALLOWED_IMAGE_TYPES:
+        return False
+    if asset.content_type == SVG_CONTENT_TYPE:
+        return SVG_FORBIDDEN_PATTERN.search(asset.data) is None
+    return True
+
+
+def remember_asset(asset_hash: str, asset: Asset) -> None:
+    _asset_cache[asset_hash] = asset
+    _asset_cache.move_to_end(asset_hash)
+    while len(_asset_cache) > ASSET_CACHE_MAX_ENTRIES:
+        _asset_cache.popitem(last=False)
+
+
+async def store_asset(asset: Asset) -> str:
+    asset_hash = hash_asset(asset.data)
+    if asset_hash not in _asset_cache:
+        store = get_store()
+        if not await store.exists(asset_hash):
+            await store.save(asset_hash, asset)
+        remember_asset(asset_hash, asset)
+    return asset_hash
+
+
+async def get_asset(asset_hash: str) -> Optional[Asset]:
+    cached = _asset_cache.get(asset_hash)
+    if cached is not None:
+        _asset_cache.move_to_end(asset_hash)
+        return cached
+
+    asset = await get_store().load(asset_hash)
+    if asset is not None:
+        remember_asset(asset_hash, asset)
+    return asset
+
+
+async def externalize_image(value: Any) -> Any:
+    """Заменяет data URI картинкой в хранилище и возвращает короткую ссылку на неё."""
+    if not isinstance(value, str) or not value.startswith("data:"):
+        return value
+
+    asset = parse_data_uri(value)
+    if asset is None or not is_safe_image(asset):
+        return None
+
+    asset_hash = await store_asset(asset)
+    return f"{ASSET_URL_PREFIX}{asset_hash}"
+
+
+async def externalize_item_images(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    externalized: List[Dict[str, Any]] = []
+    for item in items:
+        image = item.get("image")
+        if isinstance(image, str) and image.startswith("data:"):
+            item = {**item, "image": await externalize_image(image)}
+        externalized.append(item)
+    return externalized
@@ -1,12 +1,42 @@
-﻿from typing import Dict, Any
+﻿import asyncio
+import time
+from typing import Dict, Any, Optional, Tuple
+
+import httpx
+import jwt
 from fastapi import HTTPException, Header
 
-from backend.app.db import supabase
+from backend.app.config import (
+    AUTH_ROLE_CLAIM,
+    AUTH_VERIFICATION_MODE,
+    SUPABASE_JWKS_URL,
+    SUPABASE_JWT_AUDIENCE,
+    SUPABASE_JWT_SECRET,
+)
+from backend.app.services import repository
 from backend.app.services.db_service import to_dict
 
 
 ADMIN_FLAG_KEYS = {"is_admin", "admin", "role"}
 
+JWKS_CACHE_TTL_SECONDS = 600
+JWKS_MIN_REFRESH_INTERVAL_SECONDS = 30
+ASYMMETRIC_ALGORITHMS = {"RS256", "ES256"}
+CLAIM_USER_FIELDS = ("email", "phone", "role", "aud", "is_anonymous")
+
+# Роль из JWT — только подсказка, решает profiles.role. Кэш свой у каждого воркера,
+# поэтому снятие роли администратора в Supabase вступает в силу не позже чем через
+# TTL (в этом процессе — сразу после invalidate_user_role). Пока profiles
+# недоступен, действует роль из токена — до истечения его срока.
+ROLE_CACHE_TTL_SECONDS = 60
+# Отсутствие профиля кэшируем короче, чтобы новый администратор не ждал долго.
+ROLE_CACHE_NEGATIVE_TTL_SECONDS = 15
+ROLE_CACHE_MAX_ENTRIES = 10_000
+
+_jwks_cache: Dict[str, Any] = {"timestamp": 0.0, "keys": {}}
+_jwks_lock = asyncio.Lock()
+_role_cache: Dict[str, Tuple[float, Optional[str]]] = {}
+
 
 def extract_token(authorization: str | None) -> str:
     if not authorization:
@@ -19,11 +49,103 @@ def extract_token(authorization: str | None) -> str:
     return token
 
 
-async def current_user(authorization: str = Header(default=None)) -> Dict[str, Any]:
-    token = extract_token(authorization)
+async def fetch_jwks() -> Dict[str, Any]:
+    async with httpx.AsyncClient(timeout=10.0) as client:
+        response = await client.get(SUPABASE_JWKS_URL)
+    response.raise_for_status()
+
+    keys: Dict[str, Any] = {}
+    for entry in response.json().get("keys") or []:
+        if not isinstance(entry, dict) or not entry.get("kid"):
+            continue
+        try:
+            keys[entry["kid"]] = jwt.PyJWK(entry)
+        except jwt.PyJWTError:
+            continue
+    return keys
+
+
+async def get_signing_key(kid: Optional[str]) -> Optional[Any]:
+    """
+    Ключ из закэшированного JWKS. Неизвестный kid (ротация ключей) приводит
+    к перечитыванию JWKS, но не чаще раза в JWKS_MIN_REFRESH_INTERVAL_SECONDS.
+    """
+    if not kid:
+        return None
+
+    async with _jwks_lock:
+        age = time.monotonic() - _jwks_cache["timestamp"]
+        keys = _jwks_cache["keys"]
+        stale = age >= JWKS_CACHE_TTL_SECONDS or (kid not in keys and age >= JWKS_MIN_REFRESH_INTERVAL_SECONDS)
+        if stale:
+            try:
+                keys = await fetch_jwks()
+            except Exception as exc:
+                print(f"Не удалось получить JWKS Supabase: {exc}")
+            else:
+                _jwks_cache["keys"] = keys
+            _jwks_cache["timestamp"] = time.monotonic()
+
+    return keys.get(kid)
+
 
+def user_from_claims(claims: Dict[str, Any]) -> Dict[str, Any]:
+    user: Dict[str, Any] = {"id": claims["sub"]}
+    for field in CLAIM_USER_FIELDS:
+        if field in claims:
+            user[field] = claims[field]
+
+    for field in ("user_metadata", "app_metadata"):
+        value = claims.get(field)
+        user[field] = value if isinstance(value, dict) else {}
+
+    # Роль из custom access token hook Supabase; доверяем ей только для проверенного токена.
+    claimed_role = claims.get(AUTH_ROLE_CLAIM)
+    if isinstance(claimed_role, str):
+        user["claimed_role"] = claimed_role
+
+    return user
+
+
+async def verify_token_locally(token: str) -> Optional[Dict[str, Any]]:
+    """
+    Проверяет подпись и срок действия токена без обращения к Supabase.
+    Возвращает None, если подходящего ключа нет и нужна удалённая проверка.
+    """
     try:
-        response = supabase.auth.get_user(token)
+        header = jwt.get_unverified_header(token)
+    except jwt.PyJWTError as exc:
+        raise HTTPException(status_code=401, detail="Invalid or expired token.") from exc
+
+    algorithm = header.get("alg")
+    if algorithm == "HS256":
+        if not SUPABASE_JWT_SECRET:
+            return None
+        key: Any = SUPABASE_JWT_SECRET
+    elif algorithm in ASYMMETRIC_ALGORITHMS:
+        key = await get_signing_key(header.get("kid"))
+        if key is None:
+            return None
+    else:
+        raise HTTPException(status_code=401, detail="Invalid or expired token.")
+
+    try:
+        claims = jwt.decode(
+            token,
+            key,
+            algorithms=[algorithm],
+            audience=SUPABASE_JWT_AUDIENCE,
+            options={"require": ["exp", "sub"]},
+        )
+    except jwt.PyJWTError as exc:
+        raise HTTPException(status_code=401, detail="Invalid or expired token.") from exc
+
+    return user_from_claims(claims)
+
+
+async def fetch_remote_user(token: str) -> Dict[str, Any]:
+    try:
+        response = await repository.get_auth_user(token)
     except Exception as exc:
         raise HTTPException(status_code=401, detail="Invalid or expired token.") from exc
 
@@ -34,34 +156,98 @@ async def current_user(authorization: str = Header(default=None)) -> Dict[str, A
     return user_dict
 
 
-def is_admin(user: Dict[str, Any]) -> bool:
+async def current_user(authorization: str = Header(default=None)) -> Dict[str, Any]:
+    token = extract_token(authorization)
+
+    if AUTH_VERIFICATION_MODE == "local":
+        user = await verify_token_locally(token)
+        if user is not None:
+            return user
+
+    return await fetch_remote_user(token)
+
+
+async def current_user_fresh(authorization: str = Header(default=None)) -> Dict[str, Any]:
+    """Пользователь из Supabase Auth — для обработчиков, которым нужен актуальный профиль."""
+    token = extract_token(authorization)
+    return await fetch_remote_user(token)
+
+
+def role_cache_ttl(role: Optional[str]) -> float:
+    return ROLE_CACHE_TTL_SECONDS if role is not None else ROLE_CACHE_NEGATIVE_TTL_SECONDS
+
+
+def get_cached_role(user_id: str) -> Tuple[bool, Optional[str]]:
+    """Возвращает (найдено в кэше, роль); роль None — профиля или роли нет."""
+    entry = _role_cache.get(user_id)
+    if entry is None:
+        return False, None
+
+    timestamp, role = entry
+    if time.monotonic() - timestamp >= role_cache_ttl(role):
+        _role_cache.pop(user_id, None)
+        return False, None
+
+    return True, role
+
+
+def cache_role(user_id: str, role: Optional[str]) -> None:
+    if len(_role_cache) >= ROLE_CACHE_MAX_ENTRIES:
+        now = time.monotonic()
+        expired = [key for key, (timestamp, cached) in _role_cache.items() if now - timestamp >= role_cache_ttl(cached)]
+        for key in expired:
+            _role_cache.pop(key, None)
+        if len(_role_cache) >= ROLE_CACHE_MAX_ENTRIES:
+            _role_cache.pop(next(iter(_role_cache)), None)
+
+    _role_cache[user_id] = (time.monotonic(), role)
+
+
+def invalidate_user_role(user_id: Any) -> None:
+    """Сбрасывает закэшированную роль — вызывать при любом изменении профиля пользователя."""
+    if user_id:
+        _role_cache.pop(str(user_id), None)
+
+
+async def resolve_profile_role(user_id: str) -> Optional[str]:
+    found, role = get_cached_role(user_id)
+    if found:
+        return role
+
+    response = await repository.select_profile_role(user_id)
+    rows = getattr(response, "data", None) or []
+    role = rows[0].get("role") if rows else None
+    role = role if isinstance(role, str) else None
+
+    cache_role(user_id, role)
+    return role
+
+
+async def is_admin(user: Dict[str, Any]) -> bool:
     """
-    1. Сначала пробуем прочитать роль из public.profiles
-    2. Если не получилось / нет записи — падаем обратно на user_metadata
+    1. Роль из public.profiles (с кэшем на ROLE_CACHE_TTL_SECONDS)
+    2. Если profiles недоступен — роль из JWT (AUTH_ROLE_CLAIM) проверенного токена
+    3. Если не получилось / нет записи — падаем обратно на user_metadata
     """
 
     user_id = user.get("id")
+    claimed_role = user.get("claimed_role")
+    claimed_admin = isinstance(claimed_role, str) and claimed_role.lower() == "admin"
 
-    # 1) Пробуем взять роль из таблицы profiles
+    # 1) Пробуем взять роль из таблицы profiles; роль в токене могла устареть
     if user_id:
         try:
-            response = (
-                supabase.table("profiles")
-                .select("role")
-                .eq("id", user_id)
-                .limit(1)
-                .execute()
-            )
-            rows = getattr(response, "data", None) or []
-            if rows:
-                role = rows[0].get("role")
-                if isinstance(role, str) and role.lower() == "admin":
-                    return True
+            role = await resolve_profile_role(str(user_id))
+            if role is not None and role.lower() == "admin":
+                return True
         except Exception as exc:
             # Логируем, но не ломаемся — просто пойдём по старой логике
             print(f"Не удалось получить профиль для проверки администратора: {exc}")
+            # 2) Роль из проверенного JWT — только когда profiles недоступен
+            if claimed_admin:
+                return True
 
-    # 2) Старое поведение: смотрим в user_metadata
+    # 3) Старое поведение: смотрим в user_metadata
     metadata = user.get("user_metadata") or {}
     if not isinstance(metadata, dict):
         return False
@@ -87,7 +273,7 @@ def is_admin(user: Dict[str, Any]) -> bool:
 async def current_admin(authorization: str = Header(default=None)) -> Dict[str, Any]:
     user = await current_user(authorization=authorization)
 
-    if not is_admin(user):
+    if not await is_admin(user):
         raise HTTPException(status_code=403, detail="Недостаточно прав для выполнения действия.")
 
     return user
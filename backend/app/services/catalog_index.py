@@ -0,0 +1,396 @@
+import hashlib
+import heapq
+import json
+import math
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from backend.app.services.catalog_table import ProductTable
+
+NGRAM_SIZE = 3
+PAGE_CACHE_MAX_ENTRIES = 512
+
+
+def normalize_text(value: Optional[str]) -> str:
+    """Приводит строку к виду для поиска: casefold, ё → е, схлопнутые пробелы."""
+    if not value:
+        return ""
+    folded = value.casefold().replace("ё", "е")
+    return " ".join(folded.split())
+
+
+def dump_json(payload: Any) -> bytes:
+    # Те же параметры, что у JSONResponse в Starlette.
+    return json.dumps(payload, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def content_hash(payload: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(payload, digest_size=8).digest(), "big")
+
+
+def ngrams(value: str, size: int = NGRAM_SIZE) -> Set[str]:
+    if len(value) < size:
+        return set()
+    return {value[index:index + size] for index in range(len(value) - size + 1)}
+
+
+@dataclass(frozen=True)
+class CatalogQuery:
+    group_id: Optional[str] = None
+    include_subgroups: bool = True
+    search: Optional[str] = None
+    sort: Optional[str] = None
+    descending: bool = False
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+    min_quantity: Optional[float] = None
+
+
+def value_bounds(values: Sequence[float], low: Optional[float], high: Optional[float]) -> Tuple[int, int]:
+    """Границы среза отсортированных values, попадающего в [low, high]."""
+    start = bisect_left(values, low) if low is not None else 0
+    stop = bisect_right(values, high) if high is not None else len(values)
+    return start, max(start, stop)
+
+
+class CatalogSnapshot:
+    """
+    Снимок каталога с индексами, которые строятся один раз на каждое обновление
+    данных из Evotor:
+
+    - products — колонки товаров (ProductTable), словари собираются только для страницы ответа;
+    - group_positions — позиции товаров по группам (parent_id);
+    - дерево групп с числом товаров в каждом узле и множества потомков групп;
+    - postings — триграммный индекс для поиска по подстроке;
+    - sort_orders — позиции, отсортированные по цене, названию и остатку,
+      вместе с отсортированными значениями для бинарного поиска границ фильтров;
+    - page_cache — сериализованные страницы без поиска, живут до следующего обновления;
+    - content_digest — хэш содержимого (товары с позициями и группы) для ETag;
+      одинаковые данные дают одинаковый ETag в любом воркере.
+    """
+
+    def __init__(
+        self,
+        products: ProductTable,
+        groups: List[Dict[str, Any]],
+    ) -> None:
+        self.products = products
+        self.groups = groups
+        self.group_map: Dict[str, str] = {group["id"]: group["name"] for group in groups}
+
+        self.group_positions: Dict[Optional[str], Sequence[int]] = {}
+        self._build_group_positions()
+
+        self.group_children: Dict[Optional[str], List[str]] = {}
+        self.descendants: Dict[str, List[str]] = {}
+        self.group_tree: List[Dict[str, Any]] = []
+        self._subtree_positions: Dict[str, Sequence[int]] = {}
+        self._build_group_tree()
+
+        self.search_names: List[str] = []
+        self.search_groups: List[str] = []
+        self.postings: Dict[str, Sequence[int]] = {}
+        self._build_search_index()
+
+        self.sort_orders: Dict[str, Tuple[Sequence[int], Sequence[Any]]] = {}
+        self.page_cache: "OrderedDict[Tuple[CatalogQuery, int, int], bytes]" = OrderedDict()
+        self.groups_body: Optional[bytes] = None
+
+        self.row_digests = array("Q")
+        self.content_digest = 0
+        self._build_content_digest()
+
+    def render_item(self, position: int) -> Dict[str, Any]:
+        products = self.products
+        group_id = products.group_ids[position]
+        return {
+            "id": products.ids[position],
+            "name": products.names[position],
+            "price": products.prices[position],
+            "quantity": products.quantities[position],
+            "group_id": group_id,
+            "group_name": self.group_map.get(group_id),
+            "measure_name": products.measure_names[position],
+        }
+
+    @property
+    def etag(self) -> str:
+        return f'W/"{self.content_digest:016x}"'
+
+    def _row_digest(self, position: int) -> int:
+        # Позиция входит в хэш: порядок товаров определяет содержимое страниц.
+        row = self.render_item(position)
+        return content_hash(dump_json([position, row["id"], row["name"], row["price"], row["quantity"], row["group_id"], row["measure_name"]]))
+
+    def _build_content_digest(self) -> None:
+        digest = content_hash(dump_json(self.groups))
+        for position in range(len(self.products)):
+            row_digest = self._row_digest(position)
+            self.row_digests.append(row_digest)
+            digest ^= row_digest
+        self.content_digest = digest
+
+    def render_groups(self) -> bytes:
+        if self.groups_body is None:
+            self.groups_body = dump_json({"items": self.groups, "tree": self.group_tree})
+        return self.groups_body
+
+    def _build_group_positions(self) -> None:
+        grouped: Dict[Optional[str], List[int]] = {}
+        for position, group_id in enumerate(self.products.group_ids):
+            grouped.setdefault(group_id, []).append(position)
+        self.group_positions = {group_id: array("i", positions) for group_id, positions in grouped.items()}
+
+    def refresh_item(self, position: int) -> None:
+        """
+        Сбрасывает готовые страницы и сортировки по цене и остатку после изменения
+        товара на месте; индексы по названию и группе не меняются. Хэш строки
+        товара заменяется в content_digest, поэтому ETag меняется вместе с данными.
+        """
+        row_digest = self._row_digest(position)
+        self.content_digest ^= self.row_digests[position] ^ row_digest
+        self.row_digests[position] = row_digest
+        self.page_cache.clear()
+        self.sort_orders.pop("price", None)
+        self.sort_orders.pop("quantity", None)
+
+    def _build_group_tree(self) -> None:
+        known = set(self.group_map)
+        for group in self.groups:
+            parent_id = group.get("parent_id")
+            if parent_id not in known:
+                parent_id = None
+            self.group_children.setdefault(parent_id, []).append(group["id"])
+
+        groups_by_id = {group["id"]: group for group in self.groups}
+        visited: Set[str] = set()
+
+        def build(group_id: str) -> Dict[str, Any]:
+            visited.add(group_id)
+            children = [build(child_id) for child_id in self.group_children.get(group_id, []) if child_id not in visited]
+            product_count = len(self.group_positions.get(group_id, ()))
+            self.descendants[group_id] = [group_id] + [
+                descendant for child in children for descendant in self.descendants[child["id"]]
+            ]
+            return {
+                "id": group_id,
+                "name": groups_by_id[group_id]["name"],
+                "parent_id": groups_by_id[group_id].get("parent_id"),
+                "product_count": product_count,
+                "total_count": product_count + sum(child["total_count"] for child in children),
+                "children": children,
+            }
+
+        self.group_tree = [build(group_id) for group_id in self.group_children.get(None, [])]
+
+        # Группы, замкнутые в цикл через parent_id, не достижимы от корней — выводим их корнями.
+        for group in self.groups:
+            if group["id"] not in visited:
+                self.group_tree.append(build(group["id"]))
+
+    def subtree_positions(self, group_id: str) -> Sequence[int]:
+        """Позиции товаров группы и всех её подгрупп в порядке Evotor; считаются один раз на снимок."""
+        cached = self._subtree_positions.get(group_id)
+        if cached is not None:
+            return cached
+
+        group_ids = self.descendants.get(group_id, [group_id])
+        if len(group_ids) == 1:
+            positions = self.group_positions.get(group_id, ())
+        else:
+            positions = array("i", heapq.merge(*(self.group_positions.get(member, ()) for member in group_ids)))
+
+        self._subtree_positions[group_id] = positions
+        return positions
+
+    def group_positions_for(self, group_id: str, include_subgroups: bool) -> Sequence[int]:
+        if include_subgroups:
+            return self.subtree_positions(group_id)
+        return self.group_positions.get(group_id, ())
+
+    def _build_search_index(self) -> None:
+        postings: Dict[str, List[int]] = {}
+        for position, (name, group_id) in enumerate(zip(self.products.names, self.products.group_ids)):
+            name = normalize_text(name)
+            group_name = normalize_text(self.group_map.get(group_id))
+            self.search_names.append(name)
+            self.search_groups.append(group_name)
+
+            # Позиции добавляются по возрастанию, поэтому списки остаются отсортированными.
+            for gram in ngrams(name) | ngrams(group_name):
+                postings.setdefault(gram, []).append(position)
+
+        self.postings = {gram: array("i", positions) for gram, positions in postings.items()}
+
+    def _candidates(self, query: str) -> Iterable[int]:
+        grams = ngrams(query)
+        if not grams:
+            return range(len(self.products))
+
+        lists = sorted((self.postings.get(gram) for gram in grams), key=lambda entry: len(entry or ()))
+        if not lists[0]:
+            return ()
+
+        candidates = lists[0]
+        for entry in lists[1:]:
+            allowed = set(entry)
+            candidates = [position for position in candidates if position in allowed]
+            if not candidates:
+                break
+        return candidates
+
+    def _rank(self, position: int, query: str) -> int:
+        name = self.search_names[position]
+        index = name.find(query)
+        if index == 0:
+            return 0
+        if index < 0:
+            return 3
+        while index > 0:
+            if not name[index - 1].isalnum():
+                return 1
+            index = name.find(query, index + 1)
+        return 2
+
+    def search(self, query: str) -> List[int]:
+        """
+        Позиции товаров, у которых запрос входит в название или в название группы.
+        Сначала идут совпадения с началом названия, затем с началом слова,
+        затем остальные; внутри ранга сохраняется порядок Evotor.
+        """
+        normalized_query = normalize_text(query)
+        if not normalized_query:
+            return list(range(len(self.products)))
+
+        matches = [
+            position
+            for position in self._candidates(normalized_query)
+            if normalized_query in self.search_names[position] or normalized_query in self.search_groups[position]
+        ]
+        matches.sort(key=lambda position: self._rank(position, normalized_query))
+        return matches
+
+    def select(
+        self,
+        group_id: Optional[str] = None,
+        search: Optional[str] = None,
+        include_subgroups: bool = True,
+    ) -> Sequence[int]:
+        if search and search.strip():
+            positions = self.search(search)
+            if group_id:
+                allowed = set(self.group_positions_for(group_id, include_subgroups))
+                positions = [position for position in positions if position in allowed]
+            return positions
+
+        if group_id:
+            return self.group_positions_for(group_id, include_subgroups)
+
+        return range(len(self.products))
+
+    def sort_order(self, field: str) -> Tuple[Sequence[int], Sequence[Any]]:
+        """
+        Позиции товаров по возрастанию field (при равенстве — в порядке Evotor)
+        и значения field в том же порядке. Считается один раз на снимок.
+        """
+        cached = self.sort_orders.get(field)
+        if cached is not None:
+            return cached
+
+        if field == "name":
+            values: Sequence[Any] = self.search_names
+        elif field == "price":
+            values = self.products.prices
+        else:
+            values = self.products.quantities
+
+        order = array("i", sorted(range(len(self.products)), key=values.__getitem__))
+        if field == "name":
+            sorted_values: Sequence[Any] = [values[position] for position in order]
+        else:
+            sorted_values = array("d", (values[position] for position in order))
+
+        self.sort_orders[field] = (order, sorted_values)
+        return order, sorted_values
+
+    def filter_positions(
+        self,
+        positions: Sequence[int],
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        min_quantity: Optional[float] = None,
+    ) -> Sequence[int]:
+        if min_price is None and max_price is None and min_quantity is None:
+            return positions
+
+        prices = self.products.prices
+        quantities = self.products.quantities
+        return array(
+            "i",
+            (
+                position
+                for position in positions
+                if (min_price is None or prices[position] >= min_price)
+                and (max_price is None or prices[position] <= max_price)
+                and (min_quantity is None or quantities[position] >= min_quantity)
+            ),
+        )
+
+    def resolve(self, query: CatalogQuery) -> Sequence[int]:
+        """
+        Позиции товаров по запросу. Сортировка берётся из готовых sort_orders, а фильтр
+        по полю сортировки — срезом по бинарному поиску; остальные фильтры проверяют
+        колонки таблицы. С сортировкой порядок ранжирования поиска не учитывается.
+        """
+        base = self.select(query.group_id, query.search, query.include_subgroups)
+        min_price, max_price, min_quantity = query.min_price, query.max_price, query.min_quantity
+
+        if query.sort is None:
+            return self.filter_positions(base, min_price, max_price, min_quantity)
+
+        order, values = self.sort_order(query.sort)
+        start, stop = 0, len(order)
+        if query.sort == "price":
+            start, stop = value_bounds(values, min_price, max_price)
+            min_price = max_price = None
+        elif query.sort == "quantity":
+            start, stop = value_bounds(values, min_quantity, None)
+            min_quantity = None
+
+        ordered = order[start:stop]
+        if query.descending:
+            ordered = ordered[::-1]
+
+        if not isinstance(base, range):
+            allowed = set(base)
+            ordered = array("i", (position for position in ordered if position in allowed))
+
+        return self.filter_positions(ordered, min_price, max_price, min_quantity)
+
+    def page_payload(self, positions: Sequence[int], page: int, page_size: int) -> Dict[str, Any]:
+        total = len(positions)
+        start = (page - 1) * page_size
+        return {
+            "items": [self.render_item(position) for position in positions[start:start + page_size]],
+            "page": page,
+            "page_size": page_size,
+            "total": total,
+            "total_pages": math.ceil(total / page_size) if total else 0,
+        }
+
+    def render_page(self, query: CatalogQuery, page: int, page_size: int) -> bytes:
+        """JSON страницы каталога; повторные запросы отдаются из page_cache до следующего обновления."""
+        key = (query, page, page_size)
+        cached = self.page_cache.get(key)
+        if cached is not None:
+            self.page_cache.move_to_end(key)
+            return cached
+
+        body = dump_json(self.page_payload(self.resolve(query), page, page_size))
+        self.page_cache[key] = body
+        if len(self.page_cache) > PAGE_CACHE_MAX_ENTRIES:
+            self.page_cache.popitem(last=False)
+        return body
@@ -1,24 +1,68 @@
 import asyncio
 import math
 import time
-from typing import Any, Dict, List, Optional, Union
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple, Union
 import httpx
 from fastapi import HTTPException
 
-from backend.app.config import EVOTOR_STORE_UUID, EVOTOR_TOKEN
+from backend.app.config import EVOTOR_PRODUCT_CACHE_SECONDS, EVOTOR_STORE_UUID
+from backend.app.services import evotor_client
+from backend.app.services.catalog_index import CatalogSnapshot
+from backend.app.services.catalog_table import ProductTable
+from backend.app.services.catalog_store import (
+    decode_meta,
+    decode_snapshot,
+    encode_meta,
+    encode_snapshot,
+    get_catalog_store,
+)
 
-BASE_URL = "https://api.evotor.ru"
 PRODUCTS_PATH = f"/stores/{EVOTOR_STORE_UUID}/products"
 GROUPS_PATH = f"/stores/{EVOTOR_STORE_UUID}/product-groups"
 CACHE_TTL_SECONDS = 60
-HTTPX_TIMEOUT = httpx.Timeout(connect=10.0, read=30.0, write=10.0, pool=10.0)
-
-_products_cache: Dict[str, Any] = {"timestamp": 0.0, "data": []}
-_groups_cache: Dict[str, Any] = {"timestamp": 0.0, "data": []}
+# Как часто забираем из Evotor изменения товаров (since); полная перезагрузка — только сверка.
+CATALOG_REFRESH_INTERVAL_SECONDS = 15
+CATALOG_FULL_RELOAD_SECONDS = 900
+# Пауза между попытками фонового обновления, пока Evotor отвечает ошибками.
+CATALOG_REFRESH_RETRY_SECONDS = 10
+# Общее хранилище каталога (несколько воркеров): срок блокировок и ожидание чужой загрузки.
+CATALOG_LOCK_SECONDS = 60
+CATALOG_REFRESHER_LOCK_SECONDS = 4 * CATALOG_REFRESH_INTERVAL_SECONDS
+CATALOG_SHARED_WAIT_SECONDS = 30
+CATALOG_SHARED_POLL_SECONDS = 0.2
+PRODUCT_CACHE_MAX_ENTRIES = 1024
+_products_cache: Dict[str, Any] = {
+    "key": "products",
+    "version": 0.0,
+    "timestamp": 0.0,
+    "data": ProductTable(),
+    "loaded": False,
+    "error": None,
+    "error_at": 0.0,
+    "task": None,
+    "synced_at_ms": 0,
+}
+_groups_cache: Dict[str, Any] = {
+    "key": "groups",
+    "version": 0.0,
+    "timestamp": 0.0,
+    "data": [],
+    "loaded": False,
+    "error": None,
+    "error_at": 0.0,
+    "task": None,
+}
 
 _products_lock = asyncio.Lock()
 _groups_lock = asyncio.Lock()
 
+_snapshot: Optional[CatalogSnapshot] = None
+_refresher_task: Optional[asyncio.Task] = None
+
+_product_inflight: Dict[str, "asyncio.Task[Optional[Dict[str, Any]]]"] = {}
+_product_cache: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
 
 def paginate(items: List[Dict[str, Any]], page: int, page_size: int) -> List[Dict[str, Any]]:
     start = (page - 1) * page_size
@@ -26,16 +70,15 @@ def paginate(items: List[Dict[str, Any]], page: int, page_size: int) -> List[Dic
     return items[start:end]
 
 
-def build_headers() -> Dict[str, str]:
-    return {
-        "Authorization": f"Bearer {EVOTOR_TOKEN}",
-        "Accept": "application/json",
-    }
-
-
 def is_cache_valid(cache: Dict[str, Any]) -> bool:
     timestamp = cache.get("timestamp") or 0.0
-    return (time.monotonic() - float(timestamp)) < CACHE_TTL_SECONDS and cache.get("data")
+    return (time.monotonic() - float(timestamp)) < CACHE_TTL_SECONDS and cache.get("loaded")
+
+
+def cache_age(cache: Dict[str, Any]) -> Optional[float]:
+    if not cache.get("loaded"):
+        return None
+    return max(time.monotonic() - float(cache.get("timestamp") or 0.0), 0.0)
 
 
 def extract_next_cursor(payload: Dict[str, Any], previous: Optional[str]) -> Optional[str]:
@@ -47,50 +90,76 @@ def extract_next_cursor(payload: Dict[str, Any], previous: Optional[str]) -> Opt
     return None
 
 
-async def fetch_paginated(path: str) -> List[Dict[str, Any]]:
-    headers = build_headers()
-    collected: List[Dict[str, Any]] = []
-    cursor: Optional[str] = None
+async def fetch_page(path: str, params: Optional[Dict[str, Any]], cursor: Optional[str]) -> Dict[str, Any]:
+    page_params = dict(params or {})
+    if cursor:
+        page_params["cursor"] = cursor
+    try:
+        response = await evotor_client.request("GET", path, params=page_params or None)
+    except httpx.RequestError as exc:
+        raise HTTPException(status_code=502, detail="Не удалось подключиться к Evotor API.") from exc
 
-    async with httpx.AsyncClient(base_url=BASE_URL, timeout=HTTPX_TIMEOUT) as client:
-        while True:
-            params = {"cursor": cursor} if cursor else None
-            try:
-                response = await client.get(path, headers=headers, params=params)
-            except httpx.RequestError as exc:
-                raise HTTPException(status_code=502, detail="Не удалось подключиться к Evotor API.") from exc
+    if response.status_code == 401:
+        raise HTTPException(status_code=502, detail="Evotor API отклонил токен авторизации.")
+
+    if response.status_code >= 400:
+        raise HTTPException(
+            status_code=502,
+            detail=f"Evotor API вернул ошибку {response.status_code}.",
+        )
 
-            if response.status_code == 401:
-                raise HTTPException(status_code=502, detail="Evotor API отклонил токен авторизации.")
+    payload = response.json()
+    return payload if isinstance(payload, dict) else {}
 
-            if response.status_code >= 400:
-                raise HTTPException(
-                    status_code=502,
-                    detail=f"Evotor API вернул ошибку {response.status_code}.",
-                )
 
-            payload = response.json()
-            items = payload.get("items")
-            if isinstance(items, list):
-                collected.extend(item for item in items if isinstance(item, dict))
+async def iter_paginated(path: str, params: Optional[Dict[str, Any]] = None) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Элементы всех страниц Evotor по мере их получения. Как только из страницы
+    известен курсор, следующая уже запрашивается, пока вызывающий разбирает
+    текущую; в памяти держится не больше двух страниц.
+    """
+    cursor: Optional[str] = None
+    pending: Optional[asyncio.Task] = asyncio.create_task(fetch_page(path, params, cursor))
+
+    try:
+        while pending is not None:
+            payload = await pending
+            pending = None
 
             next_cursor = extract_next_cursor(payload, previous=cursor)
-            if not next_cursor:
-                break
+            if next_cursor:
+                cursor = next_cursor
+                pending = asyncio.create_task(fetch_page(path, params, cursor))
+
+            items = payload.get("items")
+            if isinstance(items, list):
+                for item in items:
+                    if isinstance(item, dict):
+                        yield item
+    finally:
+        if pending is not None:
+            if pending.done():
+                if not pending.cancelled():
+                    pending.exception()
+            else:
+                pending.cancel()
 
-            cursor = next_cursor
 
-    return collected
+async def fetch_paginated(path: str, params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    return [item async for item in iter_paginated(path, params)]
 
 
-def normalize_group(raw: Dict[str, Any]) -> Optional[Dict[str, str]]:
+def normalize_group(raw: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     group_id = raw.get("id")
     name = raw.get("name")
+    parent_id = raw.get("parent_id")
     if not isinstance(group_id, str) or not group_id:
         return None
     if not isinstance(name, str):
         name = ""
-    return {"id": group_id, "name": name.strip()}
+    if not isinstance(parent_id, str) or not parent_id or parent_id == group_id:
+        parent_id = None
+    return {"id": group_id, "name": name.strip(), "parent_id": parent_id}
 
 
 def normalize_product(raw: Dict[str, Any]) -> Optional[Dict[str, Any]]:
@@ -131,48 +200,428 @@ def normalize_product(raw: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     }
 
 
-async def get_product_groups(force_refresh: bool = False) -> List[Dict[str, str]]:
-    async with _groups_lock:
-        if not force_refresh and is_cache_valid(_groups_cache):
-            return _groups_cache["data"]
+async def load_product_groups() -> List[Dict[str, Any]]:
+    raw_groups = await fetch_paginated(GROUPS_PATH)
+    normalized = [normalize_group(group) for group in raw_groups]
+    return [group for group in normalized if group is not None]
 
-        raw_groups = await fetch_paginated(GROUPS_PATH)
-        normalized = [normalize_group(group) for group in raw_groups]
-        groups = [group for group in normalized if group is not None]
 
-        _groups_cache["data"] = groups
-        _groups_cache["timestamp"] = time.monotonic()
+async def load_products() -> ProductTable:
+    started_at_ms = int(time.time() * 1000)
+    products = ProductTable()
+    async for raw in iter_paginated(PRODUCTS_PATH):
+        product = normalize_product(raw)
+        if product is not None:
+            products.append(product)
+    _products_cache["synced_at_ms"] = started_at_ms
+    return products
 
-        return groups
 
+async def publish_shared(cache: Dict[str, Any], data_changed: bool = True) -> None:
+    """
+    Выкладывает кэш в общее хранилище: сжатый снимок (если данные менялись)
+    и короткую метку с версией и временем последней сверки с Evotor.
+    """
+    store = get_catalog_store()
+    if not store.shared:
+        return
+
+    meta = {"version": cache["version"], "checked_at": time.time() - (cache_age(cache) or 0.0)}
+    if "synced_at_ms" in cache:
+        meta["synced_at_ms"] = cache["synced_at_ms"]
+
+    try:
+        if data_changed:
+            data = cache["data"]
+            if isinstance(data, ProductTable):
+                data = data.to_payload()
+            await store.set(cache["key"], encode_snapshot({"version": cache["version"], "data": data}))
+        await store.set(f"{cache['key']}:meta", encode_meta(meta))
+    except Exception as exc:
+        print(f"Не удалось сохранить каталог в общее хранилище: {exc}")
+
+
+async def adopt_shared(cache: Dict[str, Any]) -> bool:
+    """
+    Подхватывает из общего хранилища то, что загрузил другой воркер. Снимок
+    скачивается, только если сменилась версия; иначе обновляется лишь возраст.
+    Возвращает True, если кэш стал свежее.
+    """
+    store = get_catalog_store()
+    if not store.shared:
+        return False
+
+    try:
+        meta_blob = await store.get(f"{cache['key']}:meta")
+        meta = decode_meta(meta_blob) if meta_blob else None
+        if meta is None:
+            return False
+
+        version = float(meta.get("version") or 0.0)
+        checked_at = float(meta.get("checked_at") or 0.0)
+        if cache.get("loaded") and version < cache["version"]:
+            return False
+        if cache.get("loaded") and version == cache["version"]:
+            timestamp = time.monotonic() - max(time.time() - checked_at, 0.0)
+            if timestamp <= cache["timestamp"]:
+                return False
+            cache["timestamp"] = timestamp
+            return True
+
+        snapshot_blob = await store.get(cache["key"])
+    except Exception as exc:
+        print(f"Не удалось прочитать каталог из общего хранилища: {exc}")
+        return False
+
+    payload = decode_snapshot(snapshot_blob) if snapshot_blob else None
+    data = payload.get("data") if payload is not None else None
+    if isinstance(data, dict):
+        data = ProductTable.from_payload(data)
+    elif not isinstance(data, list):
+        return False
+
+    cache["data"] = data
+    cache["version"] = float(payload.get("version") or version)
+    cache["timestamp"] = time.monotonic() - max(time.time() - checked_at, 0.0)
+    cache["loaded"] = True
+    cache["error"] = None
+    if "synced_at_ms" in cache:
+        cache["synced_at_ms"] = int(meta.get("synced_at_ms") or 0)
+    return True
+
+
+async def wait_for_shared(cache: Dict[str, Any]) -> bool:
+    deadline = time.monotonic() + CATALOG_SHARED_WAIT_SECONDS
+    while time.monotonic() < deadline:
+        await asyncio.sleep(CATALOG_SHARED_POLL_SECONDS)
+        if await adopt_shared(cache):
+            return True
+    return False
+
+
+async def refresh_cache(
+    cache: Dict[str, Any],
+    lock: asyncio.Lock,
+    loader: Callable[[], Awaitable[Any]],
+    force_refresh: bool = False,
+) -> Any:
+    async with lock:
+        # Пока ждали блокировку, кэш мог обновить другой запрос.
+        if not force_refresh and is_cache_valid(cache):
+            return cache["data"]
+
+        store = get_catalog_store()
+        token: Optional[str] = None
+        if store.shared:
+            if not force_refresh and await adopt_shared(cache) and is_cache_valid(cache):
+                return cache["data"]
+
+            try:
+                token = await store.acquire_lock(cache["key"], CATALOG_LOCK_SECONDS)
+                contended = token is None
+            except Exception as exc:
+                print(f"Общее хранилище каталога недоступно, обновляем каталог сами: {exc}")
+                contended = False
+
+            # Каталог уже грузит другой воркер — ждём его снимок вместо второго похода в Evotor.
+            if contended and (await wait_for_shared(cache) or cache.get("loaded")):
+                return cache["data"]
+
+        try:
+            try:
+                data = await loader()
+            except Exception as exc:
+                cache["error"] = exc
+                cache["error_at"] = time.monotonic()
+                raise
+
+            cache["data"] = data
+            cache["version"] = time.time()
+            cache["timestamp"] = time.monotonic()
+            cache["loaded"] = True
+            cache["error"] = None
+            await publish_shared(cache)
+        finally:
+            if token is not None:
+                try:
+                    await store.release_lock(cache["key"], token)
+                except Exception as exc:
+                    print(f"Не удалось снять блокировку каталога: {exc}")
+        return data
+
+
+async def _background_refresh(
+    cache: Dict[str, Any],
+    lock: asyncio.Lock,
+    loader: Callable[[], Awaitable[Any]],
+) -> None:
+    try:
+        await refresh_cache(cache, lock, loader)
+    except Exception as exc:
+        print(f"Не удалось обновить каталог Evotor, отдаём сохранённые данные: {exc}")
+    finally:
+        cache["task"] = None
+
+
+def schedule_refresh(
+    cache: Dict[str, Any],
+    lock: asyncio.Lock,
+    loader: Callable[[], Awaitable[Any]],
+) -> None:
+    if cache.get("error") is not None and time.monotonic() - cache["error_at"] < CATALOG_REFRESH_RETRY_SECONDS:
+        return
+    if cache.get("task") is None:
+        cache["task"] = asyncio.create_task(_background_refresh(cache, lock, loader))
+
+
+async def read_cache(
+    cache: Dict[str, Any],
+    lock: asyncio.Lock,
+    loader: Callable[[], Awaitable[Any]],
+    force_refresh: bool = False,
+) -> Any:
+    """
+    stale-while-revalidate: если снимок уже есть, он отдаётся сразу, а устаревший
+    обновляется в фоне. Ждать загрузки приходится только при холодном кэше
+    или явном force_refresh.
+    """
+    if force_refresh or not cache.get("loaded"):
+        return await refresh_cache(cache, lock, loader, force_refresh=force_refresh)
+
+    if not is_cache_valid(cache):
+        schedule_refresh(cache, lock, loader)
+
+    return cache["data"]
+
+
+async def get_product_groups(force_refresh: bool = False) -> List[Dict[str, Any]]:
+    return await read_cache(_groups_cache, _groups_lock, load_product_groups, force_refresh=force_refresh)
 
-async def get_products(force_refresh: bool = False) -> List[Dict[str, Any]]:
-    async with _products_lock:
-        if not force_refresh and is_cache_valid(_products_cache):
-            return _products_cache["data"]
 
-        raw_products = await fetch_paginated(PRODUCTS_PATH)
-        normalized = [normalize_product(product) for product in raw_products]
-        products = [product for product in normalized if product is not None]
+async def get_products(force_refresh: bool = False) -> ProductTable:
+    return await read_cache(_products_cache, _products_lock, load_products, force_refresh=force_refresh)
 
-        _products_cache["data"] = products
+
+async def get_catalog_snapshot() -> CatalogSnapshot:
+    """Снимок каталога с индексами; пересобирается, только когда обновились товары или группы."""
+    global _snapshot
+    products = await get_products()
+    groups = await get_product_groups()
+
+    snapshot = _snapshot
+    if snapshot is None or snapshot.products is not products or snapshot.groups is not groups:
+        snapshot = CatalogSnapshot(products, groups)
+        _snapshot = snapshot
+    return snapshot
+
+
+def catalog_staleness() -> Dict[str, Any]:
+    """Возраст снимков каталога и признак того, что последнее обновление не удалось."""
+    ages = [cache_age(cache) for cache in (_products_cache, _groups_cache)]
+    known_ages = [age for age in ages if age is not None]
+    return {
+        "age": max(known_ages) if known_ages else None,
+        "refresh_failed": any(cache.get("error") is not None for cache in (_products_cache, _groups_cache)),
+    }
+
+
+def apply_product_update(raw: Dict[str, Any]) -> None:
+    """
+    Применяет изменение одного товара к закэшированному каталогу без полной перезагрузки.
+
+    Если поменялись только остаток, цена или единица измерения, колонки таблицы
+    обновляются на месте, а в снимке сбрасываются готовые страницы. Появление,
+    исчезновение товара или смена названия/группы собирают новую таблицу,
+    и индексы снимка перестраиваются при следующем обращении.
+    """
+    product_id = raw.get("id")
+    if not isinstance(product_id, str) or not product_id or not _products_cache.get("loaded"):
+        return
+
+    products: ProductTable = _products_cache["data"]
+    normalized = normalize_product(raw)
+    position = products.positions.get(product_id)
+    if position is None and normalized is None:
+        return
+
+    if (
+        position is not None
+        and normalized is not None
+        and products.names[position] == normalized["name"]
+        and products.group_ids[position] == normalized.get("parent_id")
+    ):
+        products.update_in_place(position, normalized)
+        _products_cache["version"] = time.time()
+        if _snapshot is not None and _snapshot.products is products:
+            _snapshot.refresh_item(position)
+        return
+
+    _products_cache["data"] = products.replaced(position, normalized)
+    _products_cache["version"] = time.time()
+
+
+def apply_quantity_update(product_id: str, quantity: Union[float, int]) -> None:
+    products: ProductTable = _products_cache["data"]
+    position = products.positions.get(product_id)
+    if position is not None:
+        apply_product_update({**products.row(position), "quantity": quantity})
+
+
+async def sync_changed_products() -> int:
+    """Забирает из Evotor товары, изменённые с момента последней синхронизации, и применяет их."""
+    since_ms = int(_products_cache.get("synced_at_ms") or 0)
+    if not _products_cache.get("loaded") or not since_ms:
+        await refresh_cache(_products_cache, _products_lock, load_products, force_refresh=True)
+        return len(_products_cache["data"])
+
+    started_at_ms = int(time.time() * 1000)
+    changed = await fetch_paginated(PRODUCTS_PATH, params={"since": since_ms})
+
+    async with _products_lock:
+        version = _products_cache["version"]
+        for raw in changed:
+            apply_product_update(raw)
+        _products_cache["synced_at_ms"] = started_at_ms
         _products_cache["timestamp"] = time.monotonic()
+        _products_cache["error"] = None
+        await publish_shared(_products_cache, data_changed=_products_cache["version"] != version)
 
-        return products
+    return len(changed)
 
 
-def _invalidate_products_cache() -> None:
-    _products_cache["timestamp"] = 0.0
+async def acquire_refresher_role(token: Optional[str]) -> Optional[str]:
+    """
+    С Evotor по расписанию работает один воркер — держатель блокировки refresher;
+    остальные только подхватывают его снимки из общего хранилища.
+    """
+    try:
+        return await get_catalog_store().acquire_lock("refresher", CATALOG_REFRESHER_LOCK_SECONDS, token)
+    except Exception as exc:
+        print(f"Общее хранилище каталога недоступно, обновляем каталог сами: {exc}")
+        return token or "local"
 
 
-async def fetch_product(product_id: str) -> Optional[Dict[str, Any]]:
-    headers = build_headers()
+async def _refresh_from_evotor(last_full_reload: float) -> float:
+    try:
+        if not is_cache_valid(_groups_cache):
+            await refresh_cache(_groups_cache, _groups_lock, load_product_groups, force_refresh=True)
+    except Exception as exc:
+        print(f"Не удалось обновить группы Evotor: {exc}")
+
+    try:
+        if time.monotonic() - last_full_reload >= CATALOG_FULL_RELOAD_SECONDS:
+            await refresh_cache(_products_cache, _products_lock, load_products, force_refresh=True)
+            last_full_reload = time.monotonic()
+        else:
+            await sync_changed_products()
+    except Exception as exc:
+        print(f"Не удалось обновить товары Evotor: {exc}")
+
+    return last_full_reload
+
+
+async def _refresh_loop() -> None:
+    last_full_reload = float("-inf")
+    refresher_token: Optional[str] = None
+    while True:
+        refresher_token = await acquire_refresher_role(refresher_token)
+        if refresher_token is not None:
+            last_full_reload = await _refresh_from_evotor(last_full_reload)
+        else:
+            for cache, lock in ((_groups_cache, _groups_lock), (_products_cache, _products_lock)):
+                async with lock:
+                    await adopt_shared(cache)
 
-    async with httpx.AsyncClient(base_url=BASE_URL, timeout=HTTPX_TIMEOUT) as client:
         try:
-            response = await client.get(f"{PRODUCTS_PATH}/{product_id}", headers=headers)
-        except httpx.RequestError as exc:
-            raise HTTPException(status_code=502, detail="Не удалось получить товар в Evotor.") from exc
+            await get_catalog_snapshot()
+        except Exception as exc:
+            print(f"Не удалось построить индексы каталога: {exc}")
+        await asyncio.sleep(CATALOG_REFRESH_INTERVAL_SECONDS)
+
+
+async def start_catalog_refresher() -> None:
+    """Прогревает каталог при старте и дальше обновляет его по расписанию, не дожидаясь запросов."""
+    global _refresher_task
+    if _refresher_task is None:
+        _refresher_task = asyncio.create_task(_refresh_loop())
+
+
+async def stop_catalog_refresher() -> None:
+    global _refresher_task
+    if _refresher_task is None:
+        return
+
+    _refresher_task.cancel()
+    try:
+        await _refresher_task
+    except asyncio.CancelledError:
+        pass
+    _refresher_task = None
+
+
+def cached_product(product_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Товар не старше EVOTOR_PRODUCT_CACHE_SECONDS: из недавнего ответа Evotor либо
+    из каталога, если тот синхронизирован достаточно недавно. При нуле кэш выключен.
+    """
+    if EVOTOR_PRODUCT_CACHE_SECONDS <= 0:
+        return None
+
+    entry = _product_cache.get(product_id)
+    if entry is not None:
+        if time.monotonic() - entry[0] < EVOTOR_PRODUCT_CACHE_SECONDS:
+            return entry[1]
+        del _product_cache[product_id]
+
+    age = cache_age(_products_cache)
+    if age is not None and age < EVOTOR_PRODUCT_CACHE_SECONDS:
+        products: ProductTable = _products_cache["data"]
+        position = products.positions.get(product_id)
+        if position is not None:
+            return products.row(position)
+
+    return None
+
+
+def remember_product(product_id: str, product: Dict[str, Any]) -> None:
+    if EVOTOR_PRODUCT_CACHE_SECONDS <= 0:
+        return
+    _product_cache[product_id] = (time.monotonic(), product)
+    _product_cache.move_to_end(product_id)
+    while len(_product_cache) > PRODUCT_CACHE_MAX_ENTRIES:
+        _product_cache.popitem(last=False)
+
+
+async def fetch_product(product_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Товар из Evotor. Одновременные запросы одного товара объединяются в один GET;
+    каждый вызывающий получает свою копию ответа.
+    """
+    product = cached_product(product_id)
+    if product is not None:
+        return dict(product)
+
+    task = _product_inflight.get(product_id)
+    if task is None:
+        task = asyncio.create_task(load_product(product_id))
+        _product_inflight[product_id] = task
+
+        def forget(done: "asyncio.Task[Optional[Dict[str, Any]]]") -> None:
+            if _product_inflight.get(product_id) is done:
+                del _product_inflight[product_id]
+
+        task.add_done_callback(forget)
+
+    # shield: отмена одного ожидающего не должна отменять запрос для остальных.
+    product = await asyncio.shield(task)
+    return dict(product) if product is not None else None
+
+
+async def load_product(product_id: str) -> Optional[Dict[str, Any]]:
+    try:
+        response = await evotor_client.request("GET", f"{PRODUCTS_PATH}/{product_id}")
+    except httpx.RequestError as exc:
+        raise HTTPException(status_code=502, detail="Не удалось получить товар в Evotor.") from exc
 
     if response.status_code == 404:
         return None
@@ -187,7 +636,11 @@ async def fetch_product(product_id: str) -> Optional[Dict[str, Any]]:
         )
 
     payload = response.json()
-    return payload if isinstance(payload, dict) else None
+    if not isinstance(payload, dict):
+        return None
+
+    remember_product(product_id, payload)
+    return payload
 
 
 async def update_product_quantity(product_id: str, quantity: Union[float, int]) -> None:
@@ -207,17 +660,16 @@ async def update_product_quantity(product_id: str, quantity: Union[float, int])
     else:
         payload_quantity = round(quantity_value, 6)
 
-    headers = build_headers()
-
-    async with httpx.AsyncClient(base_url=BASE_URL, timeout=HTTPX_TIMEOUT) as client:
-        try:
-            response = await client.patch(
-                f"{PRODUCTS_PATH}/{product_id}",
-                headers=headers,
-                json={"quantity": payload_quantity},
-            )
-        except httpx.RequestError as exc:
-            raise HTTPException(status_code=502, detail="Не удалось обновить товар в Evotor.") from exc
+    try:
+        # PATCH задаёт абсолютный остаток, поэтому повтор после сбоя безопасен.
+        response = await evotor_client.request(
+            "PATCH",
+            f"{PRODUCTS_PATH}/{product_id}",
+            json={"quantity": payload_quantity},
+            idempotent=True,
+        )
+    except httpx.RequestError as exc:
+        raise HTTPException(status_code=502, detail="Не удалось обновить товар в Evotor.") from exc
 
     if response.status_code == 401:
         raise HTTPException(status_code=502, detail="Evotor API отклонил токен авторизации.")
@@ -228,4 +680,13 @@ async def update_product_quantity(product_id: str, quantity: Union[float, int])
             detail=f"Evotor API вернул ошибку {response.status_code} при обновлении товара.",
         )
 
-    _invalidate_products_cache()
+    try:
+        payload = response.json()
+    except ValueError:
+        payload = None
+
+    _product_cache.pop(product_id, None)
+    if isinstance(payload, dict) and payload.get("id") == product_id:
+        apply_product_update(payload)
+    else:
+        apply_quantity_update(product_id, payload_quantity)
@@ -0,0 +1,158 @@
+import json
+import uuid
+import zlib
+from typing import Any, Dict, Optional
+
+from backend.app.config import CATALOG_CACHE_BACKEND, CATALOG_REDIS_URL
+
+KEY_PREFIX = "evotor-catalog:"
+
+_store: Optional["CatalogStore"] = None
+
+
+def encode_snapshot(payload: Dict[str, Any]) -> bytes:
+    raw = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return zlib.compress(raw, 6)
+
+
+def decode_snapshot(blob: bytes) -> Optional[Dict[str, Any]]:
+    try:
+        payload = json.loads(zlib.decompress(blob))
+    except (zlib.error, ValueError):
+        return None
+    return payload if isinstance(payload, dict) else None
+
+
+def encode_meta(meta: Dict[str, Any]) -> bytes:
+    return json.dumps(meta, separators=(",", ":")).encode("utf-8")
+
+
+def decode_meta(blob: bytes) -> Optional[Dict[str, Any]]:
+    try:
+        meta = json.loads(blob)
+    except ValueError:
+        return None
+    return meta if isinstance(meta, dict) else None
+
+
+class CatalogStore:
+    """
+    Хранилище снимков каталога. shared=True означает, что снимки и блокировки
+    видны всем воркерам и с Evotor должен работать только один из них.
+    """
+
+    shared = False
+
+    async def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: bytes) -> None:
+        raise NotImplementedError
+
+    async def acquire_lock(self, key: str, ttl: float, token: Optional[str] = None) -> Optional[str]:
+        """
+        Берёт блокировку на ttl секунд (или продлевает свою, если передан token).
+        Возвращает token владельца либо None, если блокировку держит другой воркер.
+        """
+        raise NotImplementedError
+
+    async def release_lock(self, key: str, token: str) -> None:
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        return None
+
+
+class MemoryCatalogStore(CatalogStore):
+    """Каталог живёт только в памяти процесса; подходит для одного воркера."""
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return None
+
+    async def set(self, key: str, value: bytes) -> None:
+        return None
+
+    async def acquire_lock(self, key: str, ttl: float, token: Optional[str] = None) -> Optional[str]:
+        return token or uuid.uuid4().hex
+
+    async def release_lock(self, key: str, token: str) -> None:
+        return None
+
+
+class RedisCatalogStore(CatalogStore):
+    """
+    Снимки и блокировки в Redis. Принимает клиент redis.asyncio, поэтому
+    в тестах вместо него можно передать fakeredis.aioredis.FakeRedis().
+    """
+
+    shared = True
+
+    _EXTEND_SCRIPT = """
+    if redis.call('get', KEYS[1]) == ARGV[1] then
+        return redis.call('pexpire', KEYS[1], ARGV[2])
+    end
+    return 0
+    """
+    _RELEASE_SCRIPT = """
+    if redis.call('get', KEYS[1]) == ARGV[1] then
+        return redis.call('del', KEYS[1])
+    end
+    return 0
+    """
+
+    def __init__(self, client: Any) -> None:
+        self.client = client
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.client.get(KEY_PREFIX + key)
+
+    async def set(self, key: str, value: bytes) -> None:
+        await self.client.set(KEY_PREFIX + key, value)
+
+    async def acquire_lock(self, key: str, ttl: float, token: Optional[str] = None) -> Optional[str]:
+        lock_key = f"{KEY_PREFIX}lock:{key}"
+        ttl_ms = max(int(ttl * 1000), 1)
+
+        if token is not None and await self.client.eval(self._EXTEND_SCRIPT, 1, lock_key, token, ttl_ms):
+            return token
+
+        candidate = uuid.uuid4().hex
+        if await self.client.set(lock_key, candidate, nx=True, px=ttl_ms):
+            return candidate
+        return None
+
+    async def release_lock(self, key: str, token: str) -> None:
+        await self.client.eval(self._RELEASE_SCRIPT, 1, f"{KEY_PREFIX}lock:{key}", token)
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+def create_catalog_store() -> CatalogStore:
+    if CATALOG_CACHE_BACKEND == "redis":
+        try:
+            from redis import asyncio as redis_asyncio
+        except ImportError as exc:
+            raise RuntimeError("Для CATALOG_CACHE_BACKEND=redis нужен установленный пакет redis.") from exc
+        return RedisCatalogStore(redis_asyncio.from_url(CATALOG_REDIS_URL))
+    return MemoryCatalogStore()
+
+
+def get_catalog_store() -> CatalogStore:
+    global _store
+    if _store is None:
+        _store = create_catalog_store()
+    return _store
+
+
+def set_catalog_store(store: Optional[CatalogStore]) -> None:
+    """Подменяет хранилище каталога (например, на RedisCatalogStore поверх fakeredis в тестах)."""
+    global _store
+    _store = store
+
+
+async def close_catalog_store() -> None:
+    global _store
+    if _store is not None:
+        await _store.close()
+    _store = None
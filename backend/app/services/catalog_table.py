@@ -0,0 +1,124 @@
+import sys
+from array import array
+from typing import Any, Dict, Iterable, List, Optional
+
+
+def intern_optional(value: Any) -> Optional[str]:
+    return sys.intern(value) if isinstance(value, str) else None
+
+
+class ProductTable:
+    """
+    Товары каталога по колонкам вместо словаря на каждый товар: цена и остаток
+    лежат в array('d'), идентификаторы групп и единицы измерения интернированы
+    и повторяются ссылками. Словарь товара собирается только в row() — когда
+    он попадает в ответ.
+    """
+
+    __slots__ = ("ids", "names", "prices", "quantities", "group_ids", "measure_names", "positions")
+
+    def __init__(self) -> None:
+        self.ids: List[str] = []
+        self.names: List[str] = []
+        self.prices = array("d")
+        self.quantities = array("d")
+        self.group_ids: List[Optional[str]] = []
+        self.measure_names: List[Optional[str]] = []
+        self.positions: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def from_products(cls, products: Iterable[Optional[Dict[str, Any]]]) -> "ProductTable":
+        table = cls()
+        for product in products:
+            if product is not None:
+                table.append(product)
+        return table
+
+    def append(self, product: Dict[str, Any]) -> None:
+        self.positions[product["id"]] = len(self.ids)
+        self.ids.append(product["id"])
+        self.names.append(product["name"])
+        self.prices.append(product["price"])
+        self.quantities.append(product["quantity"])
+        self.group_ids.append(intern_optional(product.get("parent_id")))
+        self.measure_names.append(intern_optional(product.get("measure_name")))
+
+    def row(self, position: int) -> Dict[str, Any]:
+        return {
+            "id": self.ids[position],
+            "name": self.names[position],
+            "price": self.prices[position],
+            "quantity": self.quantities[position],
+            "parent_id": self.group_ids[position],
+            "measure_name": self.measure_names[position],
+        }
+
+    def rows(self) -> Iterable[Dict[str, Any]]:
+        return (self.row(position) for position in range(len(self.ids)))
+
+    def update_in_place(self, position: int, product: Dict[str, Any]) -> None:
+        """Меняет цену, остаток и единицу измерения; название и группа должны остаться прежними."""
+        self.prices[position] = product["price"]
+        self.quantities[position] = product["quantity"]
+        self.measure_names[position] = intern_optional(product.get("measure_name"))
+
+    def columns(self) -> List[Any]:
+        return [self.ids, self.names, self.prices, self.quantities, self.group_ids, self.measure_names]
+
+    def copy(self) -> "ProductTable":
+        table = ProductTable()
+        table.ids = list(self.ids)
+        table.names = list(self.names)
+        table.prices = array("d", self.prices)
+        table.quantities = array("d", self.quantities)
+        table.group_ids = list(self.group_ids)
+        table.measure_names = list(self.measure_names)
+        table.positions = dict(self.positions)
+        return table
+
+    def replaced(self, position: Optional[int], product: Optional[Dict[str, Any]]) -> "ProductTable":
+        """
+        Копия таблицы, где товар на позиции position заменён на product:
+        position=None — добавить товар в конец, product=None — удалить товар.
+        """
+        table = self.copy()
+        if position is None:
+            if product is not None:
+                table.append(product)
+        elif product is None:
+            for column in table.columns():
+                del column[position]
+            table.positions = {product_id: index for index, product_id in enumerate(table.ids)}
+        else:
+            del table.positions[table.ids[position]]
+            table.ids[position] = product["id"]
+            table.names[position] = product["name"]
+            table.group_ids[position] = intern_optional(product.get("parent_id"))
+            table.update_in_place(position, product)
+            table.positions[product["id"]] = position
+        return table
+
+    def to_payload(self) -> Dict[str, Any]:
+        return {
+            "ids": self.ids,
+            "names": self.names,
+            "prices": self.prices.tolist(),
+            "quantities": self.quantities.tolist(),
+            "group_ids": self.group_ids,
+            "measure_names": self.measure_names,
+        }
+
+    @classmethod
+    def from_payload(cls, payload: Dict[str, Any]) -> "ProductTable":
+        table = cls()
+        table.ids = list(payload["ids"])
+        table.names = list(payload["names"])
+        table.prices = array("d", payload["prices"])
+        table.quantities = array("d", payload["quantities"])
+        table.group_ids = [intern_optional(value) for value in payload["group_ids"]]
+        table.measure_names = [intern_optional(value) for value in payload["measure_names"]]
+        table.positions = {product_id: position for position, product_id in enumerate(table.ids)}
+        return table
@@ -1,5 +1,14 @@
 from dataclasses import is_dataclass, asdict
-from typing import Any, Dict
+from functools import partial
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+import anyio
+
+from backend.app.config import SUPABASE_MAX_CONCURRENCY
+
+T = TypeVar("T")
+
+_db_limiter: Optional[anyio.CapacityLimiter] = None
 
 
 def to_dict(value: Any) -> Dict[str, Any] | None:
@@ -13,4 +22,20 @@ def to_dict(value: Any) -> Dict[str, Any] | None:
         return value.model_dump()
     if hasattr(value, "__dict__"):
         return {k: v for k, v in vars(value).items() if not k.startswith("_")}
-    return None
\ No newline at end of file
+    return None
+
+
+def get_db_limiter() -> anyio.CapacityLimiter:
+    global _db_limiter
+    if _db_limiter is None:
+        _db_limiter = anyio.CapacityLimiter(SUPABASE_MAX_CONCURRENCY)
+    return _db_limiter
+
+
+async def run_db(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Выполняет синхронный вызов клиента Supabase в отдельном потоке.
+    Число одновременных вызовов ограничено SUPABASE_MAX_CONCURRENCY,
+    чтобы медленный Supabase не выедал общий пул потоков Starlette.
+    """
+    return await anyio.to_thread.run_sync(partial(func, *args, **kwargs), limiter=get_db_limiter())
@@ -0,0 +1,237 @@
+import asyncio
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+import httpx
+from fastapi import HTTPException
+
+from backend.app.config import (
+    EVOTOR_API_URL,
+    EVOTOR_BREAKER_RESET_SECONDS,
+    EVOTOR_BREAKER_THRESHOLD,
+    EVOTOR_HTTP2,
+    EVOTOR_KEEPALIVE_EXPIRY,
+    EVOTOR_MAX_CONNECTIONS,
+    EVOTOR_MAX_KEEPALIVE_CONNECTIONS,
+    EVOTOR_MAX_RETRIES,
+    EVOTOR_RATE_LIMIT_BURST,
+    EVOTOR_RATE_LIMIT_PER_SECOND,
+    EVOTOR_TOKEN,
+)
+
+BASE_URL = EVOTOR_API_URL
+HTTPX_TIMEOUT = httpx.Timeout(connect=10.0, read=30.0, write=10.0, pool=10.0)
+HTTPX_LIMITS = httpx.Limits(
+    max_connections=EVOTOR_MAX_CONNECTIONS,
+    max_keepalive_connections=EVOTOR_MAX_KEEPALIVE_CONNECTIONS,
+    keepalive_expiry=EVOTOR_KEEPALIVE_EXPIRY,
+)
+RETRY_BACKOFF_BASE_SECONDS = 0.5
+RETRY_BACKOFF_MAX_SECONDS = 8.0
+# Дольше этого Retry-After не ждём — пусть запрос завершится ошибкой.
+RETRY_AFTER_MAX_SECONDS = 30.0
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+class TokenBucket:
+    """Ограничитель частоты запросов: rate токенов в секунду, не больше burst подряд."""
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.capacity = float(max(burst, 1))
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        async with self.lock:
+            self._refill()
+            while self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+
+
+class CircuitBreaker:
+    """
+    После threshold подряд неудачных обращений (ошибки соединения, 5xx) Evotor
+    считается недоступным: запросы сразу отклоняются reset_seconds, затем
+    пропускается один пробный запрос.
+    """
+
+    def __init__(self, threshold: int, reset_seconds: float) -> None:
+        self.threshold = threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.probing = False
+
+    def allow(self) -> bool:
+        if self.opened_at is None:
+            return True
+        if self.probing or time.monotonic() - self.opened_at < self.reset_seconds:
+            return False
+        self.probing = True
+        return True
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.probing or (self.threshold > 0 and self.failures >= self.threshold):
+            if self.opened_at is None or self.probing:
+                print(f"Evotor API недоступен, запросы приостановлены на {self.reset_seconds:.0f} с.")
+            self.opened_at = time.monotonic()
+        self.probing = False
+
+    def release_probe(self) -> None:
+        """Пробный запрос прервался без ответа (отмена, исключение) — следующий запрос снова станет пробным."""
+        self.probing = False
+
+
+rate_limiter = TokenBucket(EVOTOR_RATE_LIMIT_PER_SECOND, EVOTOR_RATE_LIMIT_BURST)
+breaker = CircuitBreaker(EVOTOR_BREAKER_THRESHOLD, EVOTOR_BREAKER_RESET_SECONDS)
+
+
+def build_headers() -> Dict[str, str]:
+    return {
+        "Authorization": f"Bearer {EVOTOR_TOKEN}",
+        "Accept": "application/json",
+    }
+
+
+def create_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        base_url=BASE_URL,
+        headers=build_headers(),
+        timeout=HTTPX_TIMEOUT,
+        limits=HTTPX_LIMITS,
+        http2=EVOTOR_HTTP2,
+    )
+
+
+async def start_client() -> None:
+    global _client
+    if _client is None or _client.is_closed:
+        _client = create_client()
+
+
+async def close_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+    _client = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """
+    Общий клиент Evotor API. Создаётся при старте приложения; если lifespan
+    не отработал (скрипты, тесты), создаём его лениво при первом обращении.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = create_client()
+    return _client
+
+
+def set_client(client: Optional[httpx.AsyncClient]) -> None:
+    """Подменяет клиент (например, на httpx.AsyncClient с MockTransport в тестах)."""
+    global _client
+    _client = client
+
+
+def retry_after_seconds(response: httpx.Response) -> Optional[float]:
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_seconds(attempt: int) -> float:
+    # Полный джиттер: равномерно от нуля до экспоненциального предела.
+    return random.uniform(0, min(RETRY_BACKOFF_BASE_SECONDS * 2 ** attempt, RETRY_BACKOFF_MAX_SECONDS))
+
+
+async def request(
+    method: str,
+    path: str,
+    *,
+    params: Optional[Dict[str, Any]] = None,
+    json: Any = None,
+    idempotent: Optional[bool] = None,
+) -> httpx.Response:
+    """
+    Запрос к Evotor API через общий ограничитель частоты и circuit breaker.
+
+    Идемпотентные запросы при ошибке соединения, 429 и 5xx повторяются до
+    EVOTOR_MAX_RETRIES раз с экспоненциальной задержкой или по Retry-After.
+    Возвращает последний ответ; ошибка соединения после всех попыток
+    пробрасывается как httpx.RequestError. В circuit breaker попадает один
+    итог на весь запрос, а не на каждую попытку.
+    """
+    if idempotent is None:
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+    max_retries = EVOTOR_MAX_RETRIES if idempotent else 0
+    client = get_client()
+
+    if not breaker.allow():
+        raise HTTPException(status_code=503, detail="Evotor API временно недоступен, повторите попытку позже.")
+    is_probe = breaker.probing
+    recorded = False
+
+    try:
+        attempt = 0
+        while True:
+            await rate_limiter.acquire()
+            delay: Optional[float] = None
+            try:
+                response = await client.request(method, path, params=params, json=json)
+            except httpx.RequestError:
+                if attempt >= max_retries:
+                    breaker.record_failure()
+                    recorded = True
+                    raise
+            else:
+                if response.status_code in RETRYABLE_STATUS_CODES and attempt < max_retries:
+                    delay = retry_after_seconds(response)
+
+                if (
+                    response.status_code not in RETRYABLE_STATUS_CODES
+                    or attempt >= max_retries
+                    or (delay is not None and delay > RETRY_AFTER_MAX_SECONDS)
+                ):
+                    if response.status_code >= 500:
+                        breaker.record_failure()
+                    else:
+                        # 429 — это наш перебор лимита, а не отказ Evotor.
+                        breaker.record_success()
+                    recorded = True
+                    return response
+
+            await asyncio.sleep(delay if delay is not None else backoff_seconds(attempt))
+            attempt += 1
+    finally:
+        if is_probe and not recorded:
+            breaker.release_probe()
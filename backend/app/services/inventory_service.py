@@ -0,0 +1,225 @@
+import asyncio
+import math
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+from fastapi import HTTPException
+
+from backend.app.config import APPROVED_ORDER_STATUS
+from backend.app.services import job_queue, repository
+from backend.app.services.catalog_service import fetch_product, update_product_quantity
+
+INVENTORY_CONCURRENCY = 5
+INVENTORY_JOB_KIND = "inventory.decrease"
+
+
+@dataclass
+class InventoryAdjustment:
+    product_id: str
+    decrement: float
+    previous_quantity: Optional[float] = None
+    new_quantity: Optional[float] = None
+    error: Optional[str] = None
+    applied: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.applied and self.error is None
+
+
+def collect_adjustments(items: Any) -> Dict[str, float]:
+    adjustments: Dict[str, float] = {}
+    if not isinstance(items, list):
+        return adjustments
+
+    for entry in items:
+        if not isinstance(entry, dict):
+            continue
+
+        product_id = entry.get("id")
+        if isinstance(product_id, (str, int)):
+            product_id_str = str(product_id)
+        else:
+            continue
+
+        raw_quantity = entry.get("quantity")
+        quantity_to_subtract = 1.0
+
+        try:
+            candidate = float(raw_quantity)
+        except (TypeError, ValueError):
+            candidate = None
+
+        if candidate is not None and math.isfinite(candidate) and candidate > 0:
+            quantity_to_subtract = candidate
+
+        adjustments[product_id_str] = adjustments.get(product_id_str, 0.0) + quantity_to_subtract
+
+    return {product_id: decrement for product_id, decrement in adjustments.items() if decrement > 0}
+
+
+def error_detail(exc: Exception) -> str:
+    if isinstance(exc, HTTPException):
+        return str(exc.detail)
+    return str(exc) or exc.__class__.__name__
+
+
+async def read_current_quantity(adjustment: InventoryAdjustment, semaphore: asyncio.Semaphore) -> None:
+    async with semaphore:
+        try:
+            product = await fetch_product(adjustment.product_id)
+        except Exception as exc:
+            adjustment.error = error_detail(exc)
+            return
+
+    if product is None:
+        adjustment.error = f"Товар с идентификатором {adjustment.product_id} не найден в Evotor."
+        return
+
+    try:
+        current_quantity = float(product.get("quantity"))
+    except (TypeError, ValueError):
+        current_quantity = adjustment.decrement
+
+    if not math.isfinite(current_quantity):
+        current_quantity = adjustment.decrement
+
+    adjustment.previous_quantity = current_quantity
+    adjustment.new_quantity = max(current_quantity - adjustment.decrement, 0.0)
+
+
+async def write_new_quantity(adjustment: InventoryAdjustment, semaphore: asyncio.Semaphore) -> None:
+    async with semaphore:
+        try:
+            await update_product_quantity(adjustment.product_id, adjustment.new_quantity)
+        except Exception as exc:
+            adjustment.error = error_detail(exc)
+            return
+
+    adjustment.applied = True
+
+
+async def apply_adjustments(
+    decrements: Dict[str, float],
+    skip: Iterable[str] = (),
+    planned: Optional[Dict[str, Dict[str, float]]] = None,
+    save_plan: Optional[Callable[[Dict[str, Dict[str, float]]], Awaitable[None]]] = None,
+) -> List[InventoryAdjustment]:
+    """
+    Списывает остатки в Evotor: decrements — сколько списать по каждому товару,
+    skip — товары, списание по которым уже выполнено.
+
+    Сначала параллельно читаются текущие остатки всех товаров; если хотя бы
+    один товар прочитать не удалось, запись не выполняется вовсе. Затем новые
+    остатки так же параллельно отправляются в Evotor. Возвращает отчёт по
+    каждому товару.
+
+    planned — план прошлой попытки: остаток до списания и отправленный остаток
+    по каждому товару. PATCH задаёт абсолютное значение, и если ответ на него
+    потерялся, повтор по свежему остатку списал бы товар дважды. Поэтому товар
+    из плана с неизменившимся остатком получает тот же целевой остаток, а с
+    остатком, равным целевому, считается уже списанным. Любой другой остаток
+    (продажа или ручная правка после неудачной записи) — новая точка отсчёта:
+    списание пересчитывается от него. Перед записью план передаётся в
+    save_plan, чтобы он пережил падение процесса.
+    """
+    skipped = set(skip)
+    adjustments = [
+        InventoryAdjustment(product_id=product_id, decrement=float(decrement))
+        for product_id, decrement in decrements.items()
+        if product_id not in skipped
+    ]
+    if not adjustments:
+        return adjustments
+
+    semaphore = asyncio.Semaphore(INVENTORY_CONCURRENCY)
+
+    await asyncio.gather(*(read_current_quantity(adjustment, semaphore) for adjustment in adjustments))
+    if any(adjustment.error for adjustment in adjustments):
+        return adjustments
+
+    if planned is not None:
+        for adjustment in adjustments:
+            plan = planned.get(adjustment.product_id)
+            if plan is not None and adjustment.previous_quantity == plan["previous"]:
+                adjustment.new_quantity = plan["target"]
+            elif plan is not None and adjustment.previous_quantity == plan["target"]:
+                adjustment.new_quantity = adjustment.previous_quantity
+                adjustment.applied = True
+            else:
+                planned[adjustment.product_id] = {
+                    "previous": adjustment.previous_quantity,
+                    "target": adjustment.new_quantity,
+                }
+        if save_plan is not None:
+            await save_plan(planned)
+
+    pending = [adjustment for adjustment in adjustments if not adjustment.applied]
+    await asyncio.gather(*(write_new_quantity(adjustment, semaphore) for adjustment in pending))
+    return adjustments
+
+
+async def decrease_inventory_for_items(items: Any) -> List[InventoryAdjustment]:
+    return await apply_adjustments(collect_adjustments(items))
+
+
+def describe_failures(adjustments: List[InventoryAdjustment]) -> Optional[str]:
+    failed = [adjustment for adjustment in adjustments if adjustment.error]
+    if not failed:
+        return None
+    return "; ".join(f"{adjustment.product_id}: {adjustment.error}" for adjustment in failed)
+
+
+async def enqueue_inventory_decrease(order_id: int, items: Any, wake: bool = True) -> bool:
+    """
+    Ставит списание остатков по заказу в очередь; для одного заказа — не больше одного раза.
+    Задачу можно записать до смены статуса: она выполняется, только когда заказ одобрен.
+    """
+    decrements = collect_adjustments(items)
+    if not decrements:
+        return False
+
+    return await job_queue.enqueue(
+        INVENTORY_JOB_KIND,
+        f"inventory-decrease:{order_id}",
+        {"order_id": order_id, "decrements": decrements, "applied": [], "planned": {}},
+        wake=wake,
+    )
+
+
+async def fetch_order_status(order_id: Any) -> Optional[str]:
+    response = await repository.select_order(order_id)
+    rows = getattr(response, "data", None) or []
+    return rows[0].get("status") if rows else None
+
+
+async def run_inventory_job(job: job_queue.Job) -> None:
+    order_id = job.payload.get("order_id")
+    if order_id is not None:
+        order_status = await fetch_order_status(order_id)
+        if order_status is None:
+            print(f"Заказ {order_id} удалён, списание остатков отменено.")
+            return
+        if order_status != APPROVED_ORDER_STATUS:
+            # Задача пишется до смены статуса; если её так и не сменили, задача упадёт по попыткам.
+            raise job_queue.RetryableJobError(f"Заказ {order_id} не одобрен (статус: {order_status}).")
+
+    decrements = job.payload.get("decrements") or {}
+    applied = set(job.payload.get("applied") or [])
+    planned = dict(job.payload.get("planned") or {})
+
+    async def save_plan(plan: Dict[str, Dict[str, float]]) -> None:
+        await job_queue.save_payload(job, {**job.payload, "planned": plan})
+
+    adjustments = await apply_adjustments(decrements, skip=applied, planned=planned, save_plan=save_plan)
+    applied.update(adjustment.product_id for adjustment in adjustments if adjustment.ok)
+
+    failures = describe_failures(adjustments)
+    if failures:
+        # Сохраняем уже применённые товары и план, чтобы повтор не списал их второй раз.
+        raise job_queue.RetryableJobError(
+            failures, payload={**job.payload, "applied": sorted(applied), "planned": planned}
+        )
+
+
+job_queue.register_handler(INVENTORY_JOB_KIND, run_inventory_job)
@@ -0,0 +1,267 @@
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional
+
+from backend.app.config import JOB_MAX_ATTEMPTS, JOBS_DB_PATH
+
+JOB_POLL_INTERVAL_SECONDS = 5.0
+JOB_BACKOFF_BASE_SECONDS = 2.0
+JOB_BACKOFF_MAX_SECONDS = 300.0
+# Задача в статусе running дольше этого срока считается брошенной (процесс упал).
+JOB_LEASE_SECONDS = 600.0
+
+STATUS_PENDING = "pending"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    idempotency_key TEXT NOT NULL UNIQUE,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_run_at REAL NOT NULL,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_due ON jobs (status, next_run_at);
+"""
+
+
+@dataclass
+class Job:
+    id: int
+    kind: str
+    idempotency_key: str
+    payload: Dict[str, Any]
+    attempts: int
+
+
+class RetryableJobError(Exception):
+    """Ошибка задачи, после которой её нужно повторить; payload сохраняет прогресс."""
+
+    def __init__(self, message: str, payload: Optional[Dict[str, Any]] = None) -> None:
+        super().__init__(message)
+        self.payload = payload
+
+
+JobHandler = Callable[[Job], Awaitable[None]]
+
+_handlers: Dict[str, JobHandler] = {}
+_wakeup: Optional[asyncio.Event] = None
+_worker_task: Optional[asyncio.Task] = None
+_schema_ready = False
+
+
+def register_handler(kind: str, handler: JobHandler) -> None:
+    _handlers[kind] = handler
+
+
+@contextmanager
+def connect() -> Iterator[sqlite3.Connection]:
+    global _schema_ready
+
+    directory = os.path.dirname(JOBS_DB_PATH)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    connection = sqlite3.connect(JOBS_DB_PATH, timeout=30.0, isolation_level=None)
+    connection.row_factory = sqlite3.Row
+    try:
+        if not _schema_ready:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(SCHEMA)
+            _schema_ready = True
+        yield connection
+    finally:
+        connection.close()
+
+
+def _init_db() -> None:
+    with connect():
+        pass
+
+
+def _enqueue(kind: str, idempotency_key: str, payload: Dict[str, Any]) -> bool:
+    now = time.time()
+    with connect() as connection:
+        # Упавшую окончательно задачу повторная постановка оживляет, сохраняя её прогресс.
+        cursor = connection.execute(
+            """
+            INSERT INTO jobs (kind, idempotency_key, payload, status, next_run_at, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (idempotency_key) DO UPDATE SET
+                status = excluded.status, attempts = 0, next_run_at = excluded.next_run_at,
+                last_error = NULL, updated_at = excluded.updated_at
+            WHERE jobs.status = ?
+            """,
+            (kind, idempotency_key, json.dumps(payload, ensure_ascii=False), STATUS_PENDING, now, now, now, STATUS_FAILED),
+        )
+        return cursor.rowcount > 0
+
+
+def _claim_due_job() -> Optional[Job]:
+    now = time.time()
+    with connect() as connection:
+        row = connection.execute(
+            """
+            UPDATE jobs SET status = ?, attempts = attempts + 1, updated_at = ?
+            WHERE id = (
+                SELECT id FROM jobs
+                WHERE (status = ? AND next_run_at <= ?) OR (status = ? AND updated_at <= ?)
+                ORDER BY next_run_at LIMIT 1
+            )
+            RETURNING id, kind, idempotency_key, payload, attempts
+            """,
+            (STATUS_RUNNING, now, STATUS_PENDING, now, STATUS_RUNNING, now - JOB_LEASE_SECONDS),
+        ).fetchone()
+
+    if row is None:
+        return None
+
+    return Job(
+        id=row["id"],
+        kind=row["kind"],
+        idempotency_key=row["idempotency_key"],
+        payload=json.loads(row["payload"]),
+        attempts=row["attempts"],
+    )
+
+
+def _complete(job: Job) -> None:
+    with connect() as connection:
+        connection.execute(
+            "UPDATE jobs SET status = ?, last_error = NULL, updated_at = ? WHERE id = ?",
+            (STATUS_DONE, time.time(), job.id),
+        )
+
+
+def _save_payload(job: Job, payload: Dict[str, Any]) -> None:
+    with connect() as connection:
+        connection.execute(
+            "UPDATE jobs SET payload = ?, updated_at = ? WHERE id = ?",
+            (json.dumps(payload, ensure_ascii=False), time.time(), job.id),
+        )
+
+
+def _fail(job: Job, error: str, payload: Optional[Dict[str, Any]]) -> None:
+    now = time.time()
+    if job.attempts >= JOB_MAX_ATTEMPTS:
+        status, next_run_at = STATUS_FAILED, now
+    else:
+        delay = min(JOB_BACKOFF_BASE_SECONDS * 2 ** (job.attempts - 1), JOB_BACKOFF_MAX_SECONDS)
+        status, next_run_at = STATUS_PENDING, now + delay * random.uniform(0.5, 1.0)
+
+    with connect() as connection:
+        connection.execute(
+            "UPDATE jobs SET status = ?, next_run_at = ?, last_error = ?, payload = ?, updated_at = ? WHERE id = ?",
+            (
+                status,
+                next_run_at,
+                error,
+                json.dumps(payload if payload is not None else job.payload, ensure_ascii=False),
+                now,
+                job.id,
+            ),
+        )
+
+
+async def enqueue(kind: str, idempotency_key: str, payload: Dict[str, Any], wake: bool = True) -> bool:
+    """
+    Ставит задачу в очередь. Повторная постановка с тем же ключом игнорируется,
+    если задача не завершилась окончательной ошибкой; возвращает True, если
+    задача добавлена или оживлена. wake=False — не будить обработчик сразу
+    (например, когда задача пишется до изменения, которое она проверяет).
+    """
+    created = await asyncio.to_thread(_enqueue, kind, idempotency_key, payload)
+    if created and wake:
+        wake_worker()
+    return created
+
+
+def wake_worker() -> None:
+    if _wakeup is not None:
+        _wakeup.set()
+
+
+async def save_payload(job: Job, payload: Dict[str, Any]) -> None:
+    """Сохраняет прогресс выполняющейся задачи до побочных эффектов, которые нельзя повторять."""
+    job.payload = payload
+    await asyncio.to_thread(_save_payload, job, payload)
+
+
+async def run_job(job: Job) -> None:
+    handler = _handlers.get(job.kind)
+    if handler is None:
+        await asyncio.to_thread(_fail, job, f"Нет обработчика для задачи {job.kind}.", None)
+        return
+
+    try:
+        await handler(job)
+    except RetryableJobError as exc:
+        print(f"Задача {job.idempotency_key} завершилась ошибкой (попытка {job.attempts}): {exc}")
+        await asyncio.to_thread(_fail, job, str(exc), exc.payload)
+    except Exception as exc:
+        print(f"Задача {job.idempotency_key} завершилась ошибкой (попытка {job.attempts}): {exc}")
+        await asyncio.to_thread(_fail, job, str(exc) or exc.__class__.__name__, None)
+    else:
+        await asyncio.to_thread(_complete, job)
+
+
+async def run_pending_jobs() -> int:
+    processed = 0
+    while True:
+        job = await asyncio.to_thread(_claim_due_job)
+        if job is None:
+            return processed
+        await run_job(job)
+        processed += 1
+
+
+async def worker_loop() -> None:
+    assert _wakeup is not None
+    while True:
+        try:
+            await run_pending_jobs()
+        except Exception as exc:
+            print(f"Ошибка обработчика очереди задач: {exc}")
+
+        try:
+            await asyncio.wait_for(_wakeup.wait(), timeout=JOB_POLL_INTERVAL_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+        _wakeup.clear()
+
+
+async def start_worker() -> None:
+    global _wakeup, _worker_task
+    if _worker_task is not None:
+        return
+
+    await asyncio.to_thread(_init_db)
+    _wakeup = asyncio.Event()
+    _worker_task = asyncio.create_task(worker_loop())
+
+
+async def stop_worker() -> None:
+    global _wakeup, _worker_task
+    if _worker_task is None:
+        return
+
+    _worker_task.cancel()
+    try:
+        await _worker_task
+    except asyncio.CancelledError:
+        pass
+    _worker_task = None
+    _wakeup = None
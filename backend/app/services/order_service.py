@@ -1,11 +1,36 @@
+import asyncio
+import base64
+import json
+import time
 from datetime import datetime
-from typing import Any, Dict, Iterable, List, Optional
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import orjson
+from pydantic import EmailStr, TypeAdapter, ValidationError
 
 from backend.app.config import DEFAULT_CURRENCY, DEFAULT_ORDER_STATUS
-from backend.app.db import supabase
-from backend.app.models import OrderResult, OrderUser, OrderShippingAddress, OrderItemPayload
+from backend.app.models import (
+    OrderItemPayload,
+    OrderItemRow,
+    OrderResult,
+    OrderResultRow,
+    OrderShippingAddress,
+    OrderShippingAddressRow,
+    OrderUser,
+    OrderUserRow,
+)
+from backend.app.services import repository
 from backend.app.services.db_service import to_dict
 
+PROFILE_CACHE_TTL_SECONDS = 300
+PROFILE_CACHE_MAX_ENTRIES = 10_000
+PROFILE_LOOKUP_CONCURRENCY = 8
+LISTING_ITEM_FIELDS = ("id", "name", "price", "quantity")
+
+_profile_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+_email_adapter = TypeAdapter(EmailStr)
+
 
 def parse_datetime(value: Any) -> datetime:
     if isinstance(value, datetime):
@@ -21,6 +46,26 @@ def parse_datetime(value: Any) -> datetime:
     return datetime.utcnow()
 
 
+def encode_order_cursor(record: Dict[str, Any]) -> str | None:
+    created_at = record.get("created_at")
+    order_id = record.get("id")
+    if created_at is None or order_id is None:
+        return None
+
+    raw = json.dumps([str(created_at), int(order_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_order_cursor(cursor: str) -> Tuple[str, int] | None:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, order_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        created_at_value = datetime.fromisoformat(str(created_at).replace("Z", "+00:00"))
+        return created_at_value.isoformat(), int(order_id)
+    except (ValueError, TypeError):
+        return None
+
+
 def normalize_items(raw_items: Iterable[Dict[str, Any]] | None) -> List[OrderItemPayload]:
     normalized: List[OrderItemPayload] = []
     if not raw_items:
@@ -36,6 +81,25 @@ def normalize_items(raw_items: Iterable[Dict[str, Any]] | None) -> List[OrderIte
     return normalized
 
 
+def summarize_items(raw_items: Any) -> Any:
+    """Позиции заказа для списков: без тяжёлых полей вроде image."""
+    if not isinstance(raw_items, list):
+        return raw_items
+
+    summary: List[Any] = []
+    for entry in raw_items:
+        if isinstance(entry, dict):
+            entry = {key: entry[key] for key in LISTING_ITEM_FIELDS if key in entry}
+        summary.append(entry)
+    return summary
+
+
+def summarize_order(record: Dict[str, Any]) -> Dict[str, Any]:
+    if not isinstance(record, dict) or "items" not in record:
+        return record
+    return {**record, "items": summarize_items(record["items"])}
+
+
 def normalize_shipping(raw_shipping: Dict[str, Any] | None) -> Optional[OrderShippingAddress]:
     if not raw_shipping:
         return None
@@ -110,7 +174,7 @@ def fallback_user_from_record(record: Dict[str, Any] | None) -> Dict[str, Any] |
     return snapshot or None
 
 
-def make_order_user(record: Dict[str, Any], user_payload: Dict[str, Any] | None) -> OrderUser:
+def order_user_fields(record: Dict[str, Any], user_payload: Dict[str, Any] | None) -> OrderUserRow:
     user_payload = user_payload or {}
     metadata = user_payload.get("user_metadata") or {}
 
@@ -165,15 +229,20 @@ def make_order_user(record: Dict[str, Any], user_payload: Dict[str, Any] | None)
             else:
                 email_value = None
 
-    return OrderUser(
-        id=user_id_str,
-        email=email_value,
-        name=name,
-        phone=phone,
-    )
+    return {
+        "id": user_id_str,
+        "email": email_value,
+        "name": name,
+        "phone": phone,
+    }
 
 
-def build_order_result(record: Dict[str, Any]) -> OrderResult:
+def make_order_user(record: Dict[str, Any], user_payload: Dict[str, Any] | None) -> OrderUser:
+    return OrderUser(**order_user_fields(record, user_payload))
+
+
+def order_fields(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Поля заказа из записи Supabase; items и shipping_address — ещё в сыром виде."""
     record_map: Dict[str, Any]
     if isinstance(record, dict):
         record_map = record
@@ -220,7 +289,7 @@ def build_order_result(record: Dict[str, Any]) -> OrderResult:
     created_at_value = record_map.get("created_at")
     if created_at_value is None:
         created_at_value = getattr(record, "created_at", None)
-# added
+
     payment_status_value = record_map.get("payment_status")
     if payment_status_value is None:
         payment_status_value = getattr(record, "payment_status", "Не оплачен")
@@ -229,41 +298,135 @@ def build_order_result(record: Dict[str, Any]) -> OrderResult:
     if tracking_code_value is None:
         tracking_code_value = getattr(record, "tracking_code", None)
 
-    # return OrderResult(
-    #     id=int(record_id),
-    #     user_id=str(user_id_value or ""),
-    #     user=make_order_user(record_map, user_dict or {}),
-    #     status=status_value or DEFAULT_ORDER_STATUS,
-    #     currency=currency_value or DEFAULT_CURRENCY,
-    #     total_cost=int(total_cost_value or 0),
-    #     items=normalize_items(items_payload),
-    #     shipping_address=normalize_shipping(shipping_payload),
-    #     created_at=parse_datetime(created_at_value),
-    # )
+    return {
+        "id": int(record_id),
+        "user_id": str(user_id_value or ""),
+        "user": order_user_fields(record_map, user_dict or {}),
+        "status": status_value or DEFAULT_ORDER_STATUS,
+        "currency": currency_value or DEFAULT_CURRENCY,
+        "total_cost": int(total_cost_value or 0),
+        "items": items_payload,
+        "shipping_address": shipping_payload,
+        "payment_status": payment_status_value or "Не оплачен",
+        "tracking_code": str(tracking_code_value) if tracking_code_value else None,
+        "created_at": parse_datetime(created_at_value),
+    }
+
+
+def build_order_result(record: Dict[str, Any]) -> OrderResult:
+    fields = order_fields(record)
     return OrderResult(
-        id=int(record_id),
-        user_id=str(user_id_value or ""),
-        user=make_order_user(record_map, user_dict or {}),
-        status=status_value or DEFAULT_ORDER_STATUS,
-        currency=currency_value or DEFAULT_CURRENCY,
-        total_cost=int(total_cost_value or 0),
-        items=normalize_items(items_payload),
-        shipping_address=normalize_shipping(shipping_payload),
-        payment_status=payment_status_value or "Не оплачен",
-        tracking_code=str(tracking_code_value) if tracking_code_value else None,
-        created_at=parse_datetime(created_at_value),
+        **{
+            **fields,
+            "user": OrderUser(**fields["user"]),
+            "items": normalize_items(fields["items"]),
+            "shipping_address": normalize_shipping(fields["shipping_address"]),
+        }
     )
 
 
+@lru_cache(maxsize=4096)
+def normalize_email(value: str) -> Optional[str]:
+    try:
+        return _email_adapter.validate_python(value)
+    except ValidationError:
+        return None
 
-def fetch_user_profile(user_id: Any) -> Dict[str, Any] | None:
-    if not user_id:
+
+def item_row(entry: Any) -> Optional[OrderItemRow]:
+    if not isinstance(entry, dict):
+        return None
+
+    item_id, name, price, quantity = entry.get("id"), entry.get("name"), entry.get("price"), entry.get("quantity")
+    image = entry.get("image")
+    if (
+        type(item_id) is str
+        and type(name) is str
+        and type(price) is int
+        and type(quantity) is int
+        and (image is None or type(image) is str)
+    ):
+        return {"id": item_id, "name": name, "price": price, "quantity": quantity, "image": image}
+
+    # Нестандартные типы (строки с числами, float и т. п.) приводит pydantic, как и раньше.
+    try:
+        return OrderItemPayload(**entry).model_dump()
+    except Exception:
         return None
 
-    user_id_str = str(user_id)
+
+def shipping_row(raw_shipping: Any) -> Optional[OrderShippingAddressRow]:
+    if not raw_shipping:
+        return None
+
+    if isinstance(raw_shipping, dict):
+        title, address = raw_shipping.get("title"), raw_shipping.get("address")
+        optional = [raw_shipping.get(key) for key in ("id", "city", "comment")]
+        if type(title) is str and type(address) is str and all(value is None or type(value) is str for value in optional):
+            return {"id": optional[0], "title": title, "city": optional[1], "address": address, "comment": optional[2]}
 
     try:
-        response = supabase.auth.admin.get_user_by_id(user_id_str)
+        return OrderShippingAddress(**raw_shipping).model_dump()
+    except Exception:
+        return None
+
+
+def build_order_row(record: Dict[str, Any]) -> OrderResultRow:
+    """
+    То же, что build_order_result, но словарём и без валидации pydantic там, где
+    типы уже правильные: для списков заказов, которые сразу уходят в dump_orders_json.
+    Некорректный email в ответе становится null, а не ошибкой 500.
+    """
+    fields = order_fields(record)
+    user = fields["user"]
+    if user["email"] is not None:
+        user["email"] = normalize_email(user["email"])
+
+    items = [item_row(entry) for entry in fields["items"] or ()]
+    fields["items"] = [item for item in items if item is not None]
+    fields["shipping_address"] = shipping_row(fields["shipping_address"])
+    return OrderResultRow(**fields)
+
+
+def dump_orders_json(payload: Any) -> bytes:
+    # OPT_UTC_Z: даты в UTC с суффиксом Z, как их сериализует pydantic.
+    return orjson.dumps(payload, option=orjson.OPT_UTC_Z)
+
+
+
+def get_cached_profile(user_id: str) -> Dict[str, Any] | None:
+    entry = _profile_cache.get(user_id)
+    if entry is None:
+        return None
+
+    timestamp, profile = entry
+    if time.monotonic() - timestamp >= PROFILE_CACHE_TTL_SECONDS:
+        _profile_cache.pop(user_id, None)
+        return None
+
+    return profile
+
+
+def cache_profile(user_id: str, profile: Dict[str, Any]) -> None:
+    if len(_profile_cache) >= PROFILE_CACHE_MAX_ENTRIES:
+        now = time.monotonic()
+        expired = [key for key, (timestamp, _) in _profile_cache.items() if now - timestamp >= PROFILE_CACHE_TTL_SECONDS]
+        for key in expired:
+            _profile_cache.pop(key, None)
+        if len(_profile_cache) >= PROFILE_CACHE_MAX_ENTRIES:
+            _profile_cache.pop(next(iter(_profile_cache)), None)
+
+    _profile_cache[user_id] = (time.monotonic(), profile)
+
+
+def invalidate_user_profile(user_id: Any) -> None:
+    if user_id:
+        _profile_cache.pop(str(user_id), None)
+
+
+async def load_user_profile(user_id_str: str) -> Dict[str, Any] | None:
+    try:
+        response = await repository.get_auth_user_by_id(user_id_str)
     except Exception:
         return None
 
@@ -276,19 +439,66 @@ def fetch_user_profile(user_id: Any) -> Dict[str, Any] | None:
     return None
 
 
-def attach_user(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+async def fetch_user_profile(user_id: Any) -> Dict[str, Any] | None:
+    if not user_id:
+        return None
+
+    profiles = await fetch_user_profiles([user_id])
+    return profiles.get(str(user_id))
+
+
+async def fetch_user_profiles(user_ids: Iterable[Any]) -> Dict[str, Dict[str, Any] | None]:
+    """
+    Профили пользователей по id: сначала из TTL-кэша, остальные — параллельно,
+    не больше PROFILE_LOOKUP_CONCURRENCY запросов к Supabase Auth одновременно.
+    """
+    profiles: Dict[str, Dict[str, Any] | None] = {}
+    missing: List[str] = []
+
+    for user_id in user_ids:
+        if not user_id:
+            continue
+        user_id_str = str(user_id)
+        if user_id_str in profiles or user_id_str in missing:
+            continue
+        profile = get_cached_profile(user_id_str)
+        if profile is not None:
+            profiles[user_id_str] = profile
+        else:
+            missing.append(user_id_str)
+
+    if not missing:
+        return profiles
+
+    semaphore = asyncio.Semaphore(PROFILE_LOOKUP_CONCURRENCY)
+
+    async def load(user_id_str: str) -> Dict[str, Any] | None:
+        async with semaphore:
+            return await load_user_profile(user_id_str)
+
+    loaded = await asyncio.gather(*(load(user_id_str) for user_id_str in missing))
+    for user_id_str, profile in zip(missing, loaded):
+        profiles[user_id_str] = profile
+        if profile:
+            cache_profile(user_id_str, profile)
+
+    return profiles
+
+
+async def attach_user(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     enriched: List[Dict[str, Any]] = []
-    cache: Dict[str, Dict[str, Any] | None] = {}
+    profiles = await fetch_user_profiles(record.get("user_id") for record in records)
+    fallbacks: Dict[str, Dict[str, Any] | None] = {}
 
     for record in records:
         user_id = record.get("user_id")
         if user_id:
-            if user_id not in cache:
-                profile = fetch_user_profile(user_id)
-                if not profile:
-                    profile = fallback_user_from_record(record)
-                cache[user_id] = profile
-            profile_payload = cache[user_id]
+            user_id_str = str(user_id)
+            profile_payload = profiles.get(user_id_str)
+            if not profile_payload:
+                if user_id_str not in fallbacks:
+                    fallbacks[user_id_str] = fallback_user_from_record(record)
+                profile_payload = fallbacks[user_id_str]
             if profile_payload:
                 record = {**record, "user": profile_payload}
         else:
@@ -298,4 +508,3 @@ def attach_user(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         enriched.append(record)
 
     return enriched
-
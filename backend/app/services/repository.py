@@ -0,0 +1,116 @@
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from backend.app.db import supabase
+from backend.app.services.db_service import run_db
+
+ORDERS_TABLE = "orders"
+PROFILES_TABLE = "profiles"
+
+# Колонки для списков заказов: без служебных полей вроде updated_at.
+ORDER_LIST_COLUMNS = ",".join(
+    (
+        "id",
+        "user_id",
+        "status",
+        "payment_status",
+        "currency",
+        "total_cost",
+        "items",
+        "shipping_address",
+        "tracking_code",
+        "customer_name",
+        "customer_phone",
+        "customer_email",
+        "created_at",
+    )
+)
+
+
+# --- orders ---------------------------------------------------------------
+
+
+async def insert_order(payload: Dict[str, Any]) -> Any:
+    query = supabase.table(ORDERS_TABLE).insert(payload)
+    return await run_db(query.execute)
+
+
+async def select_orders(user_id: Optional[str] = None) -> Any:
+    query = supabase.table(ORDERS_TABLE).select(ORDER_LIST_COLUMNS)
+    if user_id is not None:
+        query = query.eq("user_id", user_id)
+    query = query.order("created_at", desc=True)
+    return await run_db(query.execute)
+
+
+async def select_orders_page(
+    limit: int,
+    after: Optional[Tuple[str, int]] = None,
+    status: Optional[str] = None,
+    payment_status: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+) -> Any:
+    """
+    Страница заказов в порядке (created_at, id) по убыванию. after — ключ
+    последней строки предыдущей страницы (keyset-пагинация без OFFSET).
+    """
+    query = supabase.table(ORDERS_TABLE).select(ORDER_LIST_COLUMNS)
+    if status is not None:
+        query = query.eq("status", status)
+    if payment_status is not None:
+        query = query.eq("payment_status", payment_status)
+    if created_from is not None:
+        query = query.gte("created_at", created_from.isoformat())
+    if created_to is not None:
+        query = query.lt("created_at", created_to.isoformat())
+    if after is not None:
+        created_at, order_id = after
+        query = query.or_(
+            f'created_at.lt."{created_at}",and(created_at.eq."{created_at}",id.lt.{order_id})'
+        )
+    query = query.order("created_at", desc=True).order("id", desc=True).limit(limit)
+    return await run_db(query.execute)
+
+
+async def select_order(order_id: int) -> Any:
+    query = supabase.table(ORDERS_TABLE).select("*").eq("id", order_id).limit(1)
+    return await run_db(query.execute)
+
+
+async def update_order(order_id: int, updates: Dict[str, Any]) -> Any:
+    query = supabase.table(ORDERS_TABLE).update(updates).eq("id", order_id)
+    return await run_db(query.execute)
+
+
+async def delete_order(order_id: int) -> Any:
+    query = supabase.table(ORDERS_TABLE).delete().eq("id", order_id)
+    return await run_db(query.execute)
+
+
+# --- profiles / auth users ------------------------------------------------
+
+
+async def select_profile_role(user_id: str) -> Any:
+    query = supabase.table(PROFILES_TABLE).select("role").eq("id", user_id).limit(1)
+    return await run_db(query.execute)
+
+
+async def get_auth_user(token: str) -> Any:
+    return await run_db(supabase.auth.get_user, token)
+
+
+async def get_auth_user_by_id(user_id: str) -> Any:
+    return await run_db(supabase.auth.admin.get_user_by_id, user_id)
+
+
+async def update_auth_user(user_id: str, updates: Dict[str, Any]) -> Any:
+    return await run_db(supabase.auth.admin.update_user_by_id, user_id, updates)
+
+
+async def sign_up(credentials: Dict[str, Any]) -> Any:
+    return await run_db(supabase.auth.sign_up, credentials)
+
+
+async def sign_in_with_password(credentials: Dict[str, Any]) -> Any:
+    return await run_db(supabase.auth.sign_in_with_password, credentials)
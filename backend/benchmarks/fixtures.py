@@ -0,0 +1,168 @@
+"""
+Синтетические данные для бенчмарков: заказы в форме строк orders_rows.csv
+(товары с data:image SVG, адрес доставки, поля покупателя), профили Supabase Auth
+и товары/группы в форме ответов Evotor API. Генерация детерминирована по seed.
+"""
+import random
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import Any, Dict, List, get_args
+from urllib.parse import quote
+
+from backend.app.config import DEFAULT_CURRENCY
+from backend.app.models import OrderStatusLiteral, PaymentStatusLiteral
+
+PRODUCT_WORDS = ["Вилка", "Колесо", "Рама", "Педали", "Цепь", "Грипсы", "Седло", "Руль", "Тормоз", "Покрышка"]
+BRANDS = ["Union", "TT", "Odyssey", "Cult", "Shadow", "Eclat", "Salt", "Fiend"]
+COLORS = ["зеленое", "черный", "красный", "хром", "синий", "белый"]
+MEASURES = ["шт", "компл", "пара"]
+CITIES = ["Москва", "Санкт-Петербург", "Казань", "Екатеринбург", None]
+STATUSES = get_args(OrderStatusLiteral)
+PAYMENT_STATUSES = get_args(PaymentStatusLiteral)
+SVG_FILLS = ["#0F172A", "#7C3AED", "#DC2626", "#059669"]
+
+
+def product_image(fill: str) -> str:
+    # Такие же SVG-заглушки, как в items выгрузки заказов: ~1.7 КБ на товар.
+    glow = "".join(
+        f'<stop offset="{offset}%" stop-color="#FFFFFF" stop-opacity="{opacity}"/>'
+        for offset, opacity in ((0, 0.25), (60, 0.1), (100, 0))
+    )
+    svg = (
+        '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 200 200">\n'
+        f'    <defs>\n      <radialGradient id="glow" cx="30%" cy="30%" r="70%">{glow}</radialGradient>\n    </defs>\n'
+        f'    <rect width="200" height="200" fill="{fill}" rx="32" ry="32"/>\n'
+        '    <circle cx="40" cy="40" r="80" fill="url(#glow)"/>\n'
+        '    <circle cx="160" cy="160" r="60" fill="url(#glow)" opacity="0.6"/>\n'
+        '    <rect x="20" y="120" width="40" height="4" fill="#FFFFFF" opacity="0.15" rx="2"/>\n'
+        '    <rect x="80" y="40" width="80" height="4" fill="#FFFFFF" opacity="0.1" rx="2"/>\n'
+        "  </svg>"
+    )
+    return "data:image/svg+xml;utf8," + quote(svg, safe="()")
+
+
+def make_uuid(rng: random.Random) -> str:
+    value = f"{rng.getrandbits(128):032x}"
+    return f"{value[:8]}-{value[8:12]}-4{value[13:16]}-{value[16:20]}-{value[20:]}"
+
+
+def make_groups(count: int = 40, seed: int = 1) -> List[Dict[str, Any]]:
+    """Группы товаров Evotor: первая четверть — корневые, остальные вложены в них."""
+    rng = random.Random(seed)
+    groups: List[Dict[str, Any]] = []
+    for index in range(count):
+        parent_id = groups[rng.randrange(len(groups))]["id"] if groups and index >= count // 4 else None
+        groups.append({"id": make_uuid(rng), "name": f" {rng.choice(PRODUCT_WORDS)}ы {index} ", "parent_id": parent_id, "code": str(index)})
+    return groups
+
+
+def make_products(count: int = 5000, groups: List[Dict[str, Any]] | None = None, seed: int = 2) -> List[Dict[str, Any]]:
+    """
+    Товары в форме ответа Evotor /stores/{uuid}/products: около 10% с нулевым
+    остатком или запретом продажи (их отбрасывает normalize_product).
+    """
+    rng = random.Random(seed)
+    groups = groups if groups is not None else make_groups()
+    products = []
+    for index in range(count):
+        quantity: Any = rng.choice([0, 0.0, -1]) if rng.random() < 0.08 else rng.randrange(1, 50)
+        products.append(
+            {
+                "id": make_uuid(rng),
+                "name": f"{rng.choice(PRODUCT_WORDS)} {rng.choice(BRANDS)} {index} {rng.choice(COLORS)}",
+                "price": str(rng.randrange(300, 40000)) if rng.random() < 0.1 else float(rng.randrange(300, 40000)),
+                "cost_price": float(rng.randrange(100, 20000)),
+                "quantity": quantity,
+                "measure_name": rng.choice(MEASURES),
+                "tax": "NO_VAT",
+                "allow_to_sell": rng.random() > 0.02,
+                "type": "NORMAL",
+                "parent_id": rng.choice(groups)["id"] if groups else None,
+                "barcodes": [str(4600000000000 + index)],
+                "created_at": "2024-03-01T10:00:00.000+0000",
+                "updated_at": "2025-10-25T20:00:00.000+0000",
+            }
+        )
+    return products
+
+
+def make_auth_user(user_id: str, index: int) -> Dict[str, Any]:
+    """Пользователь в форме ответа supabase.auth.admin.get_user_by_id().user."""
+    return {
+        "id": user_id,
+        "email": f"customer{index}@example.com",
+        "phone": "",
+        "user_metadata": {"full_name": f"Покупатель {index}", "phone": f"+7999{index:07d}"},
+        "app_metadata": {"provider": "email", "providers": ["email"]},
+        "created_at": "2025-01-10T12:00:00.000000+00:00",
+    }
+
+
+def auth_user_response(user: Dict[str, Any]) -> SimpleNamespace:
+    return SimpleNamespace(user=SimpleNamespace(**user))
+
+
+def make_order_items(rng: random.Random, products: List[Dict[str, Any]], count: int) -> List[Dict[str, Any]]:
+    items = []
+    for product in rng.sample(products, count):
+        items.append(
+            {
+                "id": product["id"],
+                "name": product["name"],
+                "image": product_image(rng.choice(SVG_FILLS)),
+                "price": int(float(product["price"])),
+                "quantity": rng.randrange(1, 4),
+            }
+        )
+    return items
+
+
+def make_order_records(
+    count: int = 200,
+    users: int = 50,
+    products: List[Dict[str, Any]] | None = None,
+    seed: int = 3,
+) -> List[Dict[str, Any]]:
+    """
+    Строки таблицы orders (как в orders_rows.csv): у части заказов нет user_id
+    и покупатель известен только по customer_* полям, у части нет email.
+    """
+    rng = random.Random(seed)
+    products = products if products is not None else make_products(200)
+    user_ids = [make_uuid(rng) for _ in range(users)]
+    started_at = datetime(2025, 10, 25, 23, 10, 20, 665417, tzinfo=timezone.utc)
+
+    records = []
+    for index in range(count):
+        items = make_order_items(rng, products, rng.randrange(1, 6))
+        has_address = rng.random() < 0.7
+        records.append(
+            {
+                "id": count - index,
+                "user_id": rng.choice(user_ids) if rng.random() < 0.85 else None,
+                "status": rng.choice(STATUSES),
+                "payment_status": rng.choice(PAYMENT_STATUSES),
+                "currency": DEFAULT_CURRENCY,
+                "total_cost": sum(item["price"] * item["quantity"] for item in items),
+                "items": items,
+                "shipping_address": {
+                    "id": str(1761434231604 + index) if has_address else None,
+                    "city": rng.choice(CITIES) if has_address else None,
+                    "title": "Дом" if has_address else "Адрес доставки",
+                    "address": f"ул. Ленина, {index}",
+                    "comment": None,
+                },
+                "tracking_code": None,
+                "created_at": (started_at - timedelta(minutes=7 * index)).isoformat(sep=" ").replace("+00:00", "+00"),
+                "customer_name": f"Покупатель {index % users}",
+                "customer_phone": f"+7999{index % users:07d}",
+                "customer_email": f"customer{index % users}@example.com" if rng.random() < 0.8 else None,
+                "updated_at": None,
+            }
+        )
+    return records
+
+
+def auth_users_for(records: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    user_ids = sorted({record["user_id"] for record in records if record.get("user_id")})
+    return {user_id: make_auth_user(user_id, index) for index, user_id in enumerate(user_ids)}
@@ -0,0 +1,237 @@
+"""
+Микробенчмарки горячих путей order_service, каталога и списания остатков.
+Evotor и Supabase заменены локальными заглушками (backend.benchmarks.stubs),
+данные синтетические (backend.benchmarks.fixtures).
+
+Запуск из корня репозитория:
+
+    python -m backend.benchmarks.hot_paths --output baseline.json
+    python -m backend.benchmarks.hot_paths --compare baseline.json
+
+С --compare результаты сравниваются по медиане с сохранённым прогоном; если
+какой-то бенчмарк медленнее больше чем на --threshold, код выхода 1.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+
+from backend.app.routers.catalog import list_items
+from backend.app.services import catalog_service
+from backend.app.services.catalog_service import get_catalog_snapshot, normalize_product
+from backend.app.services.inventory_service import decrease_inventory_for_items
+from backend.app.services.order_service import attach_user, build_order_result, build_order_row, summarize_order
+from backend.benchmarks import fixtures
+from backend.benchmarks.orders_serialization import serialize_fast, serialize_with_models
+from backend.benchmarks.stubs import EvotorStub, evotor_stub, reset_catalog, reset_profile_cache, supabase_auth_stub
+
+ORDERS_COUNT = 200
+PRODUCTS_COUNT = 5000
+GROUPS_COUNT = 40
+CHECKOUT_ITEMS = 5
+REPEAT = 7
+MIN_REPEAT_SECONDS = 0.2
+QUICK_REPEAT = 3
+QUICK_MIN_REPEAT_SECONDS = 0.02
+DEFAULT_THRESHOLD = 0.10
+
+Benchmark = Callable[[], Union[Any, Awaitable[Any]]]
+
+
+async def call(func: Benchmark) -> None:
+    result = func()
+    if asyncio.iscoroutine(result):
+        await result
+
+
+async def measure(func: Benchmark, repeat: int, min_seconds: float) -> Dict[str, Any]:
+    """Время одного вызова: число вызовов в серии подбирается так, чтобы серия шла не меньше min_seconds."""
+    await call(func)
+
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            await call(func)
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_seconds:
+            break
+        number *= 2 if elapsed <= 0 else max(2, min(10, int(min_seconds / elapsed) + 1))
+
+    timings = [elapsed / number]
+    for _ in range(repeat - 1):
+        started = time.perf_counter()
+        for _ in range(number):
+            await call(func)
+        timings.append((time.perf_counter() - started) / number)
+
+    return {
+        "median": statistics.median(timings),
+        "min": min(timings),
+        "stdev": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        "number": number,
+        "repeat": repeat,
+    }
+
+
+def list_items_call(**params: Any) -> Callable[[], Awaitable[Any]]:
+    # Обработчик вызывается напрямую, поэтому значения Query по умолчанию передаём явно.
+    query: Dict[str, Any] = {
+        "page": 1,
+        "page_size": 20,
+        "group_id": None,
+        "include_subgroups": True,
+        "search": None,
+        "sort": None,
+        "order": "asc",
+        "min_price": None,
+        "max_price": None,
+        "min_quantity": None,
+        "if_none_match": None,
+    }
+    query.update(params)
+    return lambda: list_items(**query)
+
+
+def uncached(func: Callable[[], Awaitable[Any]]) -> Callable[[], Awaitable[Any]]:
+    """Каждый вызов рендерит страницу заново, а не берёт её из page_cache снимка."""
+
+    async def run() -> Any:
+        if catalog_service._snapshot is not None:
+            catalog_service._snapshot.page_cache.clear()
+        return await func()
+
+    return run
+
+
+def build_benchmarks() -> Dict[str, Benchmark]:
+    groups = fixtures.make_groups(GROUPS_COUNT)
+    raw_products = fixtures.make_products(PRODUCTS_COUNT, groups)
+    records = fixtures.make_order_records(ORDERS_COUNT, products=raw_products)
+    users = fixtures.auth_users_for(records)
+    summaries = [summarize_order(record) for record in records]
+    enriched = [{**order, "user": users[order["user_id"]]} if order.get("user_id") else order for order in summaries]
+
+    sellable = [product for product in raw_products if normalize_product(product) is not None]
+    checkout_items = [{"id": product["id"], "quantity": 1} for product in sellable[:CHECKOUT_ITEMS]]
+    root_group = groups[0]["id"]
+
+    async def attach_user_cold() -> Any:
+        reset_profile_cache()
+        return await attach_user(summaries)
+
+    async def catalog_cold_load() -> Any:
+        reset_catalog()
+        return await get_catalog_snapshot()
+
+    return {
+        "order_service.build_order_result": lambda: [build_order_result(order) for order in enriched],
+        "order_service.build_order_row": lambda: [build_order_row(order) for order in enriched],
+        "order_service.attach_user.cold": attach_user_cold,
+        "order_service.attach_user.warm": lambda: attach_user(summaries),
+        "orders.viewall_body.pydantic": lambda: serialize_with_models(enriched),
+        "orders.viewall_body.fast": lambda: serialize_fast(enriched),
+        "catalog_service.normalize_product": lambda: [normalize_product(product) for product in raw_products],
+        "catalog.cold_load": catalog_cold_load,
+        "catalog.list_items.page_cached": list_items_call(page=3),
+        "catalog.list_items.page": uncached(list_items_call(page=3)),
+        "catalog.list_items.group": uncached(list_items_call(group_id=root_group)),
+        "catalog.list_items.search": list_items_call(search="колесо union"),
+        "catalog.list_items.filter_sort": uncached(
+            list_items_call(sort="price", order="desc", min_price=1000, max_price=20000, min_quantity=2, page=2)
+        ),
+        "catalog.list_items.deep_page": uncached(list_items_call(sort="name", page=200, page_size=20)),
+        "inventory_service.decrease_inventory_for_items": lambda: decrease_inventory_for_items(checkout_items),
+    }, EvotorStub(raw_products, groups), users
+
+
+async def run(selected: Optional[List[str]], repeat: int, min_seconds: float) -> Dict[str, Dict[str, Any]]:
+    benchmarks, stub, users = build_benchmarks()
+    results: Dict[str, Dict[str, Any]] = {}
+
+    with evotor_stub(stub), supabase_auth_stub(users):
+        reset_catalog()
+        reset_profile_cache()
+        for name, func in benchmarks.items():
+            if selected and not any(part in name for part in selected):
+                continue
+            results[name] = await measure(func, repeat, min_seconds)
+            print(f"{name:<50} {results[name]['median'] * 1000:10.3f} мс  (±{results[name]['stdev'] * 1000:.3f})")
+
+    return results
+
+
+def current_commit() -> Optional[str]:
+    try:
+        completed = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return completed.stdout.strip() or None
+
+
+def build_report(results: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    return {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "commit": current_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "unit": "seconds",
+        },
+        "benchmarks": results,
+    }
+
+
+def compare(baseline: Dict[str, Any], results: Dict[str, Dict[str, Any]], threshold: float) -> bool:
+    """Печатает сравнение с сохранённым прогоном; возвращает True, если есть замедления больше threshold."""
+    previous = baseline.get("benchmarks") or {}
+    regressed = False
+    print(f"\nСравнение с {baseline.get('meta', {}).get('commit') or 'сохранённым прогоном'}:")
+    for name, result in results.items():
+        old = previous.get(name)
+        if not old:
+            print(f"{name:<50} {'новый':>10}")
+            continue
+        ratio = result["median"] / old["median"] if old["median"] else float("inf")
+        mark = ""
+        if ratio > 1 + threshold:
+            mark = "  медленнее"
+            regressed = True
+        elif ratio < 1 - threshold:
+            mark = "  быстрее"
+        print(f"{name:<50} {old['median'] * 1000:10.3f} → {result['median'] * 1000:10.3f} мс  x{ratio:.2f}{mark}")
+    return regressed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Микробенчмарки горячих путей бэкенда.")
+    parser.add_argument("--output", help="куда записать результаты в JSON")
+    parser.add_argument("--compare", help="JSON предыдущего прогона для сравнения")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="допустимое замедление, доля (0.1 = 10%%)")
+    parser.add_argument("--filter", action="append", help="запускать только бенчмарки, в имени которых есть подстрока")
+    parser.add_argument("--quick", action="store_true", help="короткий прогон для проверки, без точных цифр")
+    args = parser.parse_args()
+
+    repeat, min_seconds = (QUICK_REPEAT, QUICK_MIN_REPEAT_SECONDS) if args.quick else (REPEAT, MIN_REPEAT_SECONDS)
+    results = asyncio.run(run(args.filter, repeat, min_seconds))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(build_report(results), file, ensure_ascii=False, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            baseline = json.load(file)
+        if compare(baseline, results, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+"""
+Сериализация списка заказов для /api/orders/viewall: прежний путь (OrderResult +
+валидация response_model + json) против build_order_row + orjson.
+
+Запуск из корня репозитория: python -m backend.benchmarks.orders_serialization
+"""
+import json
+import timeit
+from typing import Any, Dict, List
+
+from pydantic import TypeAdapter
+
+from backend.app.models import OrdersPage
+from backend.app.services.order_service import build_order_result, build_order_row, dump_orders_json, summarize_order
+from backend.benchmarks.fixtures import auth_users_for, make_order_records
+
+ORDERS_COUNT = 200
+REPEAT = 5
+NUMBER = 20
+
+_page_adapter = TypeAdapter(OrdersPage)
+
+
+def make_orders(count: int, seed: int = 1) -> List[Dict[str, Any]]:
+    """Заказы после summarize_order и attach_user: профиль пользователя уже подставлен."""
+    records = make_order_records(count, seed=seed)
+    users = auth_users_for(records)
+    orders = []
+    for record in records:
+        order = summarize_order(record)
+        if order.get("user_id"):
+            order["user"] = users[order["user_id"]]
+        orders.append(order)
+    return orders
+
+
+def serialize_with_models(orders: List[Dict[str, Any]]) -> bytes:
+    page = OrdersPage(items=[build_order_result(order) for order in orders], next_cursor=None)
+    # Как FastAPI: проверка по response_model, затем JSONResponse.
+    content = _page_adapter.dump_python(_page_adapter.validate_python(page), mode="json")
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def serialize_fast(orders: List[Dict[str, Any]]) -> bytes:
+    return dump_orders_json({"items": [build_order_row(order) for order in orders], "next_cursor": None})
+
+
+BENCHMARKS = {
+    "orders_page.pydantic": serialize_with_models,
+    "orders_page.fast": serialize_fast,
+}
+
+
+def run(count: int = ORDERS_COUNT) -> Dict[str, float]:
+    orders = make_orders(count)
+    assert serialize_with_models(orders) == serialize_fast(orders)
+
+    results = {}
+    for name, func in BENCHMARKS.items():
+        timings = timeit.repeat(lambda: func(orders), repeat=REPEAT, number=NUMBER)
+        results[name] = min(timings) / NUMBER
+    return results
+
+
+def main() -> None:
+    for name, seconds in run().items():
+        print(f"{name:<24} {seconds * 1000:8.3f} мс на {ORDERS_COUNT} заказов")
+
+
+if __name__ == "__main__":
+    main()
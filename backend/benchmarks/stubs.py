@@ -0,0 +1,97 @@
+"""
+Локальные заглушки внешних сервисов для бенчмарков: Evotor API отвечает через
+httpx.MockTransport из памяти, Supabase Auth подменяется в repository. Сеть не нужна.
+"""
+import json
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+import httpx
+
+from backend.app.services import catalog_service, evotor_client, order_service, repository
+from backend.app.services.catalog_table import ProductTable
+from backend.benchmarks.fixtures import auth_user_response
+
+EVOTOR_PAGE_SIZE = 1000
+
+
+class EvotorStub:
+    """Товары и группы одного магазина Evotor: постраничная выдача, GET и PATCH товара."""
+
+    def __init__(self, products: List[Dict[str, Any]], groups: List[Dict[str, Any]], page_size: int = EVOTOR_PAGE_SIZE) -> None:
+        self.products = {product["id"]: dict(product) for product in products}
+        self.groups = groups
+        self.page_size = page_size
+        self.requests = 0
+
+    def page(self, items: List[Dict[str, Any]], cursor: Optional[str]) -> Dict[str, Any]:
+        start = int(cursor or 0)
+        end = start + self.page_size
+        paging = {"next_cursor": str(end)} if end < len(items) else {}
+        return {"items": items[start:end], "paging": paging}
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        path = request.url.path
+        cursor = request.url.params.get("cursor")
+
+        if path == catalog_service.PRODUCTS_PATH and request.method == "GET":
+            return httpx.Response(200, json=self.page(list(self.products.values()), cursor))
+        if path == catalog_service.GROUPS_PATH and request.method == "GET":
+            return httpx.Response(200, json=self.page(self.groups, cursor))
+
+        if path.startswith(catalog_service.PRODUCTS_PATH + "/"):
+            product = self.products.get(path.rsplit("/", 1)[-1])
+            if product is None:
+                return httpx.Response(404, json={"message": "Not found"})
+            if request.method == "PATCH":
+                product.update(json.loads(request.content))
+            return httpx.Response(200, json=product)
+
+        return httpx.Response(404, json={"message": "Not found"})
+
+
+@contextmanager
+def evotor_stub(stub: EvotorStub) -> Iterator[EvotorStub]:
+    """Направляет evotor_client в заглушку; ограничитель частоты на время бенчмарка выключен."""
+    previous_rate = evotor_client.rate_limiter.rate
+    evotor_client.rate_limiter.rate = 0
+    evotor_client.breaker.record_success()
+    evotor_client.set_client(
+        httpx.AsyncClient(base_url=evotor_client.BASE_URL, transport=httpx.MockTransport(stub.handle))
+    )
+    try:
+        yield stub
+    finally:
+        evotor_client.set_client(None)
+        evotor_client.rate_limiter.rate = previous_rate
+
+
+@contextmanager
+def supabase_auth_stub(users: Dict[str, Dict[str, Any]]) -> Iterator[None]:
+    """Подменяет repository.get_auth_user_by_id: профили берутся из users."""
+    original = repository.get_auth_user_by_id
+
+    async def get_auth_user_by_id(user_id: str) -> Any:
+        user = users.get(user_id)
+        if user is None:
+            raise RuntimeError("User not found")
+        return auth_user_response(user)
+
+    repository.get_auth_user_by_id = get_auth_user_by_id
+    try:
+        yield
+    finally:
+        repository.get_auth_user_by_id = original
+
+
+def reset_profile_cache() -> None:
+    order_service._profile_cache.clear()
+
+
+def reset_catalog() -> None:
+    """Возвращает кэш каталога в холодное состояние, как сразу после старта воркера."""
+    for cache, empty in ((catalog_service._products_cache, ProductTable()), (catalog_service._groups_cache, [])):
+        cache.update({"version": 0.0, "timestamp": 0.0, "data": empty, "loaded": False, "error": None, "error_at": 0.0, "task": None})
+    catalog_service._snapshot = None
+    catalog_service._product_cache.clear()
@@ -0,0 +1,80 @@
+"""Задержка и ошибки, которые заглушки внешних сервисов добавляют к ответам."""
+import argparse
+import asyncio
+import random
+from dataclasses import dataclass
+from typing import List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+HEALTH_PATH = "/health"
+
+
+@dataclass(frozen=True)
+class FaultConfig:
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    error_status: int = 503
+    # Для 429/503: значение Retry-After в секундах, None — без заголовка.
+    retry_after: Optional[float] = None
+
+    def delay_seconds(self) -> float:
+        return max(self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms), 0.0) / 1000
+
+
+def add_fault_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="задержка каждого ответа, мс")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="разброс задержки ±, мс")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="доля ответов с ошибкой, 0..1")
+    parser.add_argument("--error-status", type=int, default=503, help="HTTP-статус внедрённых ошибок")
+    parser.add_argument("--retry-after", type=float, default=None, help="Retry-After для внедрённых ошибок, с")
+
+
+def fault_config_from_args(args: argparse.Namespace) -> FaultConfig:
+    return FaultConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        retry_after=args.retry_after,
+    )
+
+
+def fault_arguments(faults: FaultConfig) -> List[str]:
+    """Та же конфигурация в виде аргументов командной строки заглушки."""
+    arguments = [
+        "--latency-ms", str(faults.latency_ms),
+        "--jitter-ms", str(faults.jitter_ms),
+        "--error-rate", str(faults.error_rate),
+        "--error-status", str(faults.error_status),
+    ]
+    if faults.retry_after is not None:
+        arguments += ["--retry-after", str(faults.retry_after)]
+    return arguments
+
+
+def add_fault_injection(app: FastAPI, faults: FaultConfig) -> None:
+    """Перед каждым ответом (кроме /health) ждёт latency ± jitter и с вероятностью error_rate отвечает ошибкой."""
+
+    @app.middleware("http")
+    async def inject_faults(request: Request, call_next):
+        if request.url.path == HEALTH_PATH:
+            return await call_next(request)
+
+        delay = faults.delay_seconds()
+        if delay:
+            await asyncio.sleep(delay)
+
+        if faults.error_rate and random.random() < faults.error_rate:
+            headers = {}
+            if faults.retry_after is not None:
+                headers["Retry-After"] = str(int(faults.retry_after))
+            return JSONResponse({"message": "Injected failure"}, status_code=faults.error_status, headers=headers)
+
+        return await call_next(request)
+
+    @app.get(HEALTH_PATH)
+    async def health() -> dict:
+        return {"status": "ok"}
@@ -0,0 +1,112 @@
+"""
+Заглушка Evotor API для нагрузочного теста: постраничные товары (с cursor и since),
+группы товаров, GET и PATCH товара. Данные — синтетические из backend.benchmarks.fixtures.
+
+    python -m backend.loadtest.mock_evotor --port 9101 --latency-ms 80 --jitter-ms 40 --error-rate 0.01
+"""
+import argparse
+import time
+from typing import Any, Dict, List, Optional
+
+import uvicorn
+from fastapi import Body, FastAPI, Header, HTTPException, Query
+
+from backend.benchmarks import fixtures
+from backend.loadtest.faults import FaultConfig, add_fault_arguments, add_fault_injection, fault_config_from_args
+
+DEFAULT_PORT = 9101
+DEFAULT_PAGE_SIZE = 1000
+
+
+def now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+def create_app(
+    products: List[Dict[str, Any]],
+    groups: List[Dict[str, Any]],
+    faults: FaultConfig = FaultConfig(),
+    page_size: int = DEFAULT_PAGE_SIZE,
+) -> FastAPI:
+    app = FastAPI(title="Evotor API (заглушка)")
+    add_fault_injection(app, faults)
+
+    catalog: Dict[str, Dict[str, Any]] = {product["id"]: dict(product) for product in products}
+    # Время последнего изменения товара — для выборки с since.
+    updated_at: Dict[str, int] = {product_id: 0 for product_id in catalog}
+
+    def check_token(authorization: Optional[str]) -> None:
+        if not authorization or not authorization.startswith("Bearer "):
+            raise HTTPException(status_code=401, detail="Unauthorized")
+
+    def page(items: List[Dict[str, Any]], cursor: Optional[str]) -> Dict[str, Any]:
+        start = int(cursor) if cursor and cursor.isdigit() else 0
+        end = start + page_size
+        return {"items": items[start:end], "paging": {"next_cursor": str(end)} if end < len(items) else {}}
+
+    @app.get("/stores/{store_uuid}/products")
+    async def list_products(
+        store_uuid: str,
+        cursor: Optional[str] = Query(default=None),
+        since: Optional[int] = Query(default=None),
+        authorization: Optional[str] = Header(default=None),
+    ) -> Dict[str, Any]:
+        check_token(authorization)
+        if since is None:
+            items = list(catalog.values())
+        else:
+            items = [catalog[product_id] for product_id, changed_at in updated_at.items() if changed_at > since]
+        return page(items, cursor)
+
+    @app.get("/stores/{store_uuid}/product-groups")
+    async def list_groups(
+        store_uuid: str,
+        cursor: Optional[str] = Query(default=None),
+        authorization: Optional[str] = Header(default=None),
+    ) -> Dict[str, Any]:
+        check_token(authorization)
+        return page(groups, cursor)
+
+    @app.get("/stores/{store_uuid}/products/{product_id}")
+    async def get_product(store_uuid: str, product_id: str, authorization: Optional[str] = Header(default=None)) -> Dict[str, Any]:
+        check_token(authorization)
+        product = catalog.get(product_id)
+        if product is None:
+            raise HTTPException(status_code=404, detail="Product not found")
+        return product
+
+    @app.patch("/stores/{store_uuid}/products/{product_id}")
+    async def patch_product(
+        store_uuid: str,
+        product_id: str,
+        changes: Dict[str, Any] = Body(...),
+        authorization: Optional[str] = Header(default=None),
+    ) -> Dict[str, Any]:
+        check_token(authorization)
+        product = catalog.get(product_id)
+        if product is None:
+            raise HTTPException(status_code=404, detail="Product not found")
+        product.update(changes)
+        updated_at[product_id] = now_ms()
+        return product
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Заглушка Evotor API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--products", type=int, default=5000, help="число товаров в магазине")
+    parser.add_argument("--groups", type=int, default=40, help="число групп товаров")
+    parser.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE)
+    add_fault_arguments(parser)
+    args = parser.parse_args()
+
+    groups = fixtures.make_groups(args.groups)
+    app = create_app(fixtures.make_products(args.products, groups), groups, fault_config_from_args(args), args.page_size)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
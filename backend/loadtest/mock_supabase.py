@@ -0,0 +1,355 @@
+"""
+Заглушка Supabase для нагрузочного теста: PostgREST для таблиц orders и profiles
+(фильтры eq/neq/gt/gte/lt/lte/is, or/and, order, limit, offset) и Supabase Auth
+(signup, вход по паролю, /user, admin/users). Токены подписываются HS256 общим
+секретом, поэтому бэкенд проверяет их локально, как с настоящим Supabase.
+
+    python -m backend.loadtest.mock_supabase --port 9102 --jwt-secret loadtest-secret --latency-ms 20
+"""
+import argparse
+import itertools
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import jwt
+import uvicorn
+from fastapi import FastAPI, Header, Request
+from fastapi.responses import JSONResponse, Response
+
+from backend.benchmarks import fixtures
+from backend.loadtest.faults import FaultConfig, add_fault_arguments, add_fault_injection, fault_config_from_args
+
+DEFAULT_PORT = 9102
+DEFAULT_JWT_SECRET = "loadtest-jwt-secret-loadtest-jwt-secret"
+DEFAULT_PASSWORD = "loadtest-password"
+ADMIN_EMAIL = "admin@example.com"
+ADMIN_USER_ID = "00000000-0000-4000-8000-000000000001"
+TOKEN_TTL_SECONDS = 3600
+RESERVED_PARAMS = {"select", "order", "limit", "offset", "columns", "on_conflict"}
+
+Row = Dict[str, Any]
+Predicate = Callable[[Row], bool]
+
+
+# --- PostgREST --------------------------------------------------------------
+
+
+def split_top_level(text: str) -> List[str]:
+    """Делит по запятым вне скобок и кавычек: "a.eq.1,and(b.eq.2,c.eq.3)" → два условия."""
+    parts, depth, quoted, current = [], 0, False, []
+    for char in text:
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char == "(":
+            depth += 1
+        elif not quoted and char == ")":
+            depth -= 1
+        elif not quoted and depth == 0 and char == ",":
+            parts.append("".join(current))
+            current = []
+            continue
+        current.append(char)
+    if current:
+        parts.append("".join(current))
+    return parts
+
+
+def comparable(value: Any, raw: str) -> Tuple[Any, Any]:
+    if isinstance(value, bool):
+        return value, raw.lower() == "true"
+    if isinstance(value, (int, float)):
+        try:
+            return value, float(raw)
+        except ValueError:
+            return str(value), raw
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value), datetime.fromisoformat(raw)
+        except ValueError:
+            pass
+    return str(value), raw
+
+
+def compare(value: Any, operator: str, raw: str) -> bool:
+    if operator == "is":
+        return value is None if raw == "null" else str(value).lower() == raw
+    if value is None:
+        return False
+
+    left, right = comparable(value, raw)
+    try:
+        return {
+            "eq": lambda: left == right,
+            "neq": lambda: left != right,
+            "gt": lambda: left > right,
+            "gte": lambda: left >= right,
+            "lt": lambda: left < right,
+            "lte": lambda: left <= right,
+        }[operator]()
+    except (KeyError, TypeError):
+        return False
+
+
+def parse_condition(text: str) -> Predicate:
+    for combinator, reducer in (("and", all), ("or", any)):
+        if text.startswith(f"{combinator}(") and text.endswith(")"):
+            predicates = [parse_condition(part) for part in split_top_level(text[len(combinator) + 1:-1])]
+            return lambda row: reducer(predicate(row) for predicate in predicates)
+
+    column, operator, raw = text.split(".", 2)
+    raw = raw[1:-1] if len(raw) >= 2 and raw[0] == raw[-1] == '"' else raw
+    return lambda row: compare(row.get(column), operator, raw)
+
+
+def parse_filters(request: Request) -> List[Predicate]:
+    predicates = []
+    for key, value in request.query_params.multi_items():
+        if key in ("or", "and"):
+            predicates.append(parse_condition(f"{key}{value}"))
+        elif key not in RESERVED_PARAMS:
+            predicates.append(parse_condition(f"{key}.{value}"))
+    return predicates
+
+
+def sort_key(value: Any) -> Tuple[bool, Any]:
+    if isinstance(value, str):
+        try:
+            return False, datetime.fromisoformat(value)
+        except ValueError:
+            pass
+    return value is None, value
+
+
+def apply_order(rows: List[Row], order: Optional[str]) -> List[Row]:
+    if not order:
+        return rows
+    # Сортировки устойчивые: применяем ключи с последнего.
+    for term in reversed(order.split(",")):
+        column, _, direction = term.partition(".")
+        rows = sorted(rows, key=lambda row: sort_key(row.get(column)), reverse=direction.startswith("desc"))
+    return rows
+
+
+def project(rows: List[Row], select: Optional[str]) -> List[Row]:
+    if not select or select == "*":
+        return rows
+    columns = [column.strip() for column in select.split(",")]
+    return [{column: row.get(column) for column in columns} for row in rows]
+
+
+def rows_response(rows: List[Row], status_code: int = 200) -> JSONResponse:
+    return JSONResponse(rows, status_code=status_code, headers={"Content-Range": f"0-{max(len(rows) - 1, 0)}/*"})
+
+
+def now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+# --- Auth -------------------------------------------------------------------
+
+
+def auth_error(status_code: int, message: str) -> JSONResponse:
+    return JSONResponse({"code": status_code, "msg": message, "error_description": message}, status_code=status_code)
+
+
+def create_app(
+    orders: List[Row],
+    users: Dict[str, Row],
+    roles: Dict[str, str],
+    jwt_secret: str = DEFAULT_JWT_SECRET,
+    faults: FaultConfig = FaultConfig(),
+) -> FastAPI:
+    """
+    orders — строки таблицы orders, users — пользователи Auth по id (пароль у всех
+    DEFAULT_PASSWORD), roles — profiles.role по id пользователя.
+    """
+    app = FastAPI(title="Supabase (заглушка)")
+    add_fault_injection(app, faults)
+
+    tables: Dict[str, List[Row]] = {
+        "orders": [dict(order) for order in orders],
+        "profiles": [{"id": user_id, "role": role} for user_id, role in roles.items()],
+    }
+    order_ids = itertools.count(max((order["id"] for order in orders), default=0) + 1)
+    users_by_email = {user["email"]: user for user in users.values() if user.get("email")}
+    passwords = {user_id: DEFAULT_PASSWORD for user_id in users}
+
+    def issue_session(user: Row) -> Row:
+        issued_at = int(time.time())
+        claims = {
+            "sub": user["id"],
+            "aud": "authenticated",
+            "role": "authenticated",
+            "iat": issued_at,
+            "exp": issued_at + TOKEN_TTL_SECONDS,
+            "email": user.get("email"),
+            "phone": user.get("phone") or "",
+            "user_metadata": user.get("user_metadata") or {},
+            "app_metadata": user.get("app_metadata") or {},
+            "session_id": uuid.uuid4().hex,
+        }
+        if roles.get(user["id"]):
+            claims["user_role"] = roles[user["id"]]
+        return {
+            "access_token": jwt.encode(claims, jwt_secret, algorithm="HS256"),
+            "token_type": "bearer",
+            "expires_in": TOKEN_TTL_SECONDS,
+            "expires_at": issued_at + TOKEN_TTL_SECONDS,
+            "refresh_token": uuid.uuid4().hex,
+            "user": user,
+        }
+
+    def user_from_token(authorization: Optional[str]) -> Optional[Row]:
+        _, _, token = (authorization or "").partition(" ")
+        try:
+            claims = jwt.decode(token, jwt_secret, algorithms=["HS256"], audience="authenticated")
+        except jwt.PyJWTError:
+            return None
+        return users.get(claims.get("sub"))
+
+    @app.get("/rest/v1/{table}")
+    async def select_rows(table: str, request: Request) -> Response:
+        predicates = parse_filters(request)
+        rows = [row for row in tables.get(table, []) if all(predicate(row) for predicate in predicates)]
+        rows = apply_order(rows, request.query_params.get("order"))
+        offset = int(request.query_params.get("offset") or 0)
+        limit = request.query_params.get("limit")
+        rows = rows[offset:offset + int(limit)] if limit else rows[offset:]
+        return rows_response(project(rows, request.query_params.get("select")))
+
+    @app.post("/rest/v1/{table}")
+    async def insert_rows(table: str, request: Request) -> Response:
+        payload = await request.json()
+        inserted = []
+        for values in payload if isinstance(payload, list) else [payload]:
+            row = dict(values)
+            if table == "orders":
+                row = {"payment_status": "Не оплачен", "tracking_code": None, "updated_at": None, **row}
+                row.setdefault("id", next(order_ids))
+                row.setdefault("created_at", now_iso())
+            tables.setdefault(table, []).append(row)
+            inserted.append(row)
+        return rows_response(inserted, status_code=201)
+
+    @app.patch("/rest/v1/{table}")
+    async def update_rows(table: str, request: Request) -> Response:
+        changes = await request.json()
+        predicates = parse_filters(request)
+        updated = []
+        for row in tables.get(table, []):
+            if all(predicate(row) for predicate in predicates):
+                row.update(changes)
+                if table == "orders":
+                    row["updated_at"] = now_iso()
+                updated.append(row)
+        return rows_response(updated)
+
+    @app.delete("/rest/v1/{table}")
+    async def delete_rows(table: str, request: Request) -> Response:
+        predicates = parse_filters(request)
+        rows = tables.get(table, [])
+        deleted = [row for row in rows if all(predicate(row) for predicate in predicates)]
+        deleted_ids = {id(row) for row in deleted}
+        tables[table] = [row for row in rows if id(row) not in deleted_ids]
+        return rows_response(deleted)
+
+    @app.post("/auth/v1/signup")
+    async def sign_up(request: Request) -> Response:
+        payload = await request.json()
+        email = payload.get("email")
+        if not email or not payload.get("password"):
+            return auth_error(422, "Signup requires a valid password")
+        if email in users_by_email:
+            return auth_error(422, "User already registered")
+
+        user = fixtures.make_auth_user(str(uuid.uuid4()), len(users))
+        user.update({"email": email, "user_metadata": payload.get("data") or {}, "aud": "authenticated", "created_at": now_iso()})
+        users[user["id"]] = user
+        users_by_email[email] = user
+        passwords[user["id"]] = payload["password"]
+        return JSONResponse(issue_session(user))
+
+    @app.post("/auth/v1/token")
+    async def sign_in(request: Request) -> Response:
+        payload = await request.json()
+        user = users_by_email.get(payload.get("email"))
+        if user is None or passwords.get(user["id"]) != payload.get("password"):
+            return JSONResponse({"error": "invalid_grant", "error_description": "Invalid login credentials"}, status_code=400)
+        return JSONResponse(issue_session(user))
+
+    @app.get("/auth/v1/user")
+    async def get_user(authorization: Optional[str] = Header(default=None)) -> Response:
+        user = user_from_token(authorization)
+        return JSONResponse(user) if user else auth_error(401, "invalid JWT")
+
+    @app.get("/auth/v1/admin/users/{user_id}")
+    async def admin_get_user(user_id: str) -> Response:
+        user = users.get(user_id)
+        return JSONResponse(user) if user else auth_error(404, "User not found")
+
+    @app.put("/auth/v1/admin/users/{user_id}")
+    async def admin_update_user(user_id: str, request: Request) -> Response:
+        user = users.get(user_id)
+        if user is None:
+            return auth_error(404, "User not found")
+        changes = await request.json()
+        if "user_metadata" in changes:
+            user["user_metadata"] = changes["user_metadata"]
+        if changes.get("email"):
+            users_by_email.pop(user.get("email"), None)
+            user["email"] = changes["email"]
+            users_by_email[user["email"]] = user
+        if changes.get("password"):
+            passwords[user_id] = changes["password"]
+        user["updated_at"] = now_iso()
+        return JSONResponse(user)
+
+    @app.get("/auth/v1/.well-known/jwks.json")
+    async def jwks() -> Dict[str, Any]:
+        # Токены подписаны HS256 — публичных ключей нет.
+        return {"keys": []}
+
+    return app
+
+
+def seed(orders_count: int, users_count: int, products_count: int, groups_count: int) -> Tuple[List[Row], Dict[str, Row], Dict[str, str]]:
+    """Заказы на товары того же магазина, что отдаёт mock_evotor с теми же --products/--groups, и администратор."""
+    products = fixtures.make_products(products_count, fixtures.make_groups(groups_count))
+    orders = fixtures.make_order_records(orders_count, users=users_count, products=products)
+
+    users: Dict[str, Row] = {}
+    for user_id, user in fixtures.auth_users_for(orders).items():
+        users[user_id] = {**user, "aud": "authenticated"}
+    users[ADMIN_USER_ID] = {
+        **fixtures.make_auth_user(ADMIN_USER_ID, 0),
+        "email": ADMIN_EMAIL,
+        "aud": "authenticated",
+        "user_metadata": {"full_name": "Администратор"},
+    }
+
+    roles = {user_id: "user" for user_id in users}
+    roles[ADMIN_USER_ID] = "admin"
+    return orders, users, roles
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Заглушка Supabase (PostgREST и Auth).")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--jwt-secret", default=DEFAULT_JWT_SECRET)
+    parser.add_argument("--orders", type=int, default=2000, help="заказов в таблице orders на старте")
+    parser.add_argument("--users", type=int, default=200, help="покупателей среди этих заказов")
+    parser.add_argument("--products", type=int, default=5000, help="как у mock_evotor")
+    parser.add_argument("--groups", type=int, default=40, help="как у mock_evotor")
+    add_fault_arguments(parser)
+    args = parser.parse_args()
+
+    orders, users, roles = seed(args.orders, args.users, args.products, args.groups)
+    app = create_app(orders, users, roles, args.jwt_secret, fault_config_from_args(args))
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Нагрузочный тест целиком: поднимает заглушки Evotor и Supabase, запускает
+backend.app.main:app через uvicorn против них и прогоняет сценарий
+backend.loadtest.scenario. Настоящие Evotor и Supabase не используются:
+переменные окружения бэкенда переопределяют значения из .env.
+
+    python -m backend.loadtest.run --duration 60 --concurrency 50 \\
+        --evotor-latency-ms 80 --evotor-jitter-ms 40 --evotor-error-rate 0.02 --evotor-error-status 429
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List
+
+import httpx
+import jwt
+
+from backend.loadtest import mock_evotor, mock_supabase
+from backend.loadtest.faults import FaultConfig, fault_arguments
+from backend.loadtest.scenario import add_scenario_arguments, run_scenario, scenario_config_from_args, write_report
+
+HOST = "127.0.0.1"
+DEFAULT_APP_PORT = 9100
+STORE_UUID = "20240301-0000-4000-8000-00000000cafe"
+STARTUP_TIMEOUT_SECONDS = 60.0
+
+
+def add_service_fault_arguments(parser: argparse.ArgumentParser, service: str, latency_ms: float, jitter_ms: float) -> None:
+    group = parser.add_argument_group(f"заглушка {service}")
+    group.add_argument(f"--{service}-latency-ms", type=float, default=latency_ms, help="задержка ответа, мс")
+    group.add_argument(f"--{service}-jitter-ms", type=float, default=jitter_ms, help="разброс задержки ±, мс")
+    group.add_argument(f"--{service}-error-rate", type=float, default=0.0, help="доля ответов с ошибкой, 0..1")
+    group.add_argument(f"--{service}-error-status", type=int, default=503, help="HTTP-статус внедрённых ошибок")
+    group.add_argument(f"--{service}-retry-after", type=float, default=None, help="Retry-After для внедрённых ошибок, с")
+
+
+def service_faults(args: argparse.Namespace, service: str) -> FaultConfig:
+    return FaultConfig(
+        latency_ms=getattr(args, f"{service}_latency_ms"),
+        jitter_ms=getattr(args, f"{service}_jitter_ms"),
+        error_rate=getattr(args, f"{service}_error_rate"),
+        error_status=getattr(args, f"{service}_error_status"),
+        retry_after=getattr(args, f"{service}_retry_after"),
+    )
+
+
+def app_environment(args: argparse.Namespace, workdir: str) -> Dict[str, str]:
+    supabase_url = f"http://{HOST}:{args.supabase_port}"
+    service_role_key = jwt.encode({"role": "service_role", "iss": "supabase"}, args.jwt_secret, algorithm="HS256")
+    env = dict(os.environ)
+    env.update(
+        {
+            "SUPABASE_URL": supabase_url,
+            "SUPABASE_SERVICE_ROLE_KEY": service_role_key,
+            "SUPABASE_JWT_SECRET": args.jwt_secret,
+            "SUPABASE_JWKS_URL": f"{supabase_url}/auth/v1/.well-known/jwks.json",
+            "AUTH_VERIFICATION_MODE": "local",
+            "EVOTOR_API_URL": f"http://{HOST}:{args.evotor_port}",
+            "EVOTOR_TOKEN": "loadtest-evotor-token",
+            "EVOTOR_STORE_UUID": STORE_UUID,
+            "EVOTOR_WEBHOOK_TOKEN": "",
+            "EVOTOR_HTTP2": "False",
+            "ASSET_STORAGE_BACKEND": "local",
+            "ASSET_STORAGE_DIR": os.path.join(workdir, "assets"),
+            "JOBS_DB_PATH": os.path.join(workdir, "jobs.sqlite3"),
+            "CATALOG_CACHE_BACKEND": "memory",
+        }
+    )
+    for item in args.app_env or []:
+        name, _, value = item.partition("=")
+        env[name] = value
+    return env
+
+
+@contextmanager
+def processes(commands: List[List[str]], env: Dict[str, str]) -> Iterator[None]:
+    started: List[subprocess.Popen] = []
+    try:
+        for command in commands:
+            started.append(subprocess.Popen(command, env=env))
+        yield
+    finally:
+        for process in reversed(started):
+            process.terminate()
+        for process in reversed(started):
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+async def wait_until_ready(urls: List[str], timeout: float = STARTUP_TIMEOUT_SECONDS) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(timeout=5.0) as client:
+        for url in urls:
+            while True:
+                try:
+                    if (await client.get(url)).status_code == 200:
+                        break
+                except httpx.HTTPError:
+                    pass
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f"Сервис не поднялся за {timeout:.0f} с: {url}")
+                await asyncio.sleep(0.2)
+
+
+async def run(args: argparse.Namespace) -> Dict:
+    base_url = f"http://{HOST}:{args.app_port}"
+    await wait_until_ready(
+        [
+            f"http://{HOST}:{args.evotor_port}/health",
+            f"http://{HOST}:{args.supabase_port}/health",
+            # Первый запрос к каталогу загружает его из заглушки Evotor.
+            f"{base_url}/api/catalog/groups",
+        ]
+    )
+    config = scenario_config_from_args(args, base_url, mock_supabase.ADMIN_EMAIL, mock_supabase.DEFAULT_PASSWORD)
+    return await run_scenario(config)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Нагрузочный тест бэкенда против локальных заглушек Evotor и Supabase.")
+    parser.add_argument("--app-port", type=int, default=DEFAULT_APP_PORT)
+    parser.add_argument("--evotor-port", type=int, default=mock_evotor.DEFAULT_PORT)
+    parser.add_argument("--supabase-port", type=int, default=mock_supabase.DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=1, help="воркеров uvicorn у бэкенда")
+    parser.add_argument("--products", type=int, default=5000)
+    parser.add_argument("--groups", type=int, default=40)
+    parser.add_argument("--orders", type=int, default=2000)
+    parser.add_argument("--jwt-secret", default=mock_supabase.DEFAULT_JWT_SECRET)
+    parser.add_argument("--app-env", action="append", metavar="NAME=VALUE", help="дополнительная переменная окружения бэкенда")
+    add_service_fault_arguments(parser, "evotor", latency_ms=80.0, jitter_ms=40.0)
+    add_service_fault_arguments(parser, "supabase", latency_ms=20.0, jitter_ms=10.0)
+    add_scenario_arguments(parser)
+    args = parser.parse_args()
+
+    catalog_arguments = ["--products", str(args.products), "--groups", str(args.groups)]
+    with tempfile.TemporaryDirectory(prefix="evotor-loadtest-") as workdir:
+        env = app_environment(args, workdir)
+        commands = [
+            [sys.executable, "-m", "backend.loadtest.mock_evotor", "--port", str(args.evotor_port), *catalog_arguments]
+            + fault_arguments(service_faults(args, "evotor")),
+            [
+                sys.executable, "-m", "backend.loadtest.mock_supabase",
+                "--port", str(args.supabase_port), "--jwt-secret", args.jwt_secret, "--orders", str(args.orders),
+                *catalog_arguments,
+            ]
+            + fault_arguments(service_faults(args, "supabase")),
+            [
+                sys.executable, "-m", "uvicorn", "backend.app.main:app",
+                "--host", HOST, "--port", str(args.app_port), "--workers", str(args.workers), "--log-level", "warning",
+            ],
+        ]
+        with processes(commands, env):
+            report = asyncio.run(run(args))
+
+    write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+"""
+Сценарий нагрузки на бэкенд: виртуальные пользователи в цикле выбирают поток
+(просмотр каталога, поиск, оформление заказа, подтверждение заказа администратором)
+по весам и выполняют его. В отчёте — p50/p95/p99 по каждому запросу и потоку
+и общая пропускная способность.
+
+Против уже запущенного бэкенда (например, стенда):
+
+    python -m backend.loadtest.scenario --base-url http://127.0.0.1:9100 \\
+        --admin-email admin@example.com --admin-password loadtest-password
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field, replace
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+from backend.benchmarks.fixtures import BRANDS, CITIES, PRODUCT_WORDS
+
+DEFAULT_WEIGHTS = {"browse": 60, "search": 25, "checkout": 10, "admin_approve": 5}
+PENDING_STATUS = "На рассмотрении"
+APPROVED_STATUS = "Одобрен"
+
+
+@dataclass
+class ScenarioConfig:
+    base_url: str
+    concurrency: int = 20
+    duration: float = 60.0
+    weights: Dict[str, int] = field(default_factory=lambda: dict(DEFAULT_WEIGHTS))
+    admin_email: Optional[str] = None
+    admin_password: Optional[str] = None
+    think_ms: float = 0.0
+    timeout: float = 30.0
+    seed: int = 1
+
+
+class Stats:
+    """Время ответа каждого запроса и потока; ошибка — исключение или статус >= 400."""
+
+    def __init__(self) -> None:
+        self.timings: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.statuses: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    def record(self, name: str, seconds: float, status: str, ok: bool) -> None:
+        self.timings[name].append(seconds)
+        self.statuses[name][status] += 1
+        if not ok:
+            self.errors[name] += 1
+
+
+def percentile(values: List[float], percent: float) -> float:
+    ordered = sorted(values)
+    return ordered[max(math.ceil(percent / 100 * len(ordered)) - 1, 0)]
+
+
+class Session:
+    """Один виртуальный пользователь: общий HTTP-клиент, статистика и данные для запросов."""
+
+    def __init__(self, client: httpx.AsyncClient, stats: Stats, rng: random.Random, shared: Dict[str, Any]) -> None:
+        self.client = client
+        self.stats = stats
+        self.rng = rng
+        self.shared = shared
+
+    async def call(self, name: str, method: str, url: str, **kwargs: Any) -> Optional[httpx.Response]:
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+        except httpx.HTTPError as exc:
+            self.stats.record(name, time.perf_counter() - started, exc.__class__.__name__, ok=False)
+            return None
+        self.stats.record(name, time.perf_counter() - started, str(response.status_code), ok=response.status_code < 400)
+        return response
+
+    def admin_headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.shared['admin_token']}"}
+
+
+async def browse(session: Session) -> None:
+    await session.call("GET /api/catalog/groups", "GET", "/api/catalog/groups")
+    await session.call("GET /api/catalog/items", "GET", "/api/catalog/items", params={"page": session.rng.randint(1, 5)})
+    if session.shared["group_ids"] and session.rng.random() < 0.5:
+        params = {"group_id": session.rng.choice(session.shared["group_ids"]), "page": 1}
+        await session.call("GET /api/catalog/items?group_id", "GET", "/api/catalog/items", params=params)
+    if session.rng.random() < 0.3:
+        params = {"sort": "price", "order": session.rng.choice(["asc", "desc"]), "min_quantity": 1}
+        await session.call("GET /api/catalog/items?sort", "GET", "/api/catalog/items", params=params)
+
+
+async def search(session: Session) -> None:
+    term = session.rng.choice(PRODUCT_WORDS + BRANDS)
+    if session.rng.random() < 0.3:
+        term = term[: session.rng.randint(2, len(term))]
+    await session.call("GET /api/catalog/items?search", "GET", "/api/catalog/items", params={"search": term})
+
+
+async def checkout(session: Session) -> None:
+    response = await session.call("GET /api/catalog/items", "GET", "/api/catalog/items", params={"page": session.rng.randint(1, 5)})
+    products = response.json().get("items", []) if response is not None and response.status_code == 200 else []
+    if not products:
+        return
+
+    number = session.rng.randint(1000, 9999)
+    payload = {
+        "items": [
+            {"id": product["id"], "name": product["name"], "price": int(product["price"]), "quantity": session.rng.randint(1, 2)}
+            for product in session.rng.sample(products, min(len(products), session.rng.randint(1, 3)))
+        ],
+        "shipping_address": {"title": "Дом", "city": session.rng.choice(CITIES), "address": f"ул. Нагрузочная, {number}"},
+        "customer_name": f"Покупатель {number}",
+        "customer_phone": f"+7999000{number}",
+    }
+    await session.call("POST /api/orders/", "POST", "/api/orders/", json=payload)
+
+
+async def admin_approve(session: Session) -> None:
+    response = await session.call(
+        "GET /api/orders/viewall",
+        "GET",
+        "/api/orders/viewall",
+        params={"status": PENDING_STATUS, "limit": 20},
+        headers=session.admin_headers(),
+    )
+    orders = response.json().get("items", []) if response is not None and response.status_code == 200 else []
+    if not orders:
+        return
+
+    order = session.rng.choice(orders)
+    await session.call(
+        "PATCH /api/orders/{id}",
+        "PATCH",
+        f"/api/orders/{order['id']}",
+        json={"status": APPROVED_STATUS},
+        headers=session.admin_headers(),
+    )
+
+
+FLOWS: Dict[str, Callable[[Session], Awaitable[None]]] = {
+    "browse": browse,
+    "search": search,
+    "checkout": checkout,
+    "admin_approve": admin_approve,
+}
+
+
+async def prepare(client: httpx.AsyncClient, config: ScenarioConfig) -> Dict[str, Any]:
+    """Общие данные сценария: группы каталога и токен администратора."""
+    shared: Dict[str, Any] = {"group_ids": [], "admin_token": None}
+
+    response = await client.get("/api/catalog/groups")
+    if response.status_code == 200:
+        shared["group_ids"] = [group["id"] for group in response.json().get("items", []) if group.get("id")]
+
+    if config.admin_email and config.admin_password:
+        response = await client.post("/api/auth/login", json={"email": config.admin_email, "password": config.admin_password})
+        if response.status_code == 200:
+            shared["admin_token"] = response.json()["session"]["access_token"]
+        else:
+            print(f"Не удалось войти администратором ({response.status_code}), поток admin_approve пропускается.")
+    return shared
+
+
+async def virtual_user(session: Session, config: ScenarioConfig, deadline: float) -> None:
+    names = [name for name, weight in config.weights.items() if weight > 0]
+    weights = [config.weights[name] for name in names]
+    while time.monotonic() < deadline:
+        name = session.rng.choices(names, weights)[0]
+        started = time.perf_counter()
+        try:
+            await FLOWS[name](session)
+        except Exception as exc:
+            session.stats.record(f"flow:{name}", time.perf_counter() - started, exc.__class__.__name__, ok=False)
+        else:
+            session.stats.record(f"flow:{name}", time.perf_counter() - started, "ok", ok=True)
+        if config.think_ms:
+            await asyncio.sleep(session.rng.uniform(0, 2 * config.think_ms) / 1000)
+
+
+async def run_scenario(config: ScenarioConfig) -> Dict[str, Any]:
+    limits = httpx.Limits(max_connections=config.concurrency * 2, max_keepalive_connections=config.concurrency * 2)
+    async with httpx.AsyncClient(base_url=config.base_url, timeout=config.timeout, limits=limits) as client:
+        shared = await prepare(client, config)
+        if not shared["admin_token"]:
+            config = replace(config, weights={**config.weights, "admin_approve": 0})
+        stats = Stats()
+        started = time.monotonic()
+        deadline = started + config.duration
+        await asyncio.gather(
+            *(
+                virtual_user(Session(client, stats, random.Random(config.seed + index), shared), config, deadline)
+                for index in range(config.concurrency)
+            )
+        )
+        elapsed = time.monotonic() - started
+    return build_report(stats, elapsed, config)
+
+
+def build_report(stats: Stats, elapsed: float, config: ScenarioConfig) -> Dict[str, Any]:
+    entries = {}
+    for name, timings in sorted(stats.timings.items()):
+        entries[name] = {
+            "count": len(timings),
+            "errors": stats.errors.get(name, 0),
+            "statuses": dict(stats.statuses[name]),
+            "p50": percentile(timings, 50),
+            "p95": percentile(timings, 95),
+            "p99": percentile(timings, 99),
+            "mean": sum(timings) / len(timings),
+            "max": max(timings),
+        }
+
+    requests = {name: entry for name, entry in entries.items() if not name.startswith("flow:")}
+    total = sum(entry["count"] for entry in requests.values())
+    return {
+        "config": {"base_url": config.base_url, "concurrency": config.concurrency, "duration": config.duration, "weights": config.weights},
+        "elapsed": elapsed,
+        "requests": total,
+        "errors": sum(entry["errors"] for entry in requests.values()),
+        "throughput_rps": total / elapsed if elapsed else 0.0,
+        "flows_per_second": sum(entry["count"] for name, entry in entries.items() if name.startswith("flow:")) / elapsed if elapsed else 0.0,
+        "entries": entries,
+    }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print(f"\n{'запрос / поток':<40} {'всего':>7} {'ошибок':>7} {'p50, мс':>9} {'p95, мс':>9} {'p99, мс':>9}")
+    for name, entry in report["entries"].items():
+        print(
+            f"{name:<40} {entry['count']:>7} {entry['errors']:>7} "
+            f"{entry['p50'] * 1000:>9.1f} {entry['p95'] * 1000:>9.1f} {entry['p99'] * 1000:>9.1f}"
+        )
+    print(
+        f"\nЗапросов: {report['requests']} за {report['elapsed']:.1f} с, ошибок: {report['errors']}; "
+        f"{report['throughput_rps']:.1f} запросов/с, {report['flows_per_second']:.1f} потоков/с"
+    )
+
+
+def parse_weights(value: str) -> Dict[str, int]:
+    """"browse=60,search=25" → {"browse": 60, "search": 25}; потоки без веса не запускаются."""
+    weights = {name: 0 for name in FLOWS}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in FLOWS:
+            raise argparse.ArgumentTypeError(f"Неизвестный поток: {name}")
+        weights[name.strip()] = int(weight)
+    return weights
+
+
+def add_scenario_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--concurrency", type=int, default=20, help="число виртуальных пользователей")
+    parser.add_argument("--duration", type=float, default=60.0, help="длительность нагрузки, с")
+    parser.add_argument("--weights", type=parse_weights, default=None, help="веса потоков, например browse=60,search=25,checkout=10,admin_approve=5")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="средняя пауза между потоками, мс")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="куда записать отчёт в JSON")
+
+
+def scenario_config_from_args(args: argparse.Namespace, base_url: str, admin_email: Optional[str], admin_password: Optional[str]) -> ScenarioConfig:
+    return ScenarioConfig(
+        base_url=base_url,
+        concurrency=args.concurrency,
+        duration=args.duration,
+        weights=args.weights or dict(DEFAULT_WEIGHTS),
+        admin_email=admin_email,
+        admin_password=admin_password,
+        think_ms=args.think_ms,
+        seed=args.seed,
+    )
+
+
+def write_report(report: Dict[str, Any], path: Optional[str]) -> None:
+    print_report(report)
+    if path:
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Нагрузочный сценарий для запущенного бэкенда.")
+    parser.add_argument("--base-url", required=True)
+    parser.add_argument("--admin-email")
+    parser.add_argument("--admin-password")
+    add_scenario_arguments(parser)
+    args = parser.parse_args()
+
+    config = scenario_config_from_args(args, args.base_url, args.admin_email, args.admin_password)
+    write_report(asyncio.run(run_scenario(config)), args.output)
+
+
+if __name__ == "__main__":
+    main()
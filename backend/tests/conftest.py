@@ -0,0 +1,7 @@
+import pytest
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    # Асинхронные тесты (pytest.mark.anyio) — на asyncio, как и приложение под uvicorn.
+    return "asyncio"
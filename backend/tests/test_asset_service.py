@@ -0,0 +1,179 @@
+import base64
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List
+from urllib.parse import quote
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from backend.app.routers.assets import router as assets_router
+from backend.app.services import asset_service
+from backend.app.services.asset_service import Asset, LocalAssetStore
+
+PNG_BYTES = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNk+M9QDwADhgGAWjR9awAAAABJRU5ErkJggg=="
+)
+PLACEHOLDER_SVG = (
+    '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 200 200">'
+    '<defs><radialGradient id="glow"><stop offset="0%" stop-color="#FFFFFF"/></radialGradient></defs>'
+    '<rect width="200" height="200" fill="#1e3a8a"/><circle cx="40" cy="40" r="80" fill="url(#glow)"/></svg>'
+)
+
+
+class CountingStore(LocalAssetStore):
+    def __init__(self, root: str) -> None:
+        super().__init__(root)
+        self.saved: List[str] = []
+
+    async def save(self, asset_hash: str, asset: Asset) -> None:
+        self.saved.append(asset_hash)
+        await super().save(asset_hash, asset)
+
+
+@pytest.fixture
+def store(tmp_path) -> Iterator[CountingStore]:
+    store = CountingStore(str(tmp_path / "assets"))
+    asset_service.set_store(store)
+    yield store
+    asset_service.set_store(None)
+
+
+def data_uri(content_type: str, data: bytes) -> str:
+    return f"data:{content_type};base64,{base64.b64encode(data).decode('ascii')}"
+
+
+def svg_uri(svg: str) -> str:
+    return f"data:image/svg+xml;charset=utf-8,{quote(svg)}"
+
+
+@pytest.mark.anyio
+async def test_same_content_is_stored_once_under_its_sha256(store: CountingStore) -> None:
+    asset = Asset(data=PNG_BYTES, content_type="image/png")
+
+    first = await asset_service.store_asset(asset)
+    # Без кэша процесса повторное сохранение проверяет наличие файла в хранилище.
+    asset_service._asset_cache.clear()
+    second = await asset_service.store_asset(Asset(data=PNG_BYTES, content_type="image/png"))
+
+    assert first == second == asset_service.hash_asset(PNG_BYTES)
+    assert store.saved == [first]
+    assert os.path.exists(os.path.join(store.root, first[:2], first))
+    assert await store.load(first) == asset
+
+
+@pytest.mark.anyio
+async def test_allowed_images_are_externalized(store: CountingStore) -> None:
+    png_url = await asset_service.externalize_image(data_uri("image/png", PNG_BYTES))
+    svg_url = await asset_service.externalize_image(svg_uri(PLACEHOLDER_SVG))
+
+    assert png_url == f"{asset_service.ASSET_URL_PREFIX}{asset_service.hash_asset(PNG_BYTES)}"
+    assert svg_url is not None and svg_url.startswith(asset_service.ASSET_URL_PREFIX)
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize(
+    "value",
+    [
+        data_uri("text/html", b"<script>alert(1)</script>"),
+        data_uri("application/pdf", b"%PDF-1.4"),
+        data_uri("image/x-icon", b"\x00\x00\x01\x00"),
+        "data:text/plain,hello",
+        svg_uri('<svg xmlns="http://www.w3.org/2000/svg"><script>alert(1)</script></svg>'),
+        svg_uri('<svg xmlns="http://www.w3.org/2000/svg" onload="alert(1)"/>'),
+        svg_uri('<svg xmlns="http://www.w3.org/2000/svg"><a href="javascript:alert(1)"><rect/></a></svg>'),
+        svg_uri('<svg xmlns="http://www.w3.org/2000/svg"><image href="https://example.com/x.png"/></svg>'),
+        svg_uri('<svg xmlns="http://www.w3.org/2000/svg"><foreignObject><div/></foreignObject></svg>'),
+    ],
+)
+async def test_active_svg_and_other_types_are_rejected(store: CountingStore, value: str) -> None:
+    assert await asset_service.externalize_image(value) is None
+    assert store.saved == []
+
+
+def test_oversized_upload_is_rejected_before_decoding(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(asset_service, "ASSET_MAX_BYTES", 16)
+
+    with pytest.raises(HTTPException) as exc_info:
+        asset_service.parse_data_uri(data_uri("image/png", b"\x00" * 64))
+
+    assert exc_info.value.status_code == 413
+
+
+def test_concurrent_saves_of_one_asset_are_atomic(tmp_path) -> None:
+    store = LocalAssetStore(str(tmp_path / "assets"))
+    asset = Asset(data=PNG_BYTES * 1000, content_type="image/png")
+    asset_hash = asset_service.hash_asset(asset.data)
+    workers = 16
+    barrier = threading.Barrier(workers)
+
+    def save() -> None:
+        barrier.wait()
+        store._save_sync(asset_hash, asset)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for future in [executor.submit(save) for _ in range(workers)]:
+            future.result()
+
+    directory = os.path.join(store.root, asset_hash[:2])
+    assert sorted(os.listdir(directory)) == [asset_hash, f"{asset_hash}.meta"]
+    assert store._load_sync(asset_hash) == asset
+
+
+def test_existing_target_counts_as_saved(tmp_path) -> None:
+    store = LocalAssetStore(str(tmp_path / "assets"))
+    asset = Asset(data=PNG_BYTES, content_type="image/png")
+    asset_hash = asset_service.hash_asset(asset.data)
+    store._save_sync(asset_hash, asset)
+
+    # Повторное сохранение не трогает файл и не оставляет временных.
+    store._save_sync(asset_hash, Asset(data=PNG_BYTES, content_type="image/gif"))
+
+    assert store._load_sync(asset_hash) == asset
+    assert len(os.listdir(os.path.join(store.root, asset_hash[:2]))) == 2
+
+
+@pytest.fixture
+def client(store: CountingStore) -> TestClient:
+    app = FastAPI()
+    app.include_router(assets_router, prefix="/api/assets")
+    return TestClient(app)
+
+
+def assert_sandboxed(response) -> None:
+    assert response.headers["content-security-policy"] == "default-src 'none'; style-src 'unsafe-inline'; sandbox"
+    assert response.headers["x-content-type-options"] == "nosniff"
+
+
+@pytest.mark.anyio
+async def test_served_image_is_sandboxed(client: TestClient) -> None:
+    asset_hash = await asset_service.store_asset(Asset(data=PNG_BYTES, content_type="image/png"))
+
+    response = client.get(f"/api/assets/{asset_hash}")
+
+    assert response.status_code == 200
+    assert response.content == PNG_BYTES
+    assert response.headers["content-type"] == "image/png"
+    assert response.headers["content-disposition"] == f'inline; filename="{asset_hash}"'
+    assert_sandboxed(response)
+
+    not_modified = client.get(f"/api/assets/{asset_hash}", headers={"If-None-Match": f'"{asset_hash}"'})
+    assert not_modified.status_code == 304
+    assert_sandboxed(not_modified)
+
+
+@pytest.mark.anyio
+async def test_stored_non_image_is_served_as_attachment(client: TestClient, store: CountingStore) -> None:
+    # Ассет, сохранённый до появления белого списка.
+    data = b"<script>alert(1)</script>"
+    asset_hash = asset_service.hash_asset(data)
+    await store.save(asset_hash, Asset(data=data, content_type="text/html"))
+
+    response = client.get(f"/api/assets/{asset_hash}")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/octet-stream"
+    assert response.headers["content-disposition"] == f'attachment; filename="{asset_hash}"'
+    assert_sandboxed(response)
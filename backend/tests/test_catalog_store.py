@@ -0,0 +1,168 @@
+import asyncio
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import pytest
+
+from backend.app.services import catalog_service
+from backend.app.services.catalog_store import KEY_PREFIX, RedisCatalogStore, set_catalog_store
+from backend.app.services.catalog_table import ProductTable
+
+WORKERS = 4
+
+
+class InMemoryRedis:
+    """
+    Минимальный redis.asyncio для RedisCatalogStore: get, set с nx/px и eval
+    двух его Lua-скриптов. clock сдвигается вручную, чтобы истекали блокировки.
+    """
+
+    def __init__(self) -> None:
+        self.values: Dict[str, Tuple[Any, Optional[float]]] = {}
+        self.clock = 0.0
+
+    def _alive(self, key: str) -> Optional[Any]:
+        entry = self.values.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= self.clock:
+            del self.values[key]
+            return None
+        return value
+
+    async def get(self, key: str) -> Optional[Any]:
+        return self._alive(key)
+
+    async def set(self, key: str, value: Any, nx: bool = False, px: Optional[int] = None) -> Optional[bool]:
+        if nx and self._alive(key) is not None:
+            return None
+        self.values[key] = (value, self.clock + px / 1000 if px is not None else None)
+        return True
+
+    async def eval(self, script: str, numkeys: int, key: str, token: str, *args: Any) -> int:
+        if self._alive(key) != token:
+            return 0
+        if script == RedisCatalogStore._EXTEND_SCRIPT:
+            self.values[key] = (token, self.clock + int(args[0]) / 1000)
+            return 1
+        if script == RedisCatalogStore._RELEASE_SCRIPT:
+            del self.values[key]
+            return 1
+        raise NotImplementedError(script)
+
+    async def aclose(self) -> None:
+        return None
+
+
+class Worker:
+    """Кэш товаров одного воркера uvicorn: свой словарь и своя блокировка, общий Redis."""
+
+    def __init__(self) -> None:
+        self.cache: Dict[str, Any] = {
+            "key": "products",
+            "version": 0.0,
+            "timestamp": 0.0,
+            "data": ProductTable(),
+            "loaded": False,
+            "error": None,
+            "error_at": 0.0,
+            "task": None,
+            "synced_at_ms": 0,
+        }
+        self.lock = asyncio.Lock()
+
+
+class Evotor:
+    def __init__(self) -> None:
+        self.loads = 0
+
+    async def load_products(self) -> ProductTable:
+        self.loads += 1
+        # Пока первый воркер ходит в Evotor, остальные успевают упереться в блокировку.
+        await asyncio.sleep(0.05)
+        return ProductTable.from_products(
+            {"id": f"p{index}", "name": f"Товар {index}", "price": 100.0 + index, "quantity": float(index), "parent_id": "g1"}
+            for index in range(10)
+        )
+
+
+@pytest.fixture
+def redis(monkeypatch: pytest.MonkeyPatch) -> Iterator[InMemoryRedis]:
+    redis = InMemoryRedis()
+    set_catalog_store(RedisCatalogStore(redis))
+    monkeypatch.setattr(catalog_service, "CATALOG_SHARED_POLL_SECONDS", 0.01)
+    yield redis
+    set_catalog_store(None)
+
+
+@pytest.mark.anyio
+async def test_only_one_worker_loads_catalog_and_others_adopt_its_snapshot(redis: InMemoryRedis) -> None:
+    evotor = Evotor()
+    workers = [Worker() for _ in range(WORKERS)]
+
+    results: List[ProductTable] = await asyncio.gather(
+        *(catalog_service.refresh_cache(worker.cache, worker.lock, evotor.load_products) for worker in workers)
+    )
+
+    assert evotor.loads == 1
+    assert all(result.ids == results[0].ids and list(result.prices) == list(results[0].prices) for result in results)
+    assert len({worker.cache["version"] for worker in workers}) == 1
+    assert all(worker.cache["loaded"] for worker in workers)
+    # Блокировка загрузки снята, снимок и метка опубликованы.
+    assert await redis.get(f"{KEY_PREFIX}lock:products") is None
+    assert await redis.get(f"{KEY_PREFIX}products") is not None
+    assert await redis.get(f"{KEY_PREFIX}products:meta") is not None
+
+
+@pytest.mark.anyio
+async def test_new_worker_reads_shared_snapshot_instead_of_evotor(redis: InMemoryRedis) -> None:
+    evotor = Evotor()
+    first = Worker()
+    await catalog_service.read_cache(first.cache, first.lock, evotor.load_products)
+
+    late = Worker()
+    products = await catalog_service.read_cache(late.cache, late.lock, evotor.load_products)
+
+    assert evotor.loads == 1
+    assert products.ids == first.cache["data"].ids
+    assert late.cache["version"] == first.cache["version"]
+
+
+@pytest.mark.anyio
+async def test_refresher_role_is_held_by_one_worker_until_it_expires(redis: InMemoryRedis) -> None:
+    owner = await catalog_service.acquire_refresher_role(None)
+    assert owner is not None
+    assert await catalog_service.acquire_refresher_role(None) is None
+
+    # Владелец продлевает свою блокировку тем же токеном.
+    assert await catalog_service.acquire_refresher_role(owner) == owner
+
+    redis.clock += catalog_service.CATALOG_REFRESHER_LOCK_SECONDS
+    successor = await catalog_service.acquire_refresher_role(None)
+    assert successor is not None and successor != owner
+    assert await catalog_service.acquire_refresher_role(owner) is None
+
+
+@pytest.mark.anyio
+async def test_lock_is_released_only_by_its_owner(redis: InMemoryRedis) -> None:
+    store = RedisCatalogStore(redis)
+    token = await store.acquire_lock("products", 60)
+    assert token is not None
+
+    await store.release_lock("products", "someone-else")
+    assert await store.acquire_lock("products", 60) is None
+
+    await store.release_lock("products", token)
+    assert await store.acquire_lock("products", 60) is not None
+
+
+@pytest.mark.anyio
+async def test_publish_skips_snapshot_when_data_did_not_change(redis: InMemoryRedis) -> None:
+    worker = Worker()
+    worker.cache.update(data=await Evotor().load_products(), version=time.time(), timestamp=time.monotonic(), loaded=True)
+
+    await catalog_service.publish_shared(worker.cache, data_changed=False)
+
+    assert await redis.get(f"{KEY_PREFIX}products") is None
+    assert await redis.get(f"{KEY_PREFIX}products:meta") is not None
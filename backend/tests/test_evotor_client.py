@@ -0,0 +1,236 @@
+import asyncio
+import time
+from typing import Any, Callable, Iterator, List
+
+import httpx
+import pytest
+from fastapi import HTTPException
+
+from backend.app.services import evotor_client
+from backend.app.services.evotor_client import CircuitBreaker, TokenBucket
+
+BREAKER_THRESHOLD = 2
+BREAKER_RESET_SECONDS = 10.0
+
+
+class RecordingAsyncio:
+    """Модуль asyncio для evotor_client, в котором sleep только запоминает паузу."""
+
+    def __init__(self) -> None:
+        self.sleeps: List[float] = []
+
+    async def sleep(self, delay: float) -> None:
+        self.sleeps.append(delay)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(asyncio, name)
+
+
+class Evotor:
+    """Транспорт httpx: отвечает по очереди заготовленными ответами и считает запросы."""
+
+    def __init__(self, *responses: Callable[[httpx.Request], Any]) -> None:
+        self.responses = list(responses)
+        self.requests = 0
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        respond = self.responses[min(self.requests, len(self.responses) - 1)]
+        self.requests += 1
+        result = respond(request)
+        if asyncio.iscoroutine(result):
+            result = await result
+        return result
+
+
+@pytest.fixture
+def breaker(monkeypatch: pytest.MonkeyPatch) -> CircuitBreaker:
+    breaker = CircuitBreaker(BREAKER_THRESHOLD, BREAKER_RESET_SECONDS)
+    monkeypatch.setattr(evotor_client, "breaker", breaker)
+    monkeypatch.setattr(evotor_client, "rate_limiter", TokenBucket(0, 1))
+    monkeypatch.setattr(evotor_client, "EVOTOR_MAX_RETRIES", 2)
+    return breaker
+
+
+@pytest.fixture
+def sleeps(monkeypatch: pytest.MonkeyPatch) -> List[float]:
+    fake = RecordingAsyncio()
+    monkeypatch.setattr(evotor_client, "asyncio", fake)
+    return fake.sleeps
+
+
+@pytest.fixture
+def use_evotor() -> Iterator[Callable[[Evotor], Evotor]]:
+    def install(evotor: Evotor) -> Evotor:
+        evotor_client.set_client(
+            httpx.AsyncClient(base_url="https://evotor.test", transport=httpx.MockTransport(evotor.handle))
+        )
+        return evotor
+
+    yield install
+    evotor_client.set_client(None)
+
+
+def status(code: int, **headers: str) -> Callable[[httpx.Request], httpx.Response]:
+    return lambda request: httpx.Response(code, headers=headers, json={})
+
+
+def connect_error(request: httpx.Request) -> httpx.Response:
+    raise httpx.ConnectError("connection refused", request=request)
+
+
+def open_breaker(breaker: CircuitBreaker, seconds_ago: float = 0.0) -> None:
+    breaker.failures = BREAKER_THRESHOLD
+    breaker.opened_at = time.monotonic() - seconds_ago
+
+
+@pytest.mark.anyio
+async def test_429_is_retried_after_retry_after(breaker, sleeps, use_evotor) -> None:
+    evotor = use_evotor(Evotor(status(429, **{"Retry-After": "3"}), status(200)))
+
+    response = await evotor_client.request("GET", "/products")
+
+    assert response.status_code == 200
+    assert evotor.requests == 2
+    assert sleeps == [3.0]
+    # 429 — перебор нашего лимита, а не отказ Evotor.
+    assert breaker.failures == 0
+
+
+@pytest.mark.anyio
+async def test_too_long_retry_after_returns_429_without_waiting(breaker, sleeps, use_evotor) -> None:
+    evotor = use_evotor(Evotor(status(429, **{"Retry-After": str(int(evotor_client.RETRY_AFTER_MAX_SECONDS) + 1)})))
+
+    response = await evotor_client.request("GET", "/products")
+
+    assert response.status_code == 429
+    assert evotor.requests == 1
+    assert sleeps == []
+
+
+@pytest.mark.anyio
+async def test_non_idempotent_request_is_not_retried(breaker, sleeps, use_evotor) -> None:
+    evotor = use_evotor(Evotor(status(503), status(200)))
+
+    response = await evotor_client.request("POST", "/products", json={})
+
+    assert response.status_code == 503
+    assert evotor.requests == 1
+
+
+@pytest.mark.anyio
+async def test_retried_5xx_counts_as_one_breaker_failure(breaker, sleeps, use_evotor) -> None:
+    evotor = use_evotor(Evotor(status(503)))
+
+    response = await evotor_client.request("GET", "/products")
+
+    assert response.status_code == 503
+    assert evotor.requests == 3
+    assert len(sleeps) == 2
+    assert breaker.failures == 1
+    assert breaker.opened_at is None
+
+
+@pytest.mark.anyio
+async def test_breaker_opens_and_rejects_without_calling_evotor(breaker, sleeps, use_evotor) -> None:
+    evotor = use_evotor(Evotor(connect_error))
+
+    for _ in range(BREAKER_THRESHOLD):
+        with pytest.raises(httpx.ConnectError):
+            await evotor_client.request("GET", "/products")
+    requests_before = evotor.requests
+
+    with pytest.raises(HTTPException) as exc_info:
+        await evotor_client.request("GET", "/products")
+
+    assert exc_info.value.status_code == 503
+    assert breaker.opened_at is not None
+    assert evotor.requests == requests_before
+
+
+@pytest.mark.anyio
+async def test_successful_probe_closes_breaker(breaker, sleeps, use_evotor) -> None:
+    use_evotor(Evotor(status(200)))
+    open_breaker(breaker, seconds_ago=BREAKER_RESET_SECONDS)
+
+    response = await evotor_client.request("GET", "/products")
+
+    assert response.status_code == 200
+    assert breaker.opened_at is None
+    assert not breaker.probing
+    assert breaker.allow()
+
+
+@pytest.mark.anyio
+async def test_failed_probe_reopens_breaker(breaker, sleeps, use_evotor) -> None:
+    use_evotor(Evotor(status(503)))
+    open_breaker(breaker, seconds_ago=BREAKER_RESET_SECONDS)
+
+    response = await evotor_client.request("GET", "/products")
+
+    assert response.status_code == 503
+    assert not breaker.probing
+    assert breaker.opened_at is not None
+    assert not breaker.allow()
+
+
+def test_half_open_breaker_lets_through_a_single_probe(breaker) -> None:
+    open_breaker(breaker)
+    assert not breaker.allow()
+
+    breaker.opened_at -= BREAKER_RESET_SECONDS
+    assert breaker.allow()
+    assert breaker.probing
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.allow()
+    assert breaker.failures == 0
+
+
+@pytest.mark.anyio
+async def test_cancelled_probe_releases_breaker(breaker, use_evotor) -> None:
+    started = asyncio.Event()
+
+    async def hang(request: httpx.Request) -> httpx.Response:
+        started.set()
+        await asyncio.sleep(60)
+        return httpx.Response(200)
+
+    use_evotor(Evotor(hang))
+    open_breaker(breaker, seconds_ago=BREAKER_RESET_SECONDS)
+
+    probe = asyncio.create_task(evotor_client.request("GET", "/products"))
+    await started.wait()
+    assert breaker.probing
+
+    probe.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await probe
+
+    assert not breaker.probing
+    assert breaker.allow()
+
+
+@pytest.mark.anyio
+async def test_token_bucket_spaces_requests_beyond_burst() -> None:
+    bucket = TokenBucket(rate=50, burst=2)
+
+    started = time.monotonic()
+    for _ in range(4):
+        await bucket.acquire()
+    elapsed = time.monotonic() - started
+
+    # Два токена есть сразу, ещё два набегают по 1/50 с.
+    assert elapsed >= 2 / 50 * 0.9
+    assert elapsed < 1.0
+
+
+@pytest.mark.anyio
+async def test_disabled_token_bucket_does_not_wait() -> None:
+    bucket = TokenBucket(rate=0, burst=1)
+
+    started = time.monotonic()
+    for _ in range(100):
+        await bucket.acquire()
+
+    assert time.monotonic() - started < 0.1
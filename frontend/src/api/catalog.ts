@@ -24,15 +24,29 @@ export interface CatalogItemsResponse {
   total_pages: number;
 }
 
+export interface CatalogGroupNode extends CatalogGroup {
+  product_count: number;
+  total_count: number;
+  children: CatalogGroupNode[];
+}
+
 export interface CatalogGroupsResponse {
   items: CatalogGroup[];
+  tree: CatalogGroupNode[];
 }
 
+export type CatalogSortField = 'price' | 'name' | 'quantity';
+
 export interface FetchCatalogItemsParams {
   page?: number;
   pageSize?: number;
   groupId?: string | null;
   search?: string;
+  sort?: CatalogSortField;
+  order?: 'asc' | 'desc';
+  minPrice?: number;
+  maxPrice?: number;
+  minQuantity?: number;
 }
 
 export async function fetchCatalogItems({
@@ -40,6 +54,11 @@ export async function fetchCatalogItems({
   pageSize = 20,
   groupId,
   search,
+  sort,
+  order,
+  minPrice,
+  maxPrice,
+  minQuantity,
 }: FetchCatalogItemsParams = {}): Promise<CatalogItemsResponse> {
   const params = new URLSearchParams({
     page: String(page),
@@ -54,6 +73,25 @@ export async function fetchCatalogItems({
     params.set('search', search);
   }
 
+  if (sort) {
+    params.set('sort', sort);
+    if (order) {
+      params.set('order', order);
+    }
+  }
+
+  if (minPrice !== undefined) {
+    params.set('min_price', String(minPrice));
+  }
+
+  if (maxPrice !== undefined) {
+    params.set('max_price', String(maxPrice));
+  }
+
+  if (minQuantity !== undefined) {
+    params.set('min_quantity', String(minQuantity));
+  }
+
   return apiFetch<CatalogItemsResponse>(`/api/catalog/items?${params.toString()}`);
 }
 
@@ -81,8 +81,51 @@ export function fetchMyOrders(token: string) {
   });
 }
 
-export function fetchAllOrders(token: string) {
-  return apiFetch<OrderRecord[]>('/api/orders/viewall', {
+export interface OrdersPage {
+  items: OrderRecord[];
+  next_cursor?: string | null;
+}
+
+export interface FetchAllOrdersParams {
+  limit?: number;
+  cursor?: string | null;
+  status?: OrderStatus;
+  paymentStatus?: OrderRecord['payment_status'];
+  createdFrom?: string;
+  createdTo?: string;
+}
+
+export function fetchAllOrders(token: string, params: FetchAllOrdersParams = {}) {
+  const query = new URLSearchParams();
+
+  if (params.limit) {
+    query.set('limit', String(params.limit));
+  }
+  if (params.cursor) {
+    query.set('cursor', params.cursor);
+  }
+  if (params.status) {
+    query.set('status', params.status);
+  }
+  if (params.paymentStatus) {
+    query.set('payment_status', params.paymentStatus);
+  }
+  if (params.createdFrom) {
+    query.set('created_from', params.createdFrom);
+  }
+  if (params.createdTo) {
+    query.set('created_to', params.createdTo);
+  }
+
+  const suffix = query.toString();
+  return apiFetch<OrdersPage>(`/api/orders/viewall${suffix ? `?${suffix}` : ''}`, {
+    method: 'GET',
+    token,
+  });
+}
+
+export function fetchOrder(token: string, orderId: number) {
+  return apiFetch<OrderRecord>(`/api/orders/${orderId}`, {
     method: 'GET',
     token,
   });
@@ -26,7 +26,9 @@ const ORDER_STATUSES: OrderStatus[] = [
 
 export const Admin: React.FC<AdminProps> = ({ authTokens, user, setCurrentView }) => {
   const [orders, setOrders] = useState<OrderRecord[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [isLoading, setIsLoading] = useState(false);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
   const [error, setError] = useState<string | null>(null);
   const [drafts, setDrafts] = useState<Record<number, Partial<OrderRecord>>>({});
   const [updatingOrderId, setUpdatingOrderId] = useState<number | null>(null);
@@ -56,7 +58,8 @@ export const Admin: React.FC<AdminProps> = ({ authTokens, user, setCurrentView }
 
     try {
       const response = await fetchAllOrders(token);
-      setOrders(response);
+      setOrders(response.items);
+      setNextCursor(response.next_cursor ?? null);
       setDrafts({});
     } catch (err) {
       console.error('Failed to fetch orders', err);
@@ -66,6 +69,26 @@ export const Admin: React.FC<AdminProps> = ({ authTokens, user, setCurrentView }
     }
   };
 
+  const loadMoreOrders = async () => {
+    if (!token || !nextCursor) {
+      return;
+    }
+
+    setIsLoadingMore(true);
+    setError(null);
+
+    try {
+      const response = await fetchAllOrders(token, { cursor: nextCursor });
+      setOrders((prev) => [...prev, ...response.items]);
+      setNextCursor(response.next_cursor ?? null);
+    } catch (err) {
+      console.error('Failed to fetch more orders', err);
+      setError('Не удалось загрузить заказы. Попробуйте позже.');
+    } finally {
+      setIsLoadingMore(false);
+    }
+  };
+
   // const handleStatusChange = (orderId: number, status: OrderStatus) => {
   //   setDrafts((prev) => ({
   //     ...prev,
@@ -399,6 +422,18 @@ export const Admin: React.FC<AdminProps> = ({ authTokens, user, setCurrentView }
               );
             })}
 
+            {nextCursor && (
+              <div className="text-center">
+                <button
+                  onClick={loadMoreOrders}
+                  disabled={isLoadingMore}
+                  className="px-4 py-2 bg-blue-900 text-white rounded-lg hover:bg-blue-800 transition-colors disabled:bg-gray-400"
+                >
+                  {isLoadingMore ? 'Загрузка...' : 'Показать ещё'}
+                </button>
+              </div>
+            )}
+
             {orders.length === 0 && hasAccess && !isLoading && !error && (
               <div className="bg-white rounded-lg shadow p-8 text-center text-gray-600">
                 Заказы ещё не оформлялись.
@@ -115,9 +115,7 @@ export const Catalog: React.FC<CatalogProps> = ({
     if (!groups.length) {
       return [];
     }
-    const filtered = groups.filter((group) => group.parent_id);
-    const base = filtered.length > 0 ? filtered : groups;
-    return [...base].sort((a, b) => a.name.localeCompare(b.name, 'ru', { sensitivity: 'base' }));
+    return [...groups].sort((a, b) => a.name.localeCompare(b.name, 'ru', { sensitivity: 'base' }));
   }, [groups]);
 
   useEffect(() => {